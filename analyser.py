@@ -0,0 +1,248 @@
+from __future__ import annotations
+import os
+import re
+import sys
+from dataclasses import dataclass
+from typing import Iterable, Optional, Sequence
+
+import decline
+from decline import SLOTS, Declension, DeclensionSuffixes, LexiconEntry
+
+# going from a form back to its lemma without a table of every form: the form's
+# slot suffix (from the SUF_* tables, via `make_suffixes`) is stripped and the
+# stem rules are undone, then every candidate is declined forward and kept only
+# if it gives the form back.
+#
+# the rules are undone with reverse rules learned by running them forward over
+# a lexicon. a stem and its abs_sg stem agree up to where a rule changed
+# something; from there on the pair is a rewrite, e.g. "Ir" <- "E!r", kept per
+# paradigm, suffixes and slot with the consonants in it made variables, so it
+# applies to any root. how many there are depends on the rules, not on the
+# size of the lexicon they were learned from
+TEST_DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "test-data.tsv")
+# vowels, maters and marks: what the rules rewrite. everything else is a
+# consonant, which a rule moves or keeps but does not make up
+MARKS = frozenset("aeiouAEIOUWáéóÁ3!_YH-")
+_CONSONANT = "[^" + re.escape("".join(sorted(MARKS))) + "]"
+
+# paradigm id, singular suffix as `decline` takes it, plural suffix, slot
+RuleKey = tuple[str, str, str, str]
+# the tail of a stem as a regex, and the tail of abs_sg as literals and the
+# numbers of the consonants it takes from the stem's tail
+Reversal = tuple[str, tuple[str | int, ...]]
+# a compiled reversal and the keys it is learned for
+_Tail = tuple[re.Pattern, Reversal, list[RuleKey]]
+
+
+@dataclass(frozen=True)
+class Analysis:
+    abs_sg: str
+    paradigm_id: str
+    slot: str
+    has_suf: bool
+    suf_pl: str
+
+
+def _slot_suffixes(
+    suffixes: DeclensionSuffixes, slot: str
+) -> list[tuple[str, Optional[bool]]]:
+    # the suffixes a form of `slot` may end with, and whether the stem before
+    # it must (True) or must not (False) end in "i". gen_sg adds an "i" unless
+    # its stem already ends in one
+    suffix = getattr(suffixes, slot)
+    if suffix is None:
+        return []
+    if slot == "gen_sg":
+        return [(suffix + "i", False), (suffix, True)]
+    return [(suffix, None)]
+
+
+def _strip(form: str, suffix: str, ends_in_i: Optional[bool]) -> Optional[str]:
+    if not form.endswith(suffix):
+        return None
+    stem = form[: len(form) - len(suffix)]
+    if not stem or (ends_in_i is not None and stem.endswith("i") != ends_in_i):
+        return None
+    return stem
+
+
+def reversal(stem: str, abs_sg: str) -> Reversal:
+    # the rewrite that takes `stem` back to `abs_sg`, from where they differ
+    n = 0
+    for a, b in zip(stem, abs_sg):
+        if a != b:
+            break
+        n += 1
+    stem_tail, abs_sg_tail = stem[n:], abs_sg[n:]
+    pattern: list[str] = []
+    numbers: dict[str, int] = {}
+    for c in stem_tail:
+        if c in MARKS:
+            pattern.append(re.escape(c))
+        elif c in numbers:
+            pattern.append(f"(?P={_group(numbers[c])})")
+        else:
+            numbers[c] = len(numbers)
+            pattern.append(f"(?P<{_group(numbers[c])}>{_CONSONANT})")
+    replacement = tuple(c if c in MARKS else numbers.get(c, c) for c in abs_sg_tail)
+    return "".join(pattern), replacement
+
+
+def _group(number: int) -> str:
+    return f"c{number}"
+
+
+class Analyser:
+    def __init__(self, rules: dict[RuleKey, list[Reversal]]) -> None:
+        self.rules = rules
+        # for every suffix a form may end with: the reversals of the keys
+        # whose slot has that suffix, each with the keys that use it, so a
+        # reversal shared by many paradigms is tried once
+        by_suffix: dict[tuple[str, Optional[bool]], dict[Reversal, list[RuleKey]]] = {}
+        for key, reversals in rules.items():
+            paradigm_id, suf_sg, suf_pl, slot = key
+            suffixes = _suffixes(paradigm_id, suf_sg, suf_pl)
+            for option in _slot_suffixes(suffixes, slot):
+                keys = by_suffix.setdefault(option, {})
+                for r in reversals:
+                    keys.setdefault(r, []).append(key)
+        self._by_suffix: dict[str, list[tuple[Optional[bool], list[_Tail]]]] = {}
+        patterns: dict[str, re.Pattern] = {}
+        for (suffix, ends_in_i), keys in by_suffix.items():
+            tails: list[_Tail] = []
+            for r, r_keys in keys.items():
+                tail = r[0]
+                pattern = patterns.get(tail)
+                if pattern is None:
+                    pattern = patterns[tail] = re.compile(
+                        f"(?P<prefix>.*?){tail}\\Z", re.DOTALL
+                    )
+                tails.append((pattern, r, r_keys))
+            self._by_suffix.setdefault(suffix, []).append((ends_in_i, tails))
+        self._suffix_lengths = sorted({len(s) for s in self._by_suffix}, reverse=True)
+
+    @classmethod
+    def learn(cls, rows: Iterable[Sequence[str] | LexiconEntry]) -> Analyser:
+        rules: dict[RuleKey, dict[Reversal, int]] = {}
+        for result in decline.decline_many(rows):
+            if not result.ok:
+                continue
+            assert result.entry is not None and result.declension is not None
+            entry = result.entry
+            abs_sg, suf_sg = _split(entry)
+            suffixes = _suffixes(entry.paradigm_id, suf_sg, entry.suf_pl)
+            for slot in SLOTS:
+                form = getattr(result.declension, slot)
+                for suffix, ends_in_i in _slot_suffixes(suffixes, slot):
+                    stem = _strip(form, suffix, ends_in_i)
+                    if stem is not None:
+                        key = (entry.paradigm_id, suf_sg, entry.suf_pl, slot)
+                        counts = rules.setdefault(key, {})
+                        r = reversal(stem, abs_sg)
+                        counts[r] = counts.get(r, 0) + 1
+                        break
+        # the most common reversals are tried first
+        return cls(
+            {
+                key: sorted(counts, key=counts.__getitem__, reverse=True)
+                for key, counts in rules.items()
+            }
+        )
+
+    def __len__(self) -> int:
+        return sum(map(len, self.rules.values()))
+
+    def candidates(self, form: str) -> Iterable[tuple[RuleKey, str]]:
+        # (key, abs_sg stem) pairs the form may come from, not yet checked
+        for n in self._suffix_lengths:
+            if n > len(form):
+                continue
+            options = self._by_suffix.get(form[len(form) - n :])
+            if options is None:
+                continue
+            stem = form[: len(form) - n]
+            if not stem:
+                continue
+            for ends_in_i, reversals in options:
+                if ends_in_i is not None and stem.endswith("i") != ends_in_i:
+                    continue
+                for pattern, (_, replacement), keys in reversals:
+                    m = pattern.match(stem)
+                    if m is None:
+                        continue
+                    abs_sg = m["prefix"] + "".join(
+                        c if isinstance(c, str) else m[_group(c)] for c in replacement
+                    )
+                    for key in keys:
+                        yield key, abs_sg
+
+    def analyse(self, form: str) -> list[Analysis]:
+        analyses: dict[Analysis, None] = {}
+        declined: dict[tuple[str, str, bool, str], Optional[Declension]] = {}
+        for (paradigm_id, suf_sg, suf_pl, slot), stem in self.candidates(form):
+            abs_sg = stem + _suffixes(paradigm_id, suf_sg, suf_pl).abs_sg
+            has_suf = suf_sg != "-"
+            key = (paradigm_id, abs_sg, has_suf, suf_pl)
+            if key not in declined:
+                # a candidate its paradigm cannot decline is no match, whatever
+                # the rules raise for it, as in `decline.decline_entry`
+                try:
+                    declined[key] = decline.decline_by_paradigm(*key)
+                except Exception:
+                    declined[key] = None
+            declension = declined[key]
+            if declension is not None and getattr(declension, slot) == form:
+                analyses[
+                    Analysis(declension.abs_sg, paradigm_id, slot, has_suf, suf_pl)
+                ] = None
+        return list(analyses)
+
+
+_suffix_cache: dict[tuple[str, str, str], DeclensionSuffixes] = {}
+_NO_SUFFIXES = DeclensionSuffixes("", "", "", "", "", "")
+
+
+def _suffixes(paradigm_id: str, suf_sg: str, suf_pl: str) -> DeclensionSuffixes:
+    # foreign paradigms are not built from suffixes: their whole forms are
+    # reversed instead
+    key = (paradigm_id, suf_sg, suf_pl)
+    suffixes = _suffix_cache.get(key)
+    if suffixes is None:
+        if paradigm_id in decline.FOREIGN_PARADIGMS:
+            suffixes = _NO_SUFFIXES
+        else:
+            suffixes = decline.make_suffixes(suf_sg, suf_pl)
+        _suffix_cache[key] = suffixes
+    return suffixes
+
+
+def _split(entry: LexiconEntry) -> tuple[str, str]:
+    if entry.paradigm_id in decline.FOREIGN_PARADIGMS:
+        return entry.word, "-"
+    abs_sg, suf_sg = decline.split_singular_suffix(
+        entry.paradigm_id, entry.word, entry.has_suf
+    )
+    return abs_sg, decline.adjust_suf_sg(abs_sg, suf_sg)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="the lemmas an inflected form may come from"
+    )
+    parser.add_argument("forms", nargs="+")
+    parser.add_argument(
+        "--train", default=TEST_DATA, help="lexicon to learn the reverse rules from"
+    )
+    args = parser.parse_args(argv)
+
+    analyser = Analyser.learn(decline.read_rows(args.train))
+    for form in args.forms:
+        for a in analyser.analyse(form):
+            print(f"{form}\t{a.abs_sg}\t{a.paradigm_id}\t{a.slot}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,1321 @@
+from __future__ import annotations
+import argparse
+import enum
+import itertools
+import json
+import os
+import platform
+import re
+import sys
+import random
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Iterator, cast
+
+import analyser
+import candidates
+import decline
+import declension_file
+import disk_cache
+import form_index
+import grouped
+import render
+import shard
+import shm_cache
+import synth
+
+TEST_DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "test-data.tsv")
+
+
+def load_rows(path: str = TEST_DATA) -> list[list[str]]:
+    return list(decline.read_rows(path))
+
+
+def repeat_rows(rows: list[list[str]], n: int) -> Iterator[list[str]]:
+    return itertools.islice(itertools.cycle(rows), n)
+
+
+def bench_parallel(n_rows: int, jobs: list[int], chunk_size: int) -> None:
+    rows = load_rows()
+    base = None
+    for j in jobs:
+        start = time.perf_counter()
+        count = 0
+        for _ in decline.decline_parallel(repeat_rows(rows, n_rows), j, chunk_size):
+            count += 1
+        elapsed = time.perf_counter() - start
+        base = base or elapsed
+        print(
+            f"jobs={j:<3} rows={count} time={elapsed:.2f}s "
+            f"rows/s={count / elapsed:,.0f} speedup={base / elapsed:.2f}x"
+        )
+
+
+def _run_all(entries: list[decline.LexiconEntry], compiled: bool) -> list[str]:
+    out = []
+    for e in entries:
+        try:
+            d = decline.decline_by_paradigm(
+                e.paradigm_id, e.word, e.has_suf, e.suf_pl, compiled=compiled
+            )
+        except Exception as ex:
+            out.append(f"{type(ex).__name__}: {ex}")
+        else:
+            out.append(repr(d))
+    return out
+
+
+def bench_compile(repeat: int) -> None:
+    entries = [decline.parse_row(r) for r in load_rows()]
+    outputs = {}
+    for compiled in (False, True):
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            outputs[compiled] = _run_all(entries, compiled)
+            best = min(best, time.perf_counter() - start)
+        name = "compiled" if compiled else "interpreted"
+        print(f"{name:<12} best={best:.3f}s rows/s={len(entries) / best:,.0f}")
+    mismatches = sum(a != b for a, b in zip(outputs[False], outputs[True]))
+    print(f"identical={mismatches == 0} mismatches={mismatches}")
+
+
+def _split_word(entry: decline.LexiconEntry) -> tuple[str, str]:
+    if not entry.has_suf:
+        return entry.word, "-"
+    suf_sg = next(s for s in decline.SINGULAR_SUFFIX if entry.word.endswith(s))
+    return entry.word[: -len(suf_sg)], suf_sg
+
+
+def _sample_words(n_words: int) -> list[tuple[str, str, str]]:
+    # (abs_sg, suf_sg, suf_pl) of b_* rows whose suffixes `decline` knows
+    words = {
+        _split_word(e) + (e.suf_pl,)
+        for e in map(decline.parse_row, load_rows())
+        if e.paradigm_id.startswith("b_") and e.suf_pl in decline.SUF_PL_TO_SUF_CON_PL
+    }
+    return sorted(w for w in words if w[1] in decline.SUF_SG_TO_SUF_GEN)[:n_words]
+
+
+def bench_all_paradigms(n_words: int) -> None:
+    words = _sample_words(n_words)
+
+    def naive(word: str, suf_sg: str, suf_pl: str) -> dict:
+        return {
+            paradigm_id: decline.decline(word, suf_sg, suf_pl, paradigm)
+            for paradigm_id, paradigm in decline.paradigm_parameters.items()
+        }
+
+    timings = {}
+    outputs = {}
+    for name, fn in (("naive", naive), ("shared", decline.decline_all_paradigms)):
+        start = time.perf_counter()
+        outputs[name] = [fn(*w) for w in words]
+        timings[name] = time.perf_counter() - start
+        print(
+            f"{name:<7} words={len(words)} time={timings[name]:.2f}s "
+            f"words/s={len(words) / timings[name]:,.0f}"
+        )
+    print(
+        f"speedup={timings['naive'] / timings['shared']:.2f}x "
+        f"identical={outputs['naive'] == outputs['shared']}"
+    )
+
+
+def bench_candidates(n_words: int) -> None:
+    words = _sample_words(n_words)
+    paradigms = decline.paradigm_parameters
+
+    def try_all(word: str, suf_sg: str, suf_pl: str) -> list[str]:
+        return [
+            paradigm_id
+            for paradigm_id, paradigm in paradigms.items()
+            if decline.decline(word, suf_sg, suf_pl, paradigm) is not None
+        ]
+
+    def try_candidates(word: str, suf_sg: str, suf_pl: str) -> list[str]:
+        return [
+            paradigm_id
+            for paradigm_id in candidates.candidate_paradigms(word, suf_sg, suf_pl)
+            if decline.decline(word, suf_sg, suf_pl, paradigms[paradigm_id]) is not None
+        ]
+
+    n_candidates = sum(len(candidates.candidate_paradigms(*w)) for w in words)
+    print(
+        f"words={len(words)} paradigms={len(paradigms)} "
+        f"candidates/word={n_candidates / len(words):.1f} "
+        f"pruned={1 - n_candidates / (len(words) * len(paradigms)):.1%}"
+    )
+    timings = {}
+    outputs = {}
+    for name, fn in (("all", try_all), ("candidates", try_candidates)):
+        start = time.perf_counter()
+        outputs[name] = [fn(*w) for w in words]
+        timings[name] = time.perf_counter() - start
+        print(f"{name:<10} words/s={len(words) / timings[name]:,.0f}")
+    print(
+        f"speedup={timings['all'] / timings['candidates']:.2f}x "
+        f"identical={outputs['all'] == outputs['candidates']}"
+    )
+
+
+RULE_ENUMS = (decline.REConSG, decline.REGenSG, decline.REAbsPL, decline.REConPL)
+
+
+def _rule_inputs(limit: int) -> dict[decline.TrySubMixin, list[str]]:
+    # the words every rule is actually tried on when declining test-data.tsv
+    inputs: dict[decline.TrySubMixin, list[str]] = {
+        rule: [] for enum in RULE_ENUMS for rule in enum
+    }
+    try_sub = decline.TrySubMixin.try_sub
+
+    def recording_try_sub(self, word):
+        if len(inputs[self]) < limit:
+            inputs[self].append(word)
+        return try_sub(self, word)
+
+    decline.TrySubMixin.try_sub = recording_try_sub  # type: ignore[method-assign]
+    try:
+        for row in load_rows():
+            entry = decline.parse_row(row)
+            for paradigm_id, paradigm in decline.paradigm_parameters.items():
+                try:
+                    word, suf_sg = _split_word(entry)
+                    decline.decline(word, suf_sg, entry.suf_pl, paradigm)
+                except Exception:
+                    pass
+    finally:
+        decline.TrySubMixin.try_sub = try_sub  # type: ignore[method-assign]
+    return inputs
+
+
+def _time_calls(fn, words: list[str], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for w in words:
+            fn(w)
+        best = min(best, time.perf_counter() - start)
+    return best / len(words)
+
+
+class _SearchSub:
+    # `TrySubMixin.try_sub` before the rule engine, reading the compiled
+    # pattern and replacement through the member's value on every call
+    value: tuple[re.Pattern, str | Callable[[re.Match], str]]
+
+    def try_sub(self, word: str) -> str | None:
+        if self.value[0].search(word):
+            return self.value[0].sub(self.value[1], word)
+        return None
+
+
+def _search_sub_rules() -> dict[decline.TrySubMixin, Callable[[str], str | None]]:
+    # every rule as it was declared before the rule engine: a member whose
+    # value is the compiled pattern and the replacement
+    old: dict[decline.TrySubMixin, Callable[[str], str | None]] = {}
+    for rules in RULE_ENUMS:
+        members = {
+            r.name: (re.compile(r.pattern.pattern, r.pattern.flags), r.repl)
+            for r in rules
+        }
+        old_rules = enum.Enum(rules.__name__, members, type=_SearchSub)  # type: ignore[misc]
+        for rule in rules:
+            old[rule] = cast(_SearchSub, old_rules[rule.name]).try_sub
+    return old
+
+
+def bench_rules(n_inputs: int, repeat: int) -> None:
+    inputs = _rule_inputs(n_inputs)
+    print(
+        f"{'rule':<14} {'inputs':>6} {'matched':>7} {'search+sub':>10} {'try_sub':>8}"
+    )
+    total_old = total_new = 0.0
+    old_rules = _search_sub_rules()
+    for rule, words in inputs.items():
+        if not words:
+            words = [e.word for e in map(decline.parse_row, load_rows()[:n_inputs])]
+        search_sub = old_rules[rule]
+        assert all(search_sub(w) == rule.try_sub(w) for w in words)
+        old = _time_calls(search_sub, words, repeat)
+        new = _time_calls(rule.try_sub, words, repeat)
+        total_old += old
+        total_new += new
+        matched = sum(rule.try_sub(w) is not None for w in words) / len(words)
+        print(
+            f"{str(rule):<14} {len(words):>6} {matched:>7.0%} "
+            f"{old * 1e9:>8.0f}ns {new * 1e9:>6.0f}ns"
+        )
+    print(f"mean speedup={total_old / total_new:.2f}x")
+
+
+def bench_form_index(n_rows: int, n_lookups: int) -> None:
+    rows = load_rows()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "forms.idx")
+        start = time.perf_counter()
+        n_lemmas = form_index.build_index(repeat_rows(rows, n_rows), path)
+        build = time.perf_counter() - start
+        size = os.path.getsize(path)
+
+        start = time.perf_counter()
+        index = form_index.FormIndex(path)
+        opened = time.perf_counter() - start
+        print(
+            f"lemmas={n_lemmas} forms={index.n_forms} postings={index.n_postings} "
+            f"build={build:.2f}s size={size / 2**20:.1f}MiB "
+            f"bytes/lemma={size / max(n_lemmas, 1):.0f} open={opened * 1e3:.2f}ms"
+        )
+
+        rng = random.Random(0)
+        forms = [
+            getattr(r.declension, rng.choice(decline.SLOTS)) or r.entry.word
+            for r in rng.sample(list(decline.decline_many(rows[:5000])), 1000)
+            if r.ok and r.entry is not None
+        ]
+        for name, queries in (("hit", forms), ("miss", [f + "x" for f in forms])):
+            queries = [rng.choice(queries) for _ in range(n_lookups)]
+            latencies = []
+            for q in queries:
+                start = time.perf_counter()
+                index.lookup(q)
+                latencies.append(time.perf_counter() - start)
+            latencies.sort()
+            print(
+                f"lookup {name:<4} p50={latencies[len(latencies) // 2] * 1e6:.1f}us "
+                f"p99={latencies[int(len(latencies) * 0.99)] * 1e6:.1f}us"
+            )
+        index.close()
+
+
+def _traced_bytes(build) -> tuple[object, int]:
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        built = build()
+        return built, tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+
+
+def bench_table(n_rows: int) -> None:
+    rows = list(repeat_rows(load_rows(), n_rows))
+    objects, object_bytes = _traced_bytes(
+        lambda: [r.declension for r in decline.decline_many(rows)]
+    )
+    table, table_bytes = _traced_bytes(lambda: decline.decline_table(rows))
+    assert isinstance(table, decline.DeclensionTable)
+    assert list(table) == objects
+    for name, size in (
+        ("Declension list", object_bytes),
+        ("DeclensionTable", table_bytes),
+    ):
+        print(f"{name:<16} {size / 2**20:8.1f}MiB {size / len(rows):8.1f} bytes/lemma")
+    print(f"{object_bytes / table_bytes:.1f}x smaller")
+
+
+def bench_declension_file(n_rows: int, repeat: int) -> None:
+    rows = list(repeat_rows(load_rows(), n_rows))
+    expected = [r for r in decline.decline_many(rows) if r.entry is not None]
+    with tempfile.TemporaryDirectory() as tmp:
+        table_path = os.path.join(tmp, "declensions.bin")
+        tsv_path = os.path.join(tmp, "declensions.tsv")
+        n_lemmas = declension_file.write_table(rows, table_path)
+        with open(tsv_path, "w") as f:
+            for r in expected:
+                if r.ok:
+                    print(decline.format_tsv(r), file=f)
+
+        # round trip: every lemma reads back as what decline_many returned
+        with declension_file.DeclensionFile(table_path) as table:
+            assert len(table) == n_lemmas == len(expected)
+            for lemma_id, r in enumerate(expected):
+                assert r.entry is not None
+                assert table.lemma(lemma_id) == r.entry.word
+                assert table.paradigm_id(lemma_id) == r.entry.paradigm_id
+                assert table.declension(lemma_id) == r.declension
+
+        def load_tsv() -> dict:
+            with open(tsv_path) as f:
+                return {
+                    (fields[0], fields[1]): decline.Declension(*fields[2:])
+                    for fields in (line.rstrip("\n").split("\t") for line in f)
+                }
+
+        def open_table() -> None:
+            declension_file.DeclensionFile(table_path).close()
+
+        def first_lookup() -> None:
+            with declension_file.DeclensionFile(table_path) as table:
+                table.declension(n_lemmas // 2)
+
+        print(
+            f"lemmas={n_lemmas} "
+            f"tsv={os.path.getsize(tsv_path) / 2**20:.1f}MiB "
+            f"table={os.path.getsize(table_path) / 2**20:.1f}MiB"
+        )
+        for name, fn in (
+            ("parse tsv", load_tsv),
+            ("open table", open_table),
+            ("open + 1 lookup", first_lookup),
+        ):
+            best = float("inf")
+            for _ in range(repeat):
+                start = time.perf_counter()
+                fn()
+                best = min(best, time.perf_counter() - start)
+            print(f"{name:<16} {best * 1e3:10.3f}ms")
+
+
+COLD_START = {
+    "import": "import decline",
+    "first declension": (
+        "import decline\n"
+        "decline.decline_by_paradigm('b_braxa', 'b3raxa!H', True, 'W!t')"
+    ),
+    "all rules compiled": (
+        "import decline\n"
+        "for rules in (decline.REConSG, decline.REGenSG, decline.REAbsPL, "
+        "decline.REConPL):\n"
+        "    for rule in rules:\n"
+        "        rule.compile()"
+    ),
+}
+
+
+def _cold_start(code: str, env: dict[str, str]) -> float:
+    script = (
+        "import time\n"
+        "start = time.perf_counter()\n"
+        f"{code}\n"
+        "print(time.perf_counter() - start)"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", script],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=os.path.dirname(TEST_DATA),
+    ).stdout
+    return float(out)
+
+
+def _import_time(env: dict[str, str]) -> int:
+    # cumulative microseconds of `import decline` as reported by -X importtime
+    err = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import decline"],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=os.path.dirname(TEST_DATA),
+    ).stderr
+    for line in err.splitlines():
+        if line.rstrip().endswith("| decline"):
+            return int(line.split("|")[1])
+    raise ValueError("decline missing from -X importtime output")
+
+
+def bench_cold_start(repeat: int) -> None:
+    env = dict(os.environ)
+    env.pop("DECLINE_RULE_SNAPSHOT", None)
+    with tempfile.TemporaryDirectory() as tmp:
+        # as deployed, with bytecode cached by an earlier run
+        env.pop("PYTHONDONTWRITEBYTECODE", None)
+        env["PYTHONPYCACHEPREFIX"] = os.path.join(tmp, "pycache")
+        _cold_start("import decline", env)
+        snapshot = os.path.join(tmp, "rules.snapshot")
+        decline.write_rule_snapshot(snapshot)
+        variants = {
+            "from source": env,
+            "snapshot": {**env, "DECLINE_RULE_SNAPSHOT": snapshot},
+        }
+        # variants take turns so that drift in machine load hits all of them
+        best: dict[tuple[str, str], float] = {}
+        for _ in range(repeat):
+            for variant, variant_env in variants.items():
+                timings = {"-X importtime": _import_time(variant_env) / 1e6}
+                for name, code in COLD_START.items():
+                    timings[name] = _cold_start(code, variant_env)
+                for name, t in timings.items():
+                    best[variant, name] = min(best.get((variant, name), t), t)
+        for (variant, name), t in best.items():
+            print(f"{variant:<12} {name:<20} {t * 1e3:8.2f}ms")
+
+
+def bench_render(repeat: int) -> None:
+    declensions = [r.declension for r in decline.decline_file(TEST_DATA)]
+    forms = [
+        getattr(d, slot) for d in declensions if d is not None for slot in decline.SLOTS
+    ]
+    rendered = render.render_table(declensions)
+    assert rendered == [
+        None if d is None else render.render_declension(d) for d in declensions
+    ]
+    assert [
+        getattr(d, slot) for d in rendered if d is not None for slot in decline.SLOTS
+    ] == [render.render(f) for f in forms]
+
+    for name, fn in (
+        ("render per form", lambda: [render.render(f) for f in forms]),
+        (
+            "render_declension",
+            lambda: [d and render.render_declension(d) for d in declensions],
+        ),
+        ("render_table", lambda: render.render_table(declensions)),
+    ):
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - start)
+        print(f"{name:<18} {len(forms) / best:>12,.0f} forms/s")
+
+
+def bench_grouped(n_rows: int, repeat: int) -> None:
+    rows = list(repeat_rows(load_rows(), n_rows))
+    entries = [decline.parse_row(r) for r in rows]
+    assert grouped.decline_grouped(entries) == list(decline.decline_many(entries))
+
+    # the stages alone: the same groups declined row by row and column-wise
+    groups: dict[grouped.GroupKey, list[str]] = {}
+    for e in entries:
+        if e.paradigm_id not in decline.paradigm_parameters:
+            continue
+        try:
+            abs_sg, suf_sg = decline.split_singular_suffix(
+                e.paradigm_id, e.word, e.has_suf
+            )
+            suf_sg = decline.adjust_suf_sg(abs_sg, suf_sg)
+            decline.get_compiled_paradigm(e.paradigm_id, suf_sg, e.suf_pl)(abs_sg)
+        except Exception:
+            continue
+        groups.setdefault((e.paradigm_id, suf_sg, e.suf_pl), []).append(abs_sg)
+    n_grouped = sum(map(len, groups.values()))
+
+    def per_row() -> list:
+        return [
+            [decline.get_compiled_paradigm(*key)(w) for w in words]
+            for key, words in groups.items()
+        ]
+
+    def column() -> list:
+        return [grouped.decline_column(*key, words) for key, words in groups.items()]
+
+    assert per_row() == column()
+    print(f"rows={len(entries)} groups={len(groups)} grouped rows={n_grouped}")
+    timings = {}
+    for name, fn, n in (
+        ("decline_many", lambda: list(decline.decline_many(entries)), len(entries)),
+        ("decline_grouped", lambda: grouped.decline_grouped(entries), len(entries)),
+        ("stages per row", per_row, n_grouped),
+        ("stages column", column, n_grouped),
+    ):
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - start)
+        timings[name] = best
+        print(f"{name:<16} {n / best:>12,.0f} rows/s")
+    print(
+        f"speedup={timings['decline_many'] / timings['decline_grouped']:.2f}x "
+        f"stages={timings['stages per row'] / timings['stages column']:.2f}x"
+    )
+
+
+def bench_possessives(repeat: int) -> None:
+    entries = [
+        e for e in map(decline.parse_row, load_rows()) if e.paradigm_id.startswith("b_")
+    ]
+
+    def run(possessives, compiled: bool = True) -> list:
+        out = []
+        for e in entries:
+            try:
+                out.append(
+                    decline.decline_by_paradigm(
+                        e.paradigm_id,
+                        e.word,
+                        e.has_suf,
+                        e.suf_pl,
+                        compiled=compiled,
+                        possessives=possessives,
+                    )
+                )
+            except Exception:
+                out.append(None)
+        return out
+
+    six = run(False)
+    full = run(True)
+    assert full == six
+    # the compiled paradigms build the same forms as `decline`
+    for other in (run("lazy"), run(True, compiled=False)):
+        assert [d and d.possessives for d in full] == [d and d.possessives for d in other]
+    n_forms = sum(d is not None for d in six)
+    print(f"rows={len(entries)} declined={n_forms}")
+    base = None
+    for name, fn, forms in (
+        ("6 forms", lambda: run(False), 6),
+        ("26 forms", lambda: run(True), 26),
+        ("26 forms, lazy", lambda: run("lazy"), 6),
+        (
+            "lazy, read all",
+            lambda: [d and (d.possessives.sg, d.possessives.pl) for d in run("lazy")],
+            26,
+        ),
+    ):
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - start)
+        base = base or best
+        print(
+            f"{name:<16} rows/s={len(entries) / best:>10,.0f} "
+            f"forms/s={n_forms * forms / best:>12,.0f} cost={best / base:.2f}x"
+        )
+
+
+def bench_disk_cache(n_rows: int, batch_size: int) -> None:
+    rows = list(repeat_rows(load_rows(), n_rows))
+    entries = [decline.parse_row(r) for r in rows]
+    expected = list(decline.decline_many(entries))
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "declensions.sqlite")
+        # every run opens the cache afresh, as a restarted worker would
+        for name in ("no cache", "cold", "warm"):
+            start = time.perf_counter()
+            if name == "no cache":
+                results = list(decline.decline_many(entries))
+                stats = ""
+            else:
+                with disk_cache.DiskCache(path) as cache:
+                    results = list(decline.decline_many(entries, cache, batch_size))
+                    stats = " ".join(f"{k}={v}" for k, v in cache.stats().items())
+            elapsed = time.perf_counter() - start
+            assert results == expected
+            print(
+                f"{name:<9} rows/s={len(entries) / elapsed:>10,.0f} "
+                f"time={elapsed:.2f}s {stats}"
+            )
+        print(f"db={os.path.getsize(path) / 2**20:.1f}MiB")
+
+
+_worker_cache: decline.DeclensionCache | shm_cache.SharedDeclensionCache | None = None
+
+
+def _init_worker(cache) -> None:
+    global _worker_cache
+    _worker_cache = cache if cache is not None else decline.DeclensionCache(1 << 20)
+
+
+def _cached_chunk(chunk: list[decline.LexiconEntry]) -> tuple[int, int, int, int]:
+    # the worker's pid, the hits and misses of this chunk and the entries in
+    # the worker's private cache afterwards (0 for the shared one)
+    cache = _worker_cache
+    assert cache is not None
+    cache.reset_stats()
+    for entry in chunk:
+        decline.decline_entry(entry, cache)
+    stats = cache.stats()
+    if isinstance(stats, decline.CacheStats):
+        return os.getpid(), stats.hits, stats.misses, stats.size
+    return os.getpid(), stats["hits"], stats["misses"], 0
+
+
+def bench_shm_cache(n_rows: int, workers: int, repeat: int) -> None:
+    from multiprocessing import Pool
+
+    rows = list(repeat_rows(load_rows(), n_rows))
+    random.Random(0).shuffle(rows)
+    entries = [decline.parse_row(r) for r in rows]
+    keys = list({(e.paradigm_id, e.word, e.has_suf, e.suf_pl): None for e in entries})
+    # two to four slots per distinct lemma
+    slots = 1 << (2 * len(keys) - 1).bit_length()
+
+    # hit latency in one process, with every key already cached
+    with shm_cache.SharedDeclensionCache(slots=slots) as shared:
+        private, private_bytes = _traced_bytes(
+            lambda: decline.DeclensionCache(1 << 20)
+        )
+        for key in keys:
+            shared.decline(*key)
+        _, private_bytes = _traced_bytes(
+            lambda: [private.decline(*key) for key in keys]  # type: ignore[attr-defined]
+        )
+        assert isinstance(private, decline.DeclensionCache)
+        bytes_per_entry = private_bytes / len(private)
+        # a slot lost to a collision is a miss, never a wrong answer
+        found = [(k, shared.get(k)) for k in keys]
+        assert all(d == private.decline(*k) for k, (hit, d) in found if hit)
+        print(
+            f"lemmas={len(keys)} slots={slots} "
+            f"lost={sum(not hit for _, (hit, _) in found)}"
+        )
+        sample = keys[:20000]
+        for name, fn in (
+            ("private hit", lambda: [private.decline(*k) for k in sample]),
+            ("shared hit", lambda: [shared.get(k) for k in sample]),
+            (
+                "no cache",
+                lambda: [decline.decline_by_paradigm(*k) for k in sample],
+            ),
+        ):
+            best = float("inf")
+            for _ in range(repeat):
+                start = time.perf_counter()
+                fn()
+                best = min(best, time.perf_counter() - start)
+            print(f"{name:<12} {best / len(sample) * 1e9:8.0f}ns/lookup")
+
+    # the same rows spread over the workers of a pool, in chunks. a private
+    # cache is costed at what a DeclensionCache entry takes in this process
+    chunks = list(decline.chunked(entries, 2000))
+    with shm_cache.SharedDeclensionCache(slots=slots) as shared:
+        for name, cache in (("private", None), ("shared", shared)):
+            start = time.perf_counter()
+            with Pool(workers, _init_worker, (cache,)) as pool:
+                counts = pool.map(_cached_chunk, chunks, chunksize=1)
+            elapsed = time.perf_counter() - start
+            hits = sum(c[1] for c in counts)
+            misses = sum(c[2] for c in counts)
+            sizes: dict[int, int] = {}
+            for pid, _, _, size in counts:
+                sizes[pid] = max(sizes.get(pid, 0), size)
+            memory = (
+                shared.nbytes if cache is not None else sum(sizes.values()) * bytes_per_entry
+            )
+            print(
+                f"{name:<8} workers={workers} rows/s={len(entries) / elapsed:>9,.0f} "
+                f"hit rate={hits / (hits + misses):.1%} "
+                f"memory={memory / 2**20:.1f}MiB"
+            )
+
+
+def bench_shard(n_rows: int, n_shards: int, repeat: int) -> None:
+    # each shard is declined in its own directory, standing in for a node; the
+    # balance is the slowest shard's time over the mean. the rows are sorted by
+    # paradigm, as in a lexicon kept per paradigm, so shards differ in their mix
+    rows = sorted(repeat_rows(load_rows(), n_rows), key=lambda r: r[0])
+    expected = [
+        decline.format_tsv(r) for r in decline.decline_many(rows) if r.ok
+    ]
+    by_rows = {r[0]: 1.0 for r in rows if r}
+    with tempfile.TemporaryDirectory() as tmp:
+        lexicon = os.path.join(tmp, "lexicon.tsv")
+        with open(lexicon, "w", encoding="utf-8") as f:
+            f.write("\t".join(shard.HEADER) + "\n")
+            f.writelines("\t".join(r) + "\n" for r in rows)
+        for name, costs in (("rows", by_rows), ("cost", None)):
+            run = os.path.join(tmp, name)
+            manifest = shard.split(lexicon, run, n_shards, costs)
+            manifest_path = os.path.join(run, shard.MANIFEST)
+            nodes = [os.path.join(run, f"node{i}") for i in range(n_shards)]
+            times = []
+            for s, node in zip(manifest.shards, nodes):
+                best = float("inf")
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    shard.work(manifest_path, s.index, node)
+                    best = min(best, time.perf_counter() - start)
+                times.append(best)
+            output = os.path.join(run, "merged.tsv")
+            shard.merge(manifest_path, output, nodes)
+            with open(output, encoding="utf-8") as f:
+                assert f.read().splitlines() == expected
+            mean = sum(times) / len(times)
+            print(
+                f"split by {name:<4} shards={len(times)} "
+                f"rows={'/'.join(str(s.rows) for s in manifest.shards)} "
+                f"times={'/'.join(f'{t:.2f}' for t in times)} "
+                f"balance={max(times) / mean:.2f}x"
+            )
+
+
+# each mode runs in a fresh process so its peak RSS is its own; the lexicon is
+# streamed from disk except where the mode keeps every row
+SCALING = {
+    "stream": (
+        "for _ in decline.decline_many(decline.read_rows(path)):\n"
+        "    pass"
+    ),
+    "cache": (
+        "cache = decline.DeclensionCache(1 << 22)\n"
+        "for _ in decline.decline_many(decline.read_rows(path), cache):\n"
+        "    pass"
+    ),
+    "table": "table = decline.decline_table(decline.read_rows(path))",
+    "form-index": (
+        "import form_index\n"
+        "form_index.build_index(decline.read_rows(path), path + '.index')"
+    ),
+    "parallel": (
+        "import os\n"
+        "for _ in decline.decline_parallel(decline.read_rows(path), "
+        "os.cpu_count() or 1):\n"
+        "    pass"
+    ),
+}
+
+
+def _scaling_run(code: str, path: str) -> tuple[float, int]:
+    # seconds and the peak RSS in bytes of the largest process, workers included
+    script = (
+        "import resource, sys, time\n"
+        "import decline\n"
+        "path = sys.argv[1]\n"
+        "start = time.perf_counter()\n"
+        f"{code}\n"
+        "elapsed = time.perf_counter() - start\n"
+        "rss = max(resource.getrusage(who).ru_maxrss for who in "
+        "(resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN))\n"
+        "print(elapsed, rss * 1024)"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", script, path],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=os.path.dirname(TEST_DATA),
+    ).stdout
+    elapsed, rss = out.split()
+    return float(elapsed), int(rss)
+
+
+def _fired_rules(rows: Iterator[list[str]]) -> set[decline.TrySubMixin]:
+    # the rules that match a word of `rows`. a lazy rule shadows `try_sub`
+    # until it is compiled, and then calls the class's
+    fired: set[decline.TrySubMixin] = set()
+    try_sub = decline.TrySubMixin.try_sub
+
+    def recording_try_sub(self, word):
+        result = try_sub(self, word)
+        if result is not None:
+            fired.add(self)
+        return result
+
+    decline.TrySubMixin.try_sub = recording_try_sub  # type: ignore[method-assign]
+    try:
+        # through `decline`: compiled paradigms have bound the unpatched method
+        for row in rows:
+            entry = decline.parse_row(row)
+            paradigm = decline.paradigm_parameters.get(entry.paradigm_id)
+            if paradigm is None:
+                continue
+            try:
+                abs_sg, suf_sg = decline.split_singular_suffix(
+                    entry.paradigm_id, entry.word, entry.has_suf
+                )
+                suf_sg = decline.adjust_suf_sg(abs_sg, suf_sg)
+                decline.decline(abs_sg, suf_sg, entry.suf_pl, paradigm)
+            except Exception:
+                pass
+    finally:
+        decline.TrySubMixin.try_sub = try_sub  # type: ignore[method-assign]
+    return fired
+
+
+def _pyplot():
+    # optional, and without type stubs: only `scaling --plot` needs it
+    try:
+        import matplotlib  # type: ignore[import-not-found]
+    except ImportError:
+        raise SystemExit("--plot needs matplotlib") from None
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt  # type: ignore[import-not-found]
+
+    return plt
+
+
+def bench_scaling(
+    sizes: list[int],
+    modes: list[str],
+    seed: int,
+    csv_path: str | None,
+    plot_path: str | None,
+) -> None:
+    # before the runs, so a missing matplotlib does not cost them
+    plt = _pyplot() if plot_path else None
+    generator = synth.Generator.from_lexicon()
+    rules = [rule for enum in RULE_ENUMS for rule in enum]
+    fired = _fired_rules(generator.rows(min(sizes), seed))
+    print(f"rules fired on {min(sizes)} rows: {len(fired)} of {len(rules)}")
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            path = os.path.join(tmp, f"lexicon-{size}.tsv")
+            start = time.perf_counter()
+            synth.write_lexicon(path, size, seed, generator)
+            generated = time.perf_counter() - start
+            print(
+                f"{size:>11,} rows generated in {generated:.1f}s "
+                f"({os.path.getsize(path) / 2**20:.1f}MiB)"
+            )
+            for mode in modes:
+                elapsed, rss = _scaling_run(SCALING[mode], path)
+                results.append((size, mode, size / elapsed, rss))
+                print(
+                    f"{size:>11,} {mode:<10} rows/s={size / elapsed:>10,.0f} "
+                    f"peak rss={rss / 2**20:8.1f}MiB"
+                )
+            os.remove(path)
+    if csv_path:
+        with open(csv_path, "w", encoding="utf-8") as f:
+            f.write("rows,mode,rows_per_s,peak_rss_bytes\n")
+            for size, mode, rate, rss in results:
+                f.write(f"{size},{mode},{rate:.0f},{rss}\n")
+    if plt is not None:
+        fig, (throughput, memory) = plt.subplots(1, 2, figsize=(11, 4))
+        for mode in modes:
+            points = [r for r in results if r[1] == mode]
+            xs = [r[0] for r in points]
+            throughput.plot(xs, [r[2] for r in points], marker="o", label=mode)
+            memory.plot(xs, [r[3] / 2**20 for r in points], marker="o", label=mode)
+        for ax, label in ((throughput, "rows/s"), (memory, "peak RSS (MiB)")):
+            ax.set_xscale("log")
+            ax.set_xlabel("lexicon rows")
+            ax.set_ylabel(label)
+            ax.grid(True, alpha=0.3)
+        throughput.legend()
+        fig.tight_layout()
+        fig.savefig(plot_path)
+
+
+def bench_analyser(n_forms: int, repeat: int) -> None:
+    # the reverse rules are learned from every other row of test-data.tsv and
+    # the forms of the rows in between are analysed, as words the lexicon
+    # does not have. recall is the share of forms whose own lemma, paradigm
+    # and slot are among the analyses
+    rows = load_rows()
+    learned, learned_bytes = _traced_bytes(lambda: analyser.Analyser.learn(rows[::2]))
+    assert isinstance(learned, analyser.Analyser)
+    forms = [
+        (getattr(r.declension, slot), r.declension.abs_sg, r.entry.paradigm_id, slot)
+        for r in decline.decline_many(rows[1::2])
+        if r.ok and r.entry is not None and r.declension is not None
+        for slot in decline.SLOTS
+    ][:n_forms]
+    found = analyses = proposed = 0
+    for form, abs_sg, paradigm_id, slot in forms:
+        results = learned.analyse(form)
+        analyses += len(results)
+        proposed += sum(1 for _ in learned.candidates(form))
+        found += any(
+            (a.abs_sg, a.paradigm_id, a.slot) == (abs_sg, paradigm_id, slot)
+            for a in results
+        )
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for form, *_ in forms:
+            learned.analyse(form)
+        best = min(best, time.perf_counter() - start)
+    print(
+        f"reversals={len(learned)} memory={learned_bytes / 2**20:.1f}MiB "
+        f"forms={len(forms)}"
+    )
+    print(
+        f"recall={found / len(forms):.2%} "
+        f"proposed/form={proposed / len(forms):.1f} "
+        f"analyses/form={analyses / len(forms):.1f} "
+        f"analyses/s={len(forms) / best:,.0f}"
+    )
+
+
+def _scan_split(paradigm_id: str, word: str, has_suf: bool) -> tuple[str, str]:
+    # the front end before it was table driven, for comparison
+    if not has_suf:
+        return word, "-"
+    suf_sg = next(s for s in decline.SINGULAR_SUFFIX if word.endswith(s))
+    if suf_sg == "At":
+        suf_sg = "Et"
+    abs_sg = word[: -len(suf_sg)]
+    if paradigm_id in ["b_shxena", "b_milcama", "b_atara", "b_ayala", "b_yoleda"]:
+        suf_sg = "a!H_Et"
+    return abs_sg, suf_sg
+
+
+def bench_front_end(repeat: int) -> None:
+    entries = [decline.parse_row(r) for r in load_rows()]
+    bound = []
+    for e in entries:
+        if not e.paradigm_id.startswith("b_"):
+            continue
+        try:
+            decline.decline_by_paradigm(e.paradigm_id, e.word, e.has_suf, e.suf_pl)
+        except Exception:
+            continue
+        bound.append(e)
+    foreign = [e for e in entries if e.paradigm_id in decline.FOREIGN_PARADIGMS]
+
+    def scan(paradigm_id: str, word: str, has_suf: bool) -> str:
+        abs_sg, suf_sg = _scan_split(paradigm_id, word, has_suf)
+        return decline.adjust_suf_sg(abs_sg, suf_sg)
+
+    def table(paradigm_id: str, word: str, has_suf: bool) -> str:
+        abs_sg, suf_sg = decline.split_singular_suffix(paradigm_id, word, has_suf)
+        return decline.adjust_suf_sg(abs_sg, suf_sg)
+
+    # the split and the suffix adjustment alone, old and new, interleaved in
+    # each repeat so both see the same machine
+    split_args = [(e.paradigm_id, e.word, e.has_suf) for e in bound]
+    groups = {
+        "all rows": split_args,
+        "with suffix": [a for a in split_args if a[2]],
+    }
+    for name, calls in groups.items():
+        assert [scan(*a) for a in calls] == [table(*a) for a in calls]
+        best: dict[Callable[[str, str, bool], str], float] = {
+            scan: float("inf"),
+            table: float("inf"),
+        }
+        for _ in range(repeat):
+            for fn in best:
+                start = time.perf_counter()
+                for a in calls:
+                    fn(*a)
+                best[fn] = min(best[fn], time.perf_counter() - start)
+        old, new = best[scan] / len(calls), best[table] / len(calls)
+        print(
+            f"front end, {name:<11} rows={len(calls):>6} scan={old * 1e9:5.0f}ns "
+            f"table={new * 1e9:5.0f}ns speedup={old / new:.2f}x"
+        )
+
+    def by_paradigm(rows: list[decline.LexiconEntry]) -> None:
+        for e in rows:
+            decline.decline_by_paradigm(e.paradigm_id, e.word, e.has_suf, e.suf_pl)
+
+    for name, rows in (("b_* rows", bound), ("f_* rows", foreign)):
+        best_time = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            by_paradigm(rows)
+            best_time = min(best_time, time.perf_counter() - start)
+        print(f"{name:<16} {best_time / len(rows) * 1e9:8.0f}ns/row")
+
+
+STAGES = ("front", "con_sg", "gen_sg", "abs_pl", "con_pl", "foreign")
+
+
+def _try_decline(e: decline.LexiconEntry) -> None:
+    try:
+        decline.decline_by_paradigm(e.paradigm_id, e.word, e.has_suf, e.suf_pl)
+    except Exception:
+        pass
+
+
+def _try_decline_all(entries: list[decline.LexiconEntry]) -> None:
+    for e in entries:
+        _try_decline(e)
+
+
+def _time_stages(entries: list[decline.LexiconEntry]) -> dict[str, list[int]]:
+    # [calls, total ns] per stage of `decline`, timed around the same calls it
+    # makes. "front" is the suffix split, "foreign" a whole f_* declension
+    clock = time.perf_counter_ns
+    stages = {stage: [0, 0] for stage in STAGES}
+
+    def add(stage: str, start: int, end: int) -> None:
+        stages[stage][0] += 1
+        stages[stage][1] += end - start
+
+    for e in entries:
+        t0 = clock()
+        if not e.paradigm_id.startswith("b_"):
+            _try_decline(e)
+            add("foreign", t0, clock())
+            continue
+        try:
+            abs_sg, suf_sg = decline.split_singular_suffix(
+                e.paradigm_id, e.word, e.has_suf
+            )
+            suf_sg = decline.adjust_suf_sg(abs_sg, suf_sg)
+            paradigm = decline.paradigm_parameters[e.paradigm_id]
+        except (decline.UnknownSuffixError, KeyError):
+            continue
+        t1 = clock()
+        add("front", t0, t1)
+        con_sg = decline.make_con_sg_stem(abs_sg, suf_sg, paradigm.con_sg)
+        t2 = clock()
+        add("con_sg", t1, t2)
+        if con_sg is None:
+            continue
+        gen_sg = decline.make_gen_sg_stem(abs_sg, suf_sg, con_sg, paradigm.gen_sg)
+        t3 = clock()
+        add("gen_sg", t2, t3)
+        if gen_sg is None:
+            continue
+        abs_pl = decline.make_abs_pl_stem(paradigm.abs_pl, abs_sg, con_sg, gen_sg)
+        t4 = clock()
+        add("abs_pl", t3, t4)
+        if abs_pl is None:
+            continue
+        decline.make_con_pl_stem(paradigm.con_pl, abs_pl, gen_sg)
+        add("con_pl", t4, clock())
+    return stages
+
+
+def run_suite(path: str, repeat: int) -> dict:
+    entries = [decline.parse_row(r) for r in load_rows(path)]
+    by_paradigm: dict[str, list[decline.LexiconEntry]] = {}
+    for e in entries:
+        by_paradigm.setdefault(e.paradigm_id, []).append(e)
+
+    def best_of(fn) -> float:
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - start)
+        return best
+
+    metrics: dict[str, float] = {}
+    metrics["throughput.decline_many.rows_per_s"] = len(entries) / best_of(
+        lambda: sum(1 for _ in decline.decline_many(entries))
+    )
+    metrics["throughput.decline_by_paradigm.rows_per_s"] = len(entries) / best_of(
+        lambda: _try_decline_all(entries)
+    )
+
+    stage_ns: dict[str, float] = {}
+    for _ in range(repeat):
+        for stage, (calls, total) in _time_stages(entries).items():
+            if calls:
+                ns = total / calls
+                stage_ns[stage] = min(stage_ns.get(stage, ns), ns)
+    for stage, ns in stage_ns.items():
+        metrics[f"stage.{stage}.ns_per_call"] = ns
+
+    for paradigm_id, rows in sorted(by_paradigm.items()):
+        # small paradigms are looped over until a measurement covers ~2000 rows
+        rows = rows * -(-2000 // len(rows))
+        elapsed = best_of(lambda: _try_decline_all(rows))
+        metrics[f"paradigm.{paradigm_id}.us_per_row"] = elapsed / len(rows) * 1e6
+
+    return {
+        "meta": {
+            "input": os.path.basename(path),
+            "rows": len(entries),
+            "repeat": repeat,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "paradigm_rows": {p: len(rows) for p, rows in sorted(by_paradigm.items())},
+        "metrics": metrics,
+    }
+
+
+def compare_results(
+    results: dict, baseline: dict, threshold: float, min_rows: int
+) -> list[str]:
+    # metrics ending in "_per_s" are better when higher, all others when lower.
+    # per-paradigm timings over fewer than `min_rows` rows are too noisy to gate
+    regressions = []
+    for name, old in baseline["metrics"].items():
+        new = results["metrics"].get(name)
+        if new is None or old <= 0:
+            continue
+        if name.startswith("paradigm."):
+            paradigm_id = name.split(".")[1]
+            if results["paradigm_rows"].get(paradigm_id, 0) < min_rows:
+                continue
+        change = (new - old) / old
+        if name.endswith("_per_s"):
+            change = -change
+        if change > threshold:
+            regressions.append(
+                f"{name}: {old:,.2f} -> {new:,.2f} ({change:+.1%} worse)"
+            )
+    return regressions
+
+
+def bench_suite(
+    path: str,
+    repeat: int,
+    output: str | None,
+    baseline: str | None,
+    threshold: float,
+    min_rows: int,
+) -> int:
+    results = run_suite(path, repeat)
+    metrics = results["metrics"]
+    for name, value in metrics.items():
+        if not name.startswith("paradigm."):
+            print(f"{name:<45} {value:>12,.1f}")
+    slowest = sorted((v, k) for k, v in metrics.items() if k.startswith("paradigm."))[
+        ::-1
+    ][:10]
+    for value, name in slowest:
+        print(f"{name:<45} {value:>12,.2f}")
+    if output:
+        with open(output, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+    if baseline:
+        with open(baseline) as f:
+            regressions = compare_results(results, json.load(f), threshold, min_rows)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            return 1
+        print(f"no regressions beyond {threshold:.0%} against {baseline}")
+    return 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    sub = parser.add_subparsers(dest="bench", required=True)
+
+    p = sub.add_parser("parallel", help="scaling of decline_parallel over cores")
+    p.add_argument("--rows", type=int, default=1_000_000)
+    p.add_argument(
+        "--jobs",
+        type=lambda s: [int(x) for x in s.split(",")],
+        default=[1, 2, 4, 8, os.cpu_count() or 1],
+    )
+    p.add_argument("--chunk-size", type=int, default=2000)
+
+    p = sub.add_parser("compile", help="compiled vs interpreted paradigms")
+    p.add_argument("--repeat", type=int, default=5)
+
+    p = sub.add_parser("all-paradigms", help="decline_all_paradigms vs a loop")
+    p.add_argument("--words", type=int, default=2000)
+
+    p = sub.add_parser("candidates", help="paradigm pruning by rule preconditions")
+    p.add_argument("--words", type=int, default=20000)
+
+    p = sub.add_parser("rules", help="micro-benchmark of every TrySubMixin rule")
+    p.add_argument("--inputs", type=int, default=2000)
+    p.add_argument("--repeat", type=int, default=5)
+
+    p = sub.add_parser("form-index", help="reverse form index build and lookup")
+    p.add_argument("--rows", type=int, default=17057)
+    p.add_argument("--lookups", type=int, default=20000)
+
+    p = sub.add_parser("table", help="memory of a DeclensionTable vs Declensions")
+    p.add_argument("--rows", type=int, default=200_000)
+
+    p = sub.add_parser(
+        "declension-file", help="round trip and load time of the binary table"
+    )
+    p.add_argument("--rows", type=int, default=200_000)
+    p.add_argument("--repeat", type=int, default=5)
+
+    p = sub.add_parser("cold-start", help="import and time to first declension")
+    p.add_argument("--repeat", type=int, default=20)
+
+    p = sub.add_parser("render", help="pointed Hebrew rendering throughput")
+    p.add_argument("--repeat", type=int, default=5)
+
+    p = sub.add_parser("grouped", help="column-wise grouped vs per-row declining")
+    p.add_argument("--rows", type=int, default=200_000)
+    p.add_argument("--repeat", type=int, default=5)
+
+    p = sub.add_parser("possessives", help="cost of the 20 possessive forms")
+    p.add_argument("--repeat", type=int, default=5)
+
+    p = sub.add_parser("disk-cache", help="cold and warm runs of the sqlite cache")
+    p.add_argument("--rows", type=int, default=17057)
+    p.add_argument("--batch-size", type=int, default=1000)
+
+    p = sub.add_parser("shm-cache", help="shared-memory vs per-process caches")
+    p.add_argument("--rows", type=int, default=200_000)
+    p.add_argument("--workers", type=int, default=8)
+    p.add_argument("--repeat", type=int, default=5)
+
+    p = sub.add_parser("shard", help="balance of row- vs cost-weighted shards")
+    p.add_argument("--rows", type=int, default=200_000)
+    p.add_argument("--shards", type=int, default=8)
+    p.add_argument("--repeat", type=int, default=3)
+
+    p = sub.add_parser(
+        "scaling", help="throughput and memory against synthetic lexicon size"
+    )
+    p.add_argument(
+        "--sizes",
+        type=lambda s: [int(x) for x in s.split(",")],
+        default=[100_000, 300_000, 1_000_000],
+    )
+    p.add_argument(
+        "--modes",
+        type=lambda s: [m for m in s.split(",") if m],
+        default=list(SCALING),
+    )
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--csv", help="write the measurements as CSV")
+    p.add_argument("--plot", help="draw them to an image (needs matplotlib)")
+
+    p = sub.add_parser("analyser", help="lemmas of unseen forms by reverse rules")
+    p.add_argument("--forms", type=int, default=20000)
+    p.add_argument("--repeat", type=int, default=3)
+
+    p = sub.add_parser("front-end", help="suffix split and paradigm dispatch cost")
+    p.add_argument("--repeat", type=int, default=5)
+
+    p = sub.add_parser("suite", help="throughput and per-stage/paradigm timings")
+    p.add_argument("--input", default=TEST_DATA)
+    p.add_argument("--repeat", type=int, default=5)
+    p.add_argument("--output", help="write the results as JSON")
+    p.add_argument("--baseline", help="JSON from an earlier --output to compare to")
+    p.add_argument("--threshold", type=float, default=0.10)
+    p.add_argument("--min-rows", type=int, default=50)
+
+    args = parser.parse_args()
+    if args.bench == "suite":
+        sys.exit(
+            bench_suite(
+                args.input,
+                args.repeat,
+                args.output,
+                args.baseline,
+                args.threshold,
+                args.min_rows,
+            )
+        )
+    elif args.bench == "parallel":
+        bench_parallel(args.rows, sorted(set(args.jobs)), args.chunk_size)
+    elif args.bench == "compile":
+        bench_compile(args.repeat)
+    elif args.bench == "all-paradigms":
+        bench_all_paradigms(args.words)
+    elif args.bench == "candidates":
+        bench_candidates(args.words)
+    elif args.bench == "rules":
+        bench_rules(args.inputs, args.repeat)
+    elif args.bench == "form-index":
+        bench_form_index(args.rows, args.lookups)
+    elif args.bench == "table":
+        bench_table(args.rows)
+    elif args.bench == "declension-file":
+        bench_declension_file(args.rows, args.repeat)
+    elif args.bench == "cold-start":
+        bench_cold_start(args.repeat)
+    elif args.bench == "render":
+        bench_render(args.repeat)
+    elif args.bench == "disk-cache":
+        bench_disk_cache(args.rows, args.batch_size)
+    elif args.bench == "shm-cache":
+        bench_shm_cache(args.rows, args.workers, args.repeat)
+    elif args.bench == "scaling":
+        bench_scaling(
+            sorted(set(args.sizes)), args.modes, args.seed, args.csv, args.plot
+        )
+    elif args.bench == "analyser":
+        bench_analyser(args.forms, args.repeat)
+    elif args.bench == "shard":
+        bench_shard(args.rows, args.shards, args.repeat)
+    elif args.bench == "front-end":
+        bench_front_end(args.repeat)
+    elif args.bench == "possessives":
+        bench_possessives(args.repeat)
+    elif args.bench == "grouped":
+        bench_grouped(args.rows, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
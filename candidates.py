@@ -0,0 +1,288 @@
+from __future__ import annotations
+import itertools
+import re
+from dataclasses import dataclass, field
+from typing import Optional, Union
+
+try:
+    from re import _constants as sre_constants  # type: ignore[attr-defined]
+    from re import _parser as sre_parse  # type: ignore[attr-defined]
+except ImportError:  # python < 3.11
+    import sre_constants  # type: ignore[no-redef]
+    import sre_parse  # type: ignore[no-redef]
+
+import decline
+from decline import Paradigm, REAbsPL, REConPL, REConSG, REGenSG, TrySubMixin
+
+# a pattern is flattened into alternative sequences of atoms: a set of allowed
+# characters (`None` for any character), the end of the word, or an item whose
+# width is not fixed and therefore ends whatever we can say about positions
+END = "$"
+VAR = "*"
+Atom = Union[Optional[frozenset[str]], str]
+Tail = tuple[Optional[frozenset[str]], ...]
+MAX_ALTERNATIVES = 32
+
+
+@dataclass(frozen=True)
+class RulePrecondition:
+    # the word must end with one of `tails` (read backwards from the last
+    # character) and contain one of `needles`; `None` means no constraint
+    tails: Optional[tuple[Tail, ...]]
+    needles: Optional[tuple[str, ...]]
+    tail_pattern: Optional[re.Pattern] = field(default=None, compare=False, repr=False)
+    tail_length: int = field(default=0, compare=False, repr=False)
+
+    def check(self, word: str) -> bool:
+        if self.tail_pattern is not None and not self.tail_pattern.search(
+            word, max(0, len(word) - self.tail_length)
+        ):
+            return False
+        if self.needles is not None and not any(n in word for n in self.needles):
+            return False
+        return True
+
+
+def _tail_pattern(tails: tuple[Tail, ...]) -> re.Pattern:
+    def chars(c: Optional[frozenset[str]]) -> str:
+        return "." if c is None else "[" + "".join(map(re.escape, sorted(c))) + "]"
+
+    alternatives = ["".join(map(chars, reversed(tail))) for tail in tails]
+    return re.compile("(?:" + "|".join(alternatives) + r")\Z", re.DOTALL)
+
+
+def _charset(items: list) -> Optional[frozenset[str]]:
+    chars: set[str] = set()
+    for op, av in items:
+        if op is sre_constants.LITERAL:
+            chars.add(chr(av))
+        elif op is sre_constants.RANGE:
+            chars.update(map(chr, range(av[0], av[1] + 1)))
+        else:
+            return None
+    return frozenset(chars)
+
+
+def _sequence(items: list) -> list[list[Atom]]:
+    alternatives: list[list[Atom]] = [[]]
+    for i, (op, av) in enumerate(items):
+        if op is sre_constants.ASSERT:
+            direction, sub = av
+            # a lookbehind at the start or a lookahead at the end constrains the
+            # word exactly as if it were consumed
+            inline = (direction < 0 and i == 0) or (
+                direction > 0 and i == len(items) - 1
+            )
+            item_alternatives = _sequence(list(sub)) if inline else [[]]
+        else:
+            item_alternatives = _item(op, av)
+        alternatives = [
+            a + b for a, b in itertools.product(alternatives, item_alternatives)
+        ]
+        if len(alternatives) > MAX_ALTERNATIVES:
+            return [[VAR]]
+    return alternatives
+
+
+def _item(op, av) -> list[list[Atom]]:
+    if op is sre_constants.LITERAL:
+        return [[frozenset(chr(av))]]
+    elif op in (sre_constants.ANY, sre_constants.NOT_LITERAL):
+        return [[None]]
+    elif op is sre_constants.IN:
+        return [[_charset(av)]]
+    elif op is sre_constants.SUBPATTERN:
+        return _sequence(list(av[-1]))
+    elif op is sre_constants.BRANCH:
+        return [alt for branch in av[1] for alt in _sequence(list(branch))]
+    elif op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT):
+        low, high, sub = av
+        if high <= 1:
+            return ([[]] if low == 0 else []) + _sequence(list(sub))
+        return [[VAR]]
+    elif op is sre_constants.AT:
+        return [[END]] if av is sre_constants.AT_END else [[]]
+    elif op is sre_constants.ASSERT_NOT:
+        return [[]]
+    return [[VAR]]
+
+
+def _tail(alternative: list[Atom]) -> Optional[Tail]:
+    if not alternative or alternative[-1] != END:
+        return None
+    tail = []
+    for atom in reversed(alternative[:-1]):
+        if atom == VAR or atom == END:
+            break
+        tail.append(atom)
+    return tuple(tail)  # type: ignore[arg-type]
+
+
+def _needle(alternative: list[Atom]) -> str:
+    best = ""
+    run = ""
+    for atom in alternative:
+        if isinstance(atom, frozenset) and len(atom) == 1:
+            run += next(iter(atom))
+            best = max(best, run, key=len)
+        else:
+            run = ""
+    return best
+
+
+def derive_precondition(pattern: re.Pattern) -> RulePrecondition:
+    alternatives = _sequence(list(sre_parse.parse(pattern.pattern, pattern.flags)))
+    tails = [_tail(a) for a in alternatives]
+    needles = [_needle(a) for a in alternatives]
+    if None in tails or () in tails:
+        return RulePrecondition(
+            tails=None, needles=None if "" in needles else tuple(dict.fromkeys(needles))
+        )
+    unique_tails = tuple(dict.fromkeys(tails))
+    return RulePrecondition(
+        tails=unique_tails,  # type: ignore[arg-type]
+        needles=None if "" in needles else tuple(dict.fromkeys(needles)),
+        tail_pattern=_tail_pattern(unique_tails),  # type: ignore[arg-type]
+        tail_length=max(map(len, unique_tails)),  # type: ignore[arg-type]
+    )
+
+
+_preconditions: dict[TrySubMixin, RulePrecondition] = {}
+
+
+def rule_precondition(rule: TrySubMixin) -> RulePrecondition:
+    precondition = _preconditions.get(rule)
+    if precondition is None:
+        precondition = _preconditions[rule] = derive_precondition(rule.pattern)
+    return precondition
+
+
+def _strip(con_sg: str) -> str:
+    return con_sg.replace("Á", "").replace("!", "")
+
+
+# stems are tracked symbolically while planning: the word itself, the word
+# without stress marks, a constant string, or `None` once a rule has run
+ABS_SG = 0
+STRIPPED = 1
+Stem = Union[int, str, None]
+Check = tuple[RulePrecondition, int]
+
+
+def _strip_stem(stem: Stem) -> Stem:
+    if isinstance(stem, str):
+        return _strip(stem)
+    return None if stem is None else STRIPPED
+
+
+def paradigm_plan(paradigm: Paradigm, suf_sg: str) -> Optional[list[Check]]:
+    # the precondition of every rule of `paradigm` whose input is known before
+    # any rule runs, following the stage dispatch of `decline`.
+    # `None` means a rule can never match. `suf_sg` must already have gone
+    # through `adjust_suf_sg`
+    checks: list[tuple[TrySubMixin, Stem]] = []
+
+    con_sg: Stem = None
+    if isinstance(paradigm.con_sg, str):
+        con_sg = paradigm.con_sg
+    elif paradigm.con_sg == 0:
+        con_sg = ABS_SG
+    elif paradigm.con_sg is REConSG.C3 and suf_sg in ("E!H", "a!H", "e!H"):
+        checks.append((REConSG.C38, ABS_SG))
+    else:
+        checks.append((paradigm.con_sg, ABS_SG))
+
+    gen_sg: Stem = None
+    if isinstance(paradigm.gen_sg, str):
+        gen_sg = paradigm.gen_sg
+    elif paradigm.gen_sg == 0:
+        gen_sg = ABS_SG if suf_sg == "E!H" else _strip_stem(con_sg)
+    elif paradigm.gen_sg in [
+        REGenSG.C2,
+        REGenSG.C4,
+        REGenSG.C9,
+        REGenSG.C10,
+        REGenSG.C19,
+    ]:
+        checks.append((paradigm.gen_sg, _strip_stem(con_sg)))
+    elif paradigm.gen_sg in [REGenSG.C8, REGenSG.C16]:
+        checks.append((paradigm.gen_sg, con_sg))
+    elif paradigm.gen_sg is REGenSG.C30 and suf_sg in ("a!H_Et", "a!H_At"):
+        checks.append((REGenSG.C31, ABS_SG))
+    else:
+        checks.append((paradigm.gen_sg, ABS_SG))
+
+    abs_pl: Stem = None
+    if paradigm.abs_pl == 0:
+        abs_pl = gen_sg
+    elif isinstance(paradigm.abs_pl, str):
+        abs_pl = paradigm.abs_pl
+    elif paradigm.abs_pl in [REAbsPL.C42, REAbsPL.C46, REAbsPL.C52]:
+        checks.append((paradigm.abs_pl, ABS_SG))
+    elif paradigm.abs_pl in [REAbsPL.C47, REAbsPL.C55]:
+        checks.append((paradigm.abs_pl, con_sg))
+    else:
+        checks.append((paradigm.abs_pl, gen_sg))
+
+    if isinstance(paradigm.con_pl, REConPL):
+        if paradigm.con_pl in [REConPL.C66, REConPL.C67]:
+            checks.append((paradigm.con_pl, gen_sg))
+        else:
+            checks.append((paradigm.con_pl, abs_pl))
+
+    plan: list[Check] = []
+    for rule, stem in checks:
+        precondition = rule_precondition(rule)
+        if isinstance(stem, str):
+            if not precondition.check(stem):
+                return None
+        elif stem is not None:
+            plan.append((precondition, stem))
+    return plan
+
+
+class PreconditionIndex:
+    # the paradigms grouped by the checks they need, for one singular suffix.
+    # every distinct check runs at most once per word
+    def __init__(self, suf_sg: str) -> None:
+        checks: dict[Check, int] = {}
+        groups: dict[tuple[int, ...], list[str]] = {}
+        for paradigm_id, paradigm in decline.paradigm_parameters.items():
+            plan = paradigm_plan(paradigm, suf_sg)
+            if plan is None:
+                continue
+            key = tuple(sorted({checks.setdefault(c, len(checks)) for c in plan}))
+            groups.setdefault(key, []).append(paradigm_id)
+        self.checks = list(checks)
+        self.groups = list(groups.items())
+        self._order = {p: i for i, p in enumerate(decline.paradigm_parameters)}
+
+    def candidates(self, word: str) -> list[str]:
+        stems = (word, _strip(word))
+        passed = [precondition.check(stems[stem]) for precondition, stem in self.checks]
+        found = [
+            paradigm_id
+            for key, paradigm_ids in self.groups
+            if all(passed[i] for i in key)
+            for paradigm_id in paradigm_ids
+        ]
+        found.sort(key=self._order.__getitem__)
+        return found
+
+
+_indexes: dict[str, PreconditionIndex] = {}
+
+
+def candidate_paradigms(word: str, suf_sg: str, suf_pl: str) -> list[str]:
+    # every paradigm for which `decline(word, suf_sg, suf_pl, ...)` can succeed,
+    # and usually few others
+    suf_sg = decline.adjust_suf_sg(word, suf_sg)
+    if (
+        suf_sg not in decline.SUF_SG_TO_SUF_GEN
+        or suf_pl not in decline.SUF_PL_TO_SUF_CON_PL
+    ):
+        return []
+    index = _indexes.get(suf_sg)
+    if index is None:
+        index = _indexes[suf_sg] = PreconditionIndex(suf_sg)
+    return index.candidates(word)
@@ -0,0 +1,196 @@
+from __future__ import annotations
+import mmap
+import struct
+import sys
+from typing import Iterable, Iterator, Optional, Sequence
+
+import decline
+from decline import SLOTS
+
+MAGIC = b"HDDT"
+VERSION = 1
+# magic, version, n_lemmas, n_paradigms, byte length of the string pool
+HEADER = struct.Struct("<4sIIII")
+# per lemma: offset and length of each slot in the string pool, then the
+# offset and length of the lemma itself and its paradigm id
+RECORD = struct.Struct("<6I6HIHH")
+U32 = struct.Struct("<I")
+# the length of every slot of a lemma that could not be declined
+MISSING = 0xFFFF
+
+
+class _StringPool:
+    # every distinct string is stored once
+    def __init__(self) -> None:
+        self.blob = bytearray()
+        self._refs: dict[str, tuple[int, int]] = {}
+
+    def add(self, s: str) -> tuple[int, int]:
+        ref = self._refs.get(s)
+        if ref is None:
+            data = s.encode()
+            if len(data) >= MISSING:
+                raise ValueError(f"string too long for the table: {s!r}")
+            ref = self._refs[s] = (len(self.blob), len(data))
+            self.blob += data
+        return ref
+
+
+def write_table(rows: Iterable[Sequence[str] | decline.LexiconEntry], path: str) -> int:
+    # one record per parsed row, in input order: lemma id i is the i-th row
+    # that parses. malformed rows are skipped and take no id, so the ids of
+    # the rows after one are not their row numbers
+    pool = _StringPool()
+    paradigm_ids: dict[str, int] = {}
+    records = bytearray()
+    n_lemmas = 0
+    for result in decline.decline_many(rows):
+        if result.entry is None:
+            continue
+        lemma = pool.add(result.entry.word)
+        paradigm = paradigm_ids.setdefault(result.entry.paradigm_id, len(paradigm_ids))
+        if result.declension is None:
+            refs = [(0, MISSING)] * len(SLOTS)
+        else:
+            refs = [pool.add(getattr(result.declension, slot)) for slot in SLOTS]
+        records += RECORD.pack(
+            *[offset for offset, _ in refs],
+            *[length for _, length in refs],
+            *lemma,
+            paradigm,
+        )
+        n_lemmas += 1
+
+    paradigm_offsets = [0]
+    paradigm_blob = bytearray()
+    for paradigm_id in paradigm_ids:
+        paradigm_blob += paradigm_id.encode()
+        paradigm_offsets.append(len(paradigm_blob))
+
+    with open(path, "wb") as f:
+        f.write(
+            HEADER.pack(MAGIC, VERSION, n_lemmas, len(paradigm_ids), len(pool.blob))
+        )
+        f.write(records)
+        f.write(struct.pack(f"<{len(paradigm_offsets)}I", *paradigm_offsets))
+        f.write(paradigm_blob)
+        f.write(pool.blob)
+    return n_lemmas
+
+
+# the file is mapped, not parsed: opening it reads the header and the paradigm
+# names, and every lookup reads one record
+class DeclensionFile:
+    def __init__(self, path: str) -> None:
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.n_lemmas, n_paradigms, _ = HEADER.unpack_from(self._mm)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a declension table (version {VERSION})")
+
+        pos = HEADER.size
+        self._records = pos
+        pos += RECORD.size * self.n_lemmas
+        paradigm_offsets = [
+            U32.unpack_from(self._mm, pos + 4 * i)[0] for i in range(n_paradigms + 1)
+        ]
+        pos += 4 * (n_paradigms + 1)
+        self._paradigms = [
+            self._mm[pos + start : pos + end].decode()
+            for start, end in zip(paradigm_offsets, paradigm_offsets[1:])
+        ]
+        self._pool = pos + paradigm_offsets[-1]
+
+    def close(self) -> None:
+        # every view `form_bytes` returned must be released first; while one
+        # is alive this raises and the table stays open and usable
+        try:
+            self._mm.close()
+        except BufferError:
+            raise BufferError(
+                "release the views returned by form_bytes before closing the table"
+            ) from None
+
+    def __enter__(self) -> DeclensionFile:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self.n_lemmas
+
+    def _record(self, lemma_id: int) -> tuple[int, ...]:
+        if not 0 <= lemma_id < self.n_lemmas:
+            raise IndexError(lemma_id)
+        return RECORD.unpack_from(self._mm, self._records + RECORD.size * lemma_id)
+
+    def _bytes(self, offset: int, length: int) -> bytes:
+        start = self._pool + offset
+        return self._mm[start : start + length]
+
+    def lemma(self, lemma_id: int) -> str:
+        record = self._record(lemma_id)
+        return self._bytes(record[12], record[13]).decode()
+
+    def paradigm_id(self, lemma_id: int) -> str:
+        return self._paradigms[self._record(lemma_id)[14]]
+
+    def form_bytes(self, lemma_id: int, slot: int) -> Optional[memoryview]:
+        # a view into the mapped file, without a copy. it must be released,
+        # e.g. with `with table.form_bytes(...) as form:`, before `close`
+        record = self._record(lemma_id)
+        length = record[6 + slot]
+        if length == MISSING:
+            return None
+        start = self._pool + record[slot]
+        return memoryview(self._mm)[start : start + length]
+
+    def declension(self, lemma_id: int) -> Optional[decline.Declension]:
+        record = self._record(lemma_id)
+        if record[6] == MISSING:
+            return None
+        return decline.Declension(
+            *[
+                self._bytes(record[i], record[6 + i]).decode()
+                for i in range(len(SLOTS))
+            ]
+        )
+
+    def __iter__(self) -> Iterator[Optional[decline.Declension]]:
+        for lemma_id in range(self.n_lemmas):
+            yield self.declension(lemma_id)
+
+
+def main() -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="binary declension table")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("build")
+    p.add_argument("lexicon")
+    p.add_argument("table")
+    p = sub.add_parser("show")
+    p.add_argument("table")
+    p.add_argument("lemma_ids", nargs="+", type=int)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        n = write_table(decline.read_rows(args.lexicon), args.table)
+        print(f"wrote {n} lemmas", file=sys.stderr)
+    else:
+        with DeclensionFile(args.table) as table:
+            for lemma_id in args.lemma_ids:
+                d = table.declension(lemma_id)
+                forms = (
+                    ["-"] * len(SLOTS) if d is None else [getattr(d, s) for s in SLOTS]
+                )
+                print(
+                    "\t".join(
+                        [table.paradigm_id(lemma_id), table.lemma(lemma_id), *forms]
+                    )
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,29 @@
 from __future__ import annotations
 import enum
 import re
-from typing import Literal, Optional, Callable
-from dataclasses import dataclass
+import csv
+import itertools
+import json
+import marshal
+import os
+import sys
+import time
+from collections import OrderedDict, deque
+from typing import (
+    TYPE_CHECKING,
+    Literal,
+    Optional,
+    Callable,
+    Iterable,
+    Iterator,
+    Protocol,
+    Sequence,
+)
+from array import array
+from dataclasses import dataclass, fields
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future
 
 
 @dataclass
@@ -22,6 +43,9 @@ class Declension:
     abs_pl: str
     con_pl: str
     gen_pl: str
+    # set by `decline(..., possessives=...)`. a class attribute rather than a
+    # field, so `SLOTS`, equality and the binary tables only see the six forms
+    possessives = None  # type: Optional[Possessives]
 
 
 letter_with_dagesh_lene = {
@@ -63,62 +87,329 @@ def add_shwa_mobile(c: str, hataf: str = "á") -> str:
     return c + (hataf if is_gronit(c) else "3")
 
 
+try:
+    import _sre  # type: ignore[import-not-found]
+except ImportError:  # not CPython: there are no regex programs to snapshot
+    _sre = None
+
+_rule_snapshot: dict[tuple[str, int], tuple] = {}
+
+
+def _rule_snapshot_tag() -> tuple:
+    # compiled regex programs are only valid for the interpreter that made them
+    return (
+        sys.implementation.cache_tag,
+        sys.version_info[:2],
+        getattr(_sre, "MAGIC", None),
+    )
+
+
+def _compile_rule_pattern(pattern: str, flags: int) -> re.Pattern:
+    compiled = _rule_snapshot.get((pattern, flags))
+    if compiled is not None:
+        return _sre.compile(pattern, *compiled)
+    return re.compile(pattern, flags)
+
+
+class LazyPattern:
+    # a rule regex that is compiled the first time it is used, so importing
+    # this module does not pay for the rules a short-lived process never runs
+    __slots__ = ("pattern", "flags", "_compiled")
+
+    def __init__(self, pattern: str, flags: int = 0) -> None:
+        self.pattern = pattern
+        self.flags = flags
+        self._compiled: Optional[re.Pattern] = None
+
+    def compile(self) -> re.Pattern:
+        compiled = self._compiled
+        if compiled is None:
+            compiled = self._compiled = _compile_rule_pattern(self.pattern, self.flags)
+        return compiled
+
+    def __getattr__(self, name: str):
+        return getattr(self.compile(), name)
+
+    def __repr__(self) -> str:
+        return f"LazyPattern({self.pattern!r})"
+
+
+lazy_compile = LazyPattern
+
+_shared_patterns: dict[tuple[str, int], LazyPattern | re.Pattern] = {}
+
+
+def write_rule_snapshot(path: str) -> int:
+    # the compiled program of every rule regex, which `load_rule_snapshot` in a
+    # later process turns back into patterns without parsing or compiling them
+    try:
+        from re import _compiler, _parser  # type: ignore[attr-defined]
+    except ImportError:  # python < 3.11
+        import sre_compile as _compiler  # type: ignore[no-redef]
+        import sre_parse as _parser  # type: ignore[no-redef]
+
+    programs = {}
+    for pattern, flags in _shared_patterns:
+        p = _parser.parse(pattern, flags)
+        indexgroup = [None] * p.state.groups
+        for name, i in p.state.groupdict.items():
+            indexgroup[i] = name
+        programs[pattern, flags] = (
+            flags | p.state.flags,
+            [int(op) for op in _compiler._code(p, flags)],
+            p.state.groups - 1,
+            p.state.groupdict,
+            tuple(indexgroup),
+        )
+    with open(path, "wb") as f:
+        marshal.dump((_rule_snapshot_tag(), programs), f)
+    return len(programs)
+
+
+def load_rule_snapshot(path: str) -> bool:
+    # `False` if the snapshot was written by another interpreter version, in
+    # which case rules keep being compiled from source
+    with open(path, "rb") as f:
+        tag, programs = marshal.load(f)
+    if _sre is None or tuple(tag) != _rule_snapshot_tag():
+        return False
+    _rule_snapshot.update(programs)
+    return True
+
+
+_GROUP_REFERENCE = re.compile(r"\\([1-9])(?![0-9])")
+
+
+def _template_expander(template: str) -> Optional[Callable[[re.Match], str]]:
+    # what `m.expand(template)` gives, as a function made once per rule.
+    # only literal text and \1..\9 are handled; `None` for anything else
+    parts = _GROUP_REFERENCE.split(template)
+    literals, groups = parts[::2], [int(g) for g in parts[1::2]]
+    if any("\\" in literal for literal in literals):
+        return None
+    if not groups:
+        return lambda m: template
+    pieces = list(zip(literals, groups))
+    last = literals[-1]
+    return lambda m: "".join([lit + (m[g] or "") for lit, g in pieces]) + last
+
+
 class TrySubMixin:
-    value: tuple[re.Pattern, str | Callable[[re.Match], str]]
+    value: tuple[LazyPattern | re.Pattern, str | Callable[[re.Match], str]]
+    pattern: re.Pattern
+    repl: str | Callable[[re.Match], str]
+
+    def __init__(
+        self,
+        pattern: LazyPattern | re.Pattern,
+        repl: str | Callable[[re.Match], str],
+    ) -> None:
+        # members with the same regex share one pattern object, so it is
+        # compiled once between them
+        self.pattern = _shared_patterns.setdefault(  # type: ignore[assignment]
+            (pattern.pattern, pattern.flags), pattern
+        )
+        self.repl = repl
+        self._expand = _template_expander(repl) if isinstance(repl, str) else repl
+        if isinstance(self.pattern, LazyPattern):
+            self.try_sub = self._compile_and_try_sub  # type: ignore[method-assign]
+
+    def _compile_and_try_sub(self, word: str) -> str | None:
+        # the first call compiles the pattern and then gets out of the way of
+        # the class's `try_sub`
+        self.compile()
+        return self.try_sub(word)
+
+    def compile(self) -> None:
+        if isinstance(self.pattern, LazyPattern):
+            self.pattern = self.pattern.compile()
+        self.__dict__.pop("try_sub", None)
 
     def try_sub(self, word: str) -> str | None:
-        if self.value[0].search(word):
-            return self.value[0].sub(self.value[1], word)
+        # `self.pattern.sub(self.repl, word)` if the pattern matches. the
+        # replacement of the first match is spliced in from that match; the
+        # search for a second one starts where it ended, so between them the
+        # word is read once. an empty match before the end of the word, a
+        # second match or a template `_template_expander` does not handle is
+        # left to `sub`
+        pattern = self.pattern
+        m = pattern.search(word)
+        if m is None:
+            return None
+        start, end = m.span()
+        expand = self._expand
+        if expand is None or (
+            pattern.search(word, end) if start < end else end < len(word)
+        ):
+            return pattern.sub(self.repl, word)
+        return word[:start] + expand(m) + word[end:]
+
+
+@dataclass
+class LatencyHistogram:
+    # counts[i] holds the samples below 2**i ns (and at least 2**(i-1) ns)
+    counts: list[int]
+    total_ns: int = 0
+
+    @classmethod
+    def empty(cls) -> LatencyHistogram:
+        return cls(counts=[0] * 48)
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+    def record(self, ns: int) -> None:
+        self.counts[min(ns.bit_length(), len(self.counts) - 1)] += 1
+        self.total_ns += ns
+
+    def quantile(self, q: float) -> int:
+        # upper bound, in ns, of the bucket holding the q-th quantile
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if n and seen >= rank:
+                return 2**i
+        return 0
+
+
+class Instrumentation:
+    def __init__(self) -> None:
+        self.rules: dict[TrySubMixin, list[int]] = {}
+        self.stages: dict[str, LatencyHistogram] = {}
+
+    def count_rule(self, rule: TrySubMixin, matched: bool) -> None:
+        counts = self.rules.get(rule)
+        if counts is None:
+            counts = self.rules[rule] = [0, 0]
+        counts[0] += 1
+        counts[1] += matched
+
+    def record_stage(self, stage: str, start_ns: int) -> int:
+        # returns the current clock so consecutive stages can be chained
+        now = time.perf_counter_ns()
+        histogram = self.stages.get(stage)
+        if histogram is None:
+            histogram = self.stages[stage] = LatencyHistogram.empty()
+        histogram.record(now - start_ns)
+        return now
+
+    def snapshot(self) -> dict:
+        return {
+            "rules": {
+                str(rule): {
+                    "applied": applied,
+                    "matched": matched,
+                    "none": applied - matched,
+                }
+                for rule, (applied, matched) in self.rules.items()
+            },
+            "stages": {
+                stage: {
+                    "count": h.count,
+                    "total_ns": h.total_ns,
+                    "p50_ns": h.quantile(0.5),
+                    "p99_ns": h.quantile(0.99),
+                    "buckets": {2**i: n for i, n in enumerate(h.counts) if n},
+                }
+                for stage, h in self.stages.items()
+            },
+        }
+
+    def reset(self) -> None:
+        self.rules.clear()
+        self.stages.clear()
+
+
+_instrumentation: Optional[Instrumentation] = None
+_uninstrumented_try_sub = TrySubMixin.try_sub
+
+
+def _instrumented_try_sub(self: TrySubMixin, word: str) -> str | None:
+    result = _uninstrumented_try_sub(self, word)
+    if _instrumentation is not None:
+        _instrumentation.count_rule(self, result is not None)
+    return result
+
+
+def enable_instrumentation() -> Instrumentation:
+    # counting rules swaps `TrySubMixin.try_sub` and timing stages recompiles
+    # the paradigms, so nothing is paid while instrumentation is off
+    global _instrumentation
+    if _instrumentation is None:
+        _instrumentation = Instrumentation()
+        TrySubMixin.try_sub = _instrumented_try_sub  # type: ignore[method-assign]
+        _compiled_paradigms.clear()
+    return _instrumentation
+
+
+def disable_instrumentation() -> None:
+    global _instrumentation
+    if _instrumentation is not None:
+        _instrumentation = None
+        TrySubMixin.try_sub = _uninstrumented_try_sub  # type: ignore[method-assign]
+        _compiled_paradigms.clear()
+
+
+def instrumentation_snapshot(reset: bool = False) -> Optional[dict]:
+    if _instrumentation is None:
         return None
+    snapshot = _instrumentation.snapshot()
+    if reset:
+        _instrumentation.reset()
+    return snapshot
 
 
 class REConSG(TrySubMixin, enum.Enum):
-    C2 = (re.compile(r"a(?=!.Á?$)"), "A")
+    C2 = (lazy_compile(r"a(?=!.Á?$)"), "A")
     C3 = (
-        re.compile(r"(.)[ea](.)(.)!(?=.Á?$)"),
+        lazy_compile(r"(.)[ea](.)(.)!(?=.Á?$)"),
         lambda m: add_shwa_mobile(m[1]) + m[2] + ("A" if m[3] == "a" else m[3]) + "!",
     )
     C3_A = (
-        re.compile(r"(.)a(.)e!(?=.Á?$)"),
+        lazy_compile(r"(.)a(.)e!(?=.Á?$)"),
         lambda m: add_shwa_mobile(m[1]) + m[2] + "A!",
     )
-    C4 = (re.compile(r"[ea](.)$"), lambda m: ("A!" if is_hjR(m[1]) else "E!") + m[1])
-    C5 = (re.compile(r"(.)a(?=..!(.Á?)?$)"), lambda m: add_shwa_mobile(m[1]))
-    C6 = (re.compile(r"e!(.)Á?$"), r"a!\1")
-    C7 = (re.compile(r"A!yI"), "i!")
-    C8 = (re.compile(r"o!(?=.Á?$)"), "O!")
+    C4 = (lazy_compile(r"[ea](.)$"), lambda m: ("A!" if is_hjR(m[1]) else "E!") + m[1])
+    C5 = (lazy_compile(r"(.)a(?=..!(.Á?)?$)"), lambda m: add_shwa_mobile(m[1]))
+    C6 = (lazy_compile(r"e!(.)Á?$"), r"a!\1")
+    C7 = (lazy_compile(r"A!yI"), "i!")
+    C8 = (lazy_compile(r"o!(?=.Á?$)"), "O!")
     C9_E = (
-        re.compile(r"[3á](.).(?=.$|..!.$)"),
+        lazy_compile(r"[3á](.).(?=.$|..!.$)"),
         lambda m: "E" + m[1] + ("á" if is_gronit(m[1]) else ""),
     )
     C9_I = (
-        re.compile(r"[3á](.).(?=.$|..!.$)"),
+        lazy_compile(r"[3á](.).(?=.$|..!.$)"),
         lambda m: "I" + m[1] + ("á" if is_gronit(m[1]) else ""),
     )
     C9_A = (
-        re.compile(r"[3á](.).(?=.$|..!.$)"),
+        lazy_compile(r"[3á](.).(?=.$|..!.$)"),
         lambda m: "A" + m[1] + ("á" if is_gronit(m[1]) else ""),
     )
-    C10 = (re.compile(r"a!wE"), "a!wE")
-    C11 = (re.compile(r"A!yI"), "A!yI")
+    C10 = (lazy_compile(r"a!wE"), "a!wE")
+    C11 = (lazy_compile(r"A!yI"), "A!yI")
     C12 = (
-        re.compile(r"(.)o!(.)i$"),
+        lazy_compile(r"(.)o!(.)i$"),
         lambda m: add_shwa_mobile(m[1], "ó") + m[2] + "i!",
     )
-    C13 = (re.compile(r"E!H$"), "i!")
+    C13 = (lazy_compile(r"E!H$"), "i!")
     C14 = (
-        re.compile(r"(.)(I_|[e3])(.)a(?=.W!n$)"),
+        lazy_compile(r"(.)(I_|[e3])(.)a(?=.W!n$)"),
         lambda m: m[1]
         + ("E" if m[2] == "I_" and is_gronit(m[1]) else "I")
         + rm_dagesh(m[3]),
     )
-    C15 = (re.compile(r"a(.)e!(?=.$)"), r"E!\1E")
-    C16 = (re.compile(r"a!(.)$"), r"á\1i!")
-    C38 = (re.compile(r"(.)[ae](?=.$)"), lambda m: add_shwa_mobile(m[1]))
+    C15 = (lazy_compile(r"a(.)e!(?=.$)"), r"E!\1E")
+    C16 = (lazy_compile(r"a!(.)$"), r"á\1i!")
+    C38 = (lazy_compile(r"(.)[ae](?=.$)"), lambda m: add_shwa_mobile(m[1]))
 
 
 def make_con_sg_stem(
-    abs_sg: str, suf_sg: str, con_sg: str | REConSG | Literal[0]
+    abs_sg: str,
+    suf_sg: str,
+    con_sg: str | REConSG | Literal[0],
 ) -> Optional[str]:
     if isinstance(con_sg, str):
         return con_sg
@@ -131,63 +422,63 @@ def make_con_sg_stem(
 
 
 class REGenSG(TrySubMixin, enum.Enum):
-    C2 = (re.compile(r"A(?=.$)"), "a")
+    C2 = (lazy_compile(r"A(?=.$)"), "a")
     C3_A = (
-        re.compile(r"[oAEae]!(.)[AE](.)$"),
+        lazy_compile(r"[oAEae]!(.)[AE](.)$"),
         lambda m: "A" + m[1] + add_dagesh(m[2]),
     )
     C3_I = (
-        re.compile(r"[oAEae]!(.)[AE](.)$"),
+        lazy_compile(r"[oAEae]!(.)[AE](.)$"),
         lambda m: "I" + m[1] + add_dagesh(m[2]),
     )
     C3_U = (
-        re.compile(r"[oAEae]!(.)[AE](.)$"),
+        lazy_compile(r"[oAEae]!(.)[AE](.)$"),
         lambda m: "U" + m[1] + add_dagesh(m[2]),
     )
     C3_E = (
-        re.compile(r"[oAEae]!(.)[AE](.)$"),
+        lazy_compile(r"[oAEae]!(.)[AE](.)$"),
         lambda m: "E" + m[1] + add_dagesh(m[2]),
     )
     C3_O = (
-        re.compile(r"[oAEae]!(.)[AE](.)$"),
+        lazy_compile(r"[oAEae]!(.)[AE](.)$"),
         lambda m: "O" + m[1] + add_dagesh(m[2]),
     )
     C4 = (
-        re.compile(r"([oOAa])(.)$"),
+        lazy_compile(r"([oOAa])(.)$"),
         lambda m: ("U_" if m[1] in "oO" else "A_") + add_dagesh(m[2]),
     )
     C5 = (
-        re.compile(r"(.)[ea](.)([iuWeA])!(.)Á?$"),
+        lazy_compile(r"(.)[ea](.)([iuWeA])!(.)Á?$"),
         lambda m: add_shwa_mobile(m[1]) + m[2] + ("a" if m[3] == "A" else m[3]) + m[4],
     )
-    C6 = (re.compile(r"(.)a(..)!(?=.$)"), lambda m: add_shwa_mobile(m[1]) + m[2])
-    C7 = (re.compile(r"_(.)e!(.)Á?$"), r"\1\2")
-    C8 = (re.compile(r"i!$"), "I_y")
-    C9 = (re.compile(r"(.)([AEae])(?=.$)"), lambda m: add_shwa_mobile(m[1]))
-    C10 = (re.compile(r"[AEe](.)$"), lambda m: "I_" + add_dagesh(m[1]))
-    C12 = (re.compile(r"!(.)$"), r"\1i")
+    C6 = (lazy_compile(r"(.)a(..)!(?=.$)"), lambda m: add_shwa_mobile(m[1]) + m[2])
+    C7 = (lazy_compile(r"_(.)e!(.)Á?$"), r"\1\2")
+    C8 = (lazy_compile(r"i!$"), "I_y")
+    C9 = (lazy_compile(r"(.)([AEae])(?=.$)"), lambda m: add_shwa_mobile(m[1]))
+    C10 = (lazy_compile(r"[AEe](.)$"), lambda m: "I_" + add_dagesh(m[1]))
+    C12 = (lazy_compile(r"!(.)$"), r"\1i")
     C13 = (
-        re.compile(r"(.)[3á](.)i!$"),
+        lazy_compile(r"(.)[3á](.)i!$"),
         lambda m: m[1]
         + ("E" if is_gronit(m[1]) or is_gronit(m[2]) else "I")
         + m[2]
         + "y",
     )
     C14 = (
-        re.compile(r"(.)[ée](.)[eAE]!(.)$"),
+        lazy_compile(r"(.)[ée](.)[eAE]!(.)$"),
         lambda m: add_shwa_mobile(m[1]) + m[2] + "I_" + add_dagesh(m[3]),
     )
-    C15 = (re.compile(r"á(.)e!(?=.Á?$)"), r"A\1")
-    C16 = (re.compile(r"([Eo])!(?=.$)"), lambda m: ("I" if m[1] in "E" else "U"))
-    C17 = (re.compile(r"$"), "ey")
-    C18 = (re.compile(r"e(.)A!(.)$"), lambda m: "3" + m[1] + "A_" + add_dagesh(m[2]))
-    C19 = (re.compile(r"$"), "Q")
-    C30 = (re.compile(r"([oAE])!(?=.$)"), lambda m: "O" if m[1] == "o" else "A")
-    C31 = (re.compile(r"([ae])(?=.$)"), "A")
-    C33 = (re.compile(r"o!(.)i$"), r"O\1y")
-    C34 = (re.compile(r"a!(.)u$"), r"A\1w")
-    C35 = (re.compile(r"o!(.)A(.)$"), r"O\1ó\2")
-    C36 = (re.compile(r"(?<=A)!(.)A(.)$"), r"\1á\2")
+    C15 = (lazy_compile(r"á(.)e!(?=.Á?$)"), r"A\1")
+    C16 = (lazy_compile(r"([Eo])!(?=.$)"), lambda m: ("I" if m[1] in "E" else "U"))
+    C17 = (lazy_compile(r"$"), "ey")
+    C18 = (lazy_compile(r"e(.)A!(.)$"), lambda m: "3" + m[1] + "A_" + add_dagesh(m[2]))
+    C19 = (lazy_compile(r"$"), "Q")
+    C30 = (lazy_compile(r"([oAE])!(?=.$)"), lambda m: "O" if m[1] == "o" else "A")
+    C31 = (lazy_compile(r"([ae])(?=.$)"), "A")
+    C33 = (lazy_compile(r"o!(.)i$"), r"O\1y")
+    C34 = (lazy_compile(r"a!(.)u$"), r"A\1w")
+    C35 = (lazy_compile(r"o!(.)A(.)$"), r"O\1ó\2")
+    C36 = (lazy_compile(r"(?<=A)!(.)A(.)$"), r"\1á\2")
 
 
 def make_gen_sg_stem(
@@ -215,29 +506,32 @@ def make_gen_sg_stem(
 
 
 class REAbsPL(TrySubMixin, enum.Enum):
-    C42 = (re.compile(r"[Á!]?"), "")
-    C43 = (re.compile(r"[UO](?=.$)"), "W")
+    C42 = (lazy_compile(r"[Á!]?"), "")
+    C43 = (lazy_compile(r"[UO](?=.$)"), "W")
     C44 = (
-        re.compile(r"(.)([AIUEO])(.)[áéó]?(.)$"),
+        lazy_compile(r"(.)([AIUEO])(.)[áéó]?(.)$"),
         lambda m: add_shwa_mobile(m[1], ("ó" if m[2] == "O" else "á"))
         + m[3]
         + "a"
         + rm_dagesh(m[4]),
     )
-    C45 = (re.compile(r"(.)[Ae](?=.$)"), lambda m: add_shwa_mobile(m[1]))
-    C46 = (re.compile(r"(.)A!yI"), lambda m: add_shwa_mobile(m[1]) + "ya")
-    C47 = (re.compile(r"i!$"), "aQ")
-    C48 = (re.compile(r"[uoW](?=.$)"), "3wa")
-    C49 = (re.compile(r"A(?=.$)"), "i")
-    C50 = (re.compile(r"_(.)A(?=.$)"), r"\1")
-    C51 = (re.compile(r"i$"), "I_y")
-    C52 = (re.compile(r"3(.)i!$"), r"e\1")
-    C53 = (re.compile(r"[oiWOAI](?=Q?.$)"), "a")
-    C55 = (re.compile(r"[Ee]!(?=.$)"), "a")
+    C45 = (lazy_compile(r"(.)[Ae](?=.$)"), lambda m: add_shwa_mobile(m[1]))
+    C46 = (lazy_compile(r"(.)A!yI"), lambda m: add_shwa_mobile(m[1]) + "ya")
+    C47 = (lazy_compile(r"i!$"), "aQ")
+    C48 = (lazy_compile(r"[uoW](?=.$)"), "3wa")
+    C49 = (lazy_compile(r"A(?=.$)"), "i")
+    C50 = (lazy_compile(r"_(.)A(?=.$)"), r"\1")
+    C51 = (lazy_compile(r"i$"), "I_y")
+    C52 = (lazy_compile(r"3(.)i!$"), r"e\1")
+    C53 = (lazy_compile(r"[oiWOAI](?=Q?.$)"), "a")
+    C55 = (lazy_compile(r"[Ee]!(?=.$)"), "a")
 
 
 def make_abs_pl_stem(
-    abs_pl: REAbsPL | str | Literal[0], abs_sg: str, con_sg: str, gen_sg: str
+    abs_pl: REAbsPL | str | Literal[0],
+    abs_sg: str,
+    con_sg: str,
+    gen_sg: str,
 ) -> Optional[str]:
     if abs_pl == 0:
         return gen_sg
@@ -252,31 +546,42 @@ def make_abs_pl_stem(
 
 
 class REConPL(TrySubMixin, enum.Enum):
-    C63 = (re.compile(r"(.)([eaA])(?=.$)"), lambda m: add_shwa_mobile(m[1]))
+    C63 = (lazy_compile(r"(.)([eaA])(?=.$)"), lambda m: add_shwa_mobile(m[1]))
     C64 = (
-        re.compile(r"([3áé])(.)[ae](?=.$)"),
+        lazy_compile(r"([3áé])(.)[ae](?=.$)"),
         lambda m: ("E" if m[1] == "é" else "A")
         + m[2]
         + ("á" if is_gronit(m[2]) else ""),
     )
     C65 = (
-        re.compile(r"[3á](.)[ae](.)(?=$)"),
+        lazy_compile(r"[3á](.)[ae](.)(?=$)"),
         lambda m: "I"
         + m[1]
         + ("á" if is_gronit(m[1]) else ("3" if m[1] == m[2] else ""))
         + m[2],
     )
-    C66 = (re.compile(r"I(?=.$)"), "i")
+    C66 = (lazy_compile(r"I(?=.$)"), "i")
     C67 = (
-        re.compile(r"O(.)(.)"),
+        lazy_compile(r"O(.)(.)"),
         lambda m: "O" + m[1] + ("ó" if is_gronit(m[1]) else "") + rm_dagesh(m[2]),
     )
-    C68 = (re.compile(r"_(.)a(?=.$)"), r"\1")
-    C69 = (re.compile(r"a(?=.$)"), "3")
+    C68 = (lazy_compile(r"_(.)a(?=.$)"), r"\1")
+    C69 = (lazy_compile(r"a(?=.$)"), "3")
+
+
+# a snapshot written by `write_rule_snapshot` for this interpreter; a missing or
+# stale one only means the rules are compiled from source
+if os.environ.get("DECLINE_RULE_SNAPSHOT"):
+    try:
+        load_rule_snapshot(os.environ["DECLINE_RULE_SNAPSHOT"])
+    except (OSError, ValueError, EOFError, TypeError):
+        pass
 
 
 def make_con_pl_stem(
-    con_pl: str | Literal[1, 2] | REConPL, abs_pl: str, gen_sg: str
+    con_pl: str | Literal[1, 2] | REConPL,
+    abs_pl: str,
+    gen_sg: str,
 ) -> Optional[str]:
     if isinstance(con_pl, str):
         return con_pl
@@ -327,17 +632,203 @@ SUF_PL_TO_SUF_CON_PL = {
 }
 
 
+POSSESSIVE_PERSONS = (
+    "1sg",
+    "2sg_m",
+    "2sg_f",
+    "3sg_m",
+    "3sg_f",
+    "1pl",
+    "2pl_m",
+    "2pl_f",
+    "3pl_m",
+    "3pl_f",
+)
+
+# appended to the bound singular stem, e.g. sIfr3xa "your book". the heavy
+# suffixes of the second person plural go on the construct singular stem
+# instead, as in d3vAr3xEm, see `heavy_sg_stem`
+SG_POSSESSIVE_SUFFIX = {
+    "1sg": "i",
+    "2sg_m": "3xa",
+    "2sg_f": "ex",
+    "3sg_m": "W",
+    "3sg_f": "ah",
+    "1pl": "enu",
+    "2pl_m": "3xEm",
+    "2pl_f": "3xEn",
+    "3pl_m": "am",
+    "3pl_f": "an",
+}
+
+# in place of SG_POSSESSIVE_SUFFIX after a stem that already ends in "i", as
+# gen_sg Qavi "my father": the suffix loses its vowel, as in Qavixa
+SG_POSSESSIVE_SUFFIX_AFTER_I = {
+    "1sg": "",
+    "2sg_m": "xa",
+    "2sg_f": "x",
+    "3sg_m": "w",
+    "3sg_f": "ha",
+    "1pl": "nu",
+    "2pl_m": "xEm",
+    "2pl_f": "xEn",
+    "3pl_m": "hEm",
+    "3pl_f": "hEn",
+}
+
+# appended to the bound plural stem, e.g. s3farEYxa "your books". the second
+# and third person plural go on the construct plural stem, as in sIfreYhEm
+PL_POSSESSIVE_SUFFIX = {
+    "1sg": "Ay",
+    "2sg_m": "EYxa",
+    "2sg_f": "AyIx",
+    "3sg_m": "aYw",
+    "3sg_f": "EYha",
+    "1pl": "eYnu",
+    "2pl_m": "eYxEm",
+    "2pl_f": "eYxEn",
+    "3pl_m": "eYhEm",
+    "3pl_f": "eYhEn",
+}
+SG_POSSESSIVE_ON_CONSTRUCT = frozenset(("2pl_m", "2pl_f"))
+PL_POSSESSIVE_ON_CONSTRUCT = frozenset(("2pl_m", "2pl_f", "3pl_m", "3pl_f"))
+_strip_marks = re.compile(r"[Á!]").sub
+# a stress mark with a vowel after it: stressed before the last syllable
+_EARLY_STRESS = re.compile(r"!.*[aeiouAEIOUWáéó]")
+
+
+def heavy_sg_stem(con_sg: str, sg_stem: str) -> str:
+    # the stem the singular takes 3xEm and 3xEn on: the construct singular form
+    # without its marks, d3vA!r -> d3vAr3xEm, G3miRA!t -> G3miRAt3xEm. a
+    # segolate such as sE!fEr, stressed before its last syllable, and a form
+    # ending in the vowel letter H keep the bound stem: sIfr3xEm
+    if con_sg.endswith("H") or _EARLY_STRESS.search(con_sg):
+        return sg_stem
+    return _strip_marks("", con_sg)
+
+
+def _split_by_stem(
+    suffixes: dict[str, str], on_construct: frozenset[str]
+) -> tuple[list[tuple[str, str]], list[tuple[str, str]]]:
+    # the (person, suffix) pairs that go on the bound stem and those that go on
+    # the construct stem, so building the forms tests no person
+    return (
+        [(p, s) for p, s in suffixes.items() if p not in on_construct],
+        [(p, s) for p, s in suffixes.items() if p in on_construct],
+    )
+
+
+_SG_BY_STEM = _split_by_stem(SG_POSSESSIVE_SUFFIX, SG_POSSESSIVE_ON_CONSTRUCT)
+_SG_AFTER_I_BY_STEM = _split_by_stem(
+    SG_POSSESSIVE_SUFFIX_AFTER_I, SG_POSSESSIVE_ON_CONSTRUCT
+)
+_PL_BY_STEM = _split_by_stem(PL_POSSESSIVE_SUFFIX, PL_POSSESSIVE_ON_CONSTRUCT)
+
+
+class Possessives:
+    # the ten possessive forms of the singular and of the plural. the stems
+    # come from `decline` or a compiled paradigm; building a form is one
+    # concatenation, and a lazy instance only does that the first time `sg` or
+    # `pl` is read
+    __slots__ = (
+        "sg_stem",
+        "con_sg_stem",
+        "pl_stem",
+        "con_pl_stem",
+        "after_i",
+        "_sg",
+        "_pl",
+    )
+
+    def __init__(
+        self,
+        sg_stem: str,
+        con_sg_stem: str,
+        pl_stem: str,
+        con_pl_stem: str,
+        after_i: bool = False,
+        lazy: bool = False,
+    ) -> None:
+        # `con_sg_stem` is the `heavy_sg_stem`. `after_i` when the gen_sg stem
+        # already ends in "i", which gen_sg itself does not add then either
+        self.sg_stem = sg_stem
+        self.con_sg_stem = con_sg_stem
+        self.pl_stem = pl_stem
+        self.con_pl_stem = con_pl_stem
+        self.after_i = after_i
+        self._sg: Optional[dict[str, str]] = None
+        self._pl: Optional[dict[str, str]] = None
+        if not lazy:
+            self.sg, self.pl
+
+    def form(self, person: str, plural: bool = False) -> str:
+        if plural:
+            on_construct = person in PL_POSSESSIVE_ON_CONSTRUCT
+            stem = self.con_pl_stem if on_construct else self.pl_stem
+            return stem + PL_POSSESSIVE_SUFFIX[person]
+        on_construct = person in SG_POSSESSIVE_ON_CONSTRUCT
+        stem = self.con_sg_stem if on_construct else self.sg_stem
+        suffixes = (
+            SG_POSSESSIVE_SUFFIX_AFTER_I if self.after_i else SG_POSSESSIVE_SUFFIX
+        )
+        return stem + suffixes[person]
+
+    @staticmethod
+    def _forms(
+        stem: str,
+        con_stem: str,
+        by_stem: tuple[list[tuple[str, str]], list[tuple[str, str]]],
+    ) -> dict[str, str]:
+        bound, construct = by_stem
+        forms = {person: stem + suffix for person, suffix in bound}
+        for person, suffix in construct:
+            forms[person] = con_stem + suffix
+        return forms
+
+    @property
+    def sg(self) -> dict[str, str]:
+        if self._sg is None:
+            by_stem = _SG_AFTER_I_BY_STEM if self.after_i else _SG_BY_STEM
+            self._sg = self._forms(self.sg_stem, self.con_sg_stem, by_stem)
+        return self._sg
+
+    @property
+    def pl(self) -> dict[str, str]:
+        if self._pl is None:
+            self._pl = self._forms(self.pl_stem, self.con_pl_stem, _PL_BY_STEM)
+        return self._pl
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Possessives):
+            return NotImplemented
+        return self.sg == other.sg and self.pl == other.pl
+
+    def __repr__(self) -> str:
+        return f"Possessives(sg={self.sg!r}, pl={self.pl!r})"
+
+
+def adjust_suf_sg(abs_sg: str, suf_sg: str) -> str:
+    if suf_sg == "a!H_Et" and is_hjR(abs_sg[-1]):
+        return "a!H_At"
+    if suf_sg == "Et" and is_hjR(abs_sg[-1]):
+        return "At"
+    return suf_sg
+
+
 def decline(
     abs_sg: str,
     suf_sg: str,
     suf_pl: str,
     paradigm: Paradigm,
-    throw: bool = False
+    throw: bool = False,
+    possessives: bool | Literal["lazy"] = False,
 ) -> Optional[Declension]:
-    if suf_sg == "a!H_Et" and is_hjR(abs_sg[-1]):
-        suf_sg = "a!H_At"
-    if suf_sg == "Et" and is_hjR(abs_sg[-1]):
-        suf_sg = "At"
+    # with `possessives` the declension also carries the possessive forms,
+    # built from the same stems; "lazy" builds them when they are first read
+    instrumentation = _instrumentation
+    if instrumentation is not None:
+        clock = time.perf_counter_ns()
+    suf_sg = adjust_suf_sg(abs_sg, suf_sg)
 
     abs_sg_suffix = ""
     if suf_sg in ("a!H_Et", "a!H_At"):
@@ -346,6 +837,8 @@ def decline(
         abs_sg_suffix = suf_sg
 
     con_sg_stem = make_con_sg_stem(abs_sg=abs_sg, suf_sg=suf_sg, con_sg=paradigm.con_sg)
+    if instrumentation is not None:
+        clock = instrumentation.record_stage("con_sg", clock)
     con_sg_suffix = SUF_SG_TO_SUF_CON_SG.get(suf_sg, suf_sg)
     if con_sg_stem is None:
         assert not throw
@@ -354,6 +847,8 @@ def decline(
     gen_sg_stem = make_gen_sg_stem(
         abs_sg=abs_sg, suf_sg=suf_sg, con_sg=con_sg_stem, gen_sg=paradigm.gen_sg
     )
+    if instrumentation is not None:
+        clock = instrumentation.record_stage("gen_sg", clock)
     if gen_sg_stem is None:
         assert not throw
         return None
@@ -362,6 +857,8 @@ def decline(
     abs_pl_stem = make_abs_pl_stem(
         abs_pl=paradigm.abs_pl, abs_sg=abs_sg, con_sg=con_sg_stem, gen_sg=gen_sg_stem
     )
+    if instrumentation is not None:
+        clock = instrumentation.record_stage("abs_pl", clock)
     abs_pl_suffix = SUF_SG_TO_AUX_PL.get(suf_sg, "") + suf_pl
     if abs_pl_stem is None:
         assert not throw
@@ -370,17 +867,18 @@ def decline(
     con_pl_stem = make_con_pl_stem(
         con_pl=paradigm.con_pl, abs_pl=abs_pl_stem, gen_sg=gen_sg_stem
     )
+    if instrumentation is not None:
+        clock = instrumentation.record_stage("con_pl", clock)
     con_pl_suffix = SUF_SG_TO_AUX_PL.get(suf_sg, "") + SUF_PL_TO_SUF_CON_PL[suf_pl]
     if con_pl_stem is None:
         assert not throw
         return None
 
     gen_pl_stem = abs_pl_stem if paradigm.gen_pl == 1 else con_pl_stem
-    gen_pl_suffix = (
-        SUF_SG_TO_AUX_PL.get(suf_sg, "") + ("Wt" if suf_pl == "W!t" else "") + "Ay"
-    )
+    pl_suffix = SUF_SG_TO_AUX_PL.get(suf_sg, "") + ("Wt" if suf_pl == "W!t" else "")
+    gen_pl_suffix = pl_suffix + "Ay"
 
-    return Declension(
+    declension = Declension(
         abs_sg=abs_sg + abs_sg_suffix,
         con_sg=con_sg_stem + con_sg_suffix,
         gen_sg=gen_sg_stem + gen_sg_suffix,
@@ -388,6 +886,374 @@ def decline(
         con_pl=con_pl_stem + con_pl_suffix,
         gen_pl=gen_pl_stem + gen_pl_suffix,
     )
+    if possessives:
+        sg_stem = gen_sg_stem + SUF_SG_TO_SUF_GEN[suf_sg]
+        declension.possessives = Possessives(
+            sg_stem=sg_stem,
+            con_sg_stem=heavy_sg_stem(declension.con_sg, sg_stem),
+            pl_stem=gen_pl_stem + pl_suffix,
+            con_pl_stem=con_pl_stem + pl_suffix,
+            after_i=gen_sg_stem[-1] == "i",
+            lazy=possessives == "lazy",
+        )
+    return declension
+
+
+def _rule_try_sub(rule: TrySubMixin) -> Callable[[str], Optional[str]]:
+    # compiled paradigms bind `try_sub` once, so the rule is compiled up front
+    rule.compile()
+    return rule.try_sub
+
+
+def compile_con_sg_stem(
+    con_sg: str | REConSG | Literal[0], suf_sg: str
+) -> Callable[[str], Optional[str]]:
+    if isinstance(con_sg, str):
+        return lambda abs_sg: con_sg
+    elif con_sg == 0:
+        return lambda abs_sg: abs_sg
+    elif con_sg is REConSG.C3 and suf_sg in ("E!H", "a!H", "e!H"):
+        return _rule_try_sub(REConSG.C38)
+    else:
+        return _rule_try_sub(con_sg)
+
+
+def compile_gen_sg_stem(
+    gen_sg: str | Literal[0] | REGenSG, suf_sg: str
+) -> Callable[[str, str], Optional[str]]:
+    strip = re.compile(r"[Á!]").sub
+
+    if gen_sg == 0:
+        if suf_sg == "E!H":
+            return lambda abs_sg, con_sg: abs_sg
+        return lambda abs_sg, con_sg: strip("", con_sg)
+    elif isinstance(gen_sg, str):
+        return lambda abs_sg, con_sg: gen_sg
+    elif gen_sg in [REGenSG.C2, REGenSG.C4, REGenSG.C9, REGenSG.C10, REGenSG.C19]:
+        try_sub = _rule_try_sub(gen_sg)
+        return lambda abs_sg, con_sg: try_sub(strip("", con_sg))
+    elif gen_sg in [REGenSG.C8, REGenSG.C16]:
+        try_sub = _rule_try_sub(gen_sg)
+        return lambda abs_sg, con_sg: try_sub(con_sg)
+    elif gen_sg is REGenSG.C30 and suf_sg in ("a!H_Et", "a!H_At"):
+        try_sub = _rule_try_sub(REGenSG.C31)
+        return lambda abs_sg, con_sg: try_sub(abs_sg)
+    else:
+        try_sub = _rule_try_sub(gen_sg)
+        return lambda abs_sg, con_sg: try_sub(abs_sg)
+
+
+def compile_abs_pl_stem(
+    abs_pl: REAbsPL | str | Literal[0],
+) -> Callable[[str, str, str], Optional[str]]:
+    if abs_pl == 0:
+        return lambda abs_sg, con_sg, gen_sg: gen_sg
+    elif isinstance(abs_pl, str):
+        return lambda abs_sg, con_sg, gen_sg: abs_pl
+    try_sub = _rule_try_sub(abs_pl)
+    if abs_pl in [REAbsPL.C42, REAbsPL.C46, REAbsPL.C52]:
+        return lambda abs_sg, con_sg, gen_sg: try_sub(abs_sg)
+    elif abs_pl in [REAbsPL.C47, REAbsPL.C55]:
+        return lambda abs_sg, con_sg, gen_sg: try_sub(con_sg)
+    else:
+        return lambda abs_sg, con_sg, gen_sg: try_sub(gen_sg)
+
+
+def compile_con_pl_stem(
+    con_pl: str | Literal[1, 2] | REConPL,
+) -> Callable[[str, str], Optional[str]]:
+    if isinstance(con_pl, str):
+        return lambda abs_pl, gen_sg: con_pl
+    elif con_pl == 1:
+        return lambda abs_pl, gen_sg: abs_pl
+    elif con_pl == 2:
+        return lambda abs_pl, gen_sg: gen_sg
+    try_sub = _rule_try_sub(con_pl)
+    if con_pl in [REConPL.C66, REConPL.C67]:
+        return lambda abs_pl, gen_sg: try_sub(gen_sg)
+    else:
+        return lambda abs_pl, gen_sg: try_sub(abs_pl)
+
+
+@dataclass
+class DeclensionSuffixes:
+    abs_sg: str
+    con_sg: str
+    gen_sg: Optional[str]
+    abs_pl: str
+    con_pl: Optional[str]
+    gen_pl: str
+
+
+def make_suffixes(suf_sg: str, suf_pl: str) -> DeclensionSuffixes:
+    # `gen_sg` and `con_pl` are `None` where `decline` would raise a KeyError;
+    # `gen_sg` still lacks the final "i", which depends on the stem
+    abs_sg_suffix = ""
+    if suf_sg in ("a!H_Et", "a!H_At"):
+        abs_sg_suffix = "a!H"
+    elif suf_sg != "-":
+        abs_sg_suffix = suf_sg
+    aux_pl = SUF_SG_TO_AUX_PL.get(suf_sg, "")
+    con_pl_suffix = SUF_PL_TO_SUF_CON_PL.get(suf_pl)
+    return DeclensionSuffixes(
+        abs_sg=abs_sg_suffix,
+        con_sg=SUF_SG_TO_SUF_CON_SG.get(suf_sg, suf_sg),
+        gen_sg=SUF_SG_TO_SUF_GEN.get(suf_sg),
+        abs_pl=aux_pl + suf_pl,
+        con_pl=None if con_pl_suffix is None else aux_pl + con_pl_suffix,
+        gen_pl=aux_pl + ("Wt" if suf_pl == "W!t" else "") + "Ay",
+    )
+
+
+CompiledParadigm = Callable[[str], Optional[Declension]]
+
+
+def _timed_stage(stage: str, make_stem: Callable[..., Optional[str]]) -> Callable:
+    def timed(*args: str) -> Optional[str]:
+        start = time.perf_counter_ns()
+        stem = make_stem(*args)
+        if _instrumentation is not None:
+            _instrumentation.record_stage(stage, start)
+        return stem
+
+    return timed
+
+
+def compile_paradigm(
+    paradigm: Paradigm,
+    suf_sg: str,
+    suf_pl: str,
+    split: bool = False,
+    possessives: bool | Literal["lazy"] = False,
+) -> CompiledParadigm:
+    # `suf_sg` must already have gone through `adjust_suf_sg`. with `split` the
+    # function returns the six stems and the six suffixes instead of joining
+    # them into a `Declension`; `possessives` is as in `decline`
+    make_con_sg = compile_con_sg_stem(paradigm.con_sg, suf_sg)
+    make_gen_sg = compile_gen_sg_stem(paradigm.gen_sg, suf_sg)
+    make_abs_pl = compile_abs_pl_stem(paradigm.abs_pl)
+    make_con_pl = compile_con_pl_stem(paradigm.con_pl)
+    gen_pl_from_abs_pl = paradigm.gen_pl == 1
+    if _instrumentation is not None:
+        make_con_sg = _timed_stage("con_sg", make_con_sg)
+        make_gen_sg = _timed_stage("gen_sg", make_gen_sg)
+        make_abs_pl = _timed_stage("abs_pl", make_abs_pl)
+        make_con_pl = _timed_stage("con_pl", make_con_pl)
+
+    suffixes = make_suffixes(suf_sg, suf_pl)
+    abs_sg_suffix = suffixes.abs_sg
+    con_sg_suffix = suffixes.con_sg
+    abs_pl_suffix = suffixes.abs_pl
+    gen_pl_suffix = suffixes.gen_pl
+    # a missing gen_sg or con_pl suffix is the KeyError `decline` raises once
+    # the stage before it has succeeded, and an empty gen_sg stem the
+    # IndexError it raises looking for a final "i" there: gen_sg adds an "i"
+    # unless its stem already ends in one
+    missing_gen_sg = suffixes.gen_sg is None
+    missing_con_pl = suffixes.con_pl is None
+    gen_sg_suffixes = (suffixes.gen_sg or "") + "i", suffixes.gen_sg or ""
+    con_pl_suffix = suffixes.con_pl or ""
+    # what `decline` puts between the stems and the possessive suffixes
+    sg_suffix = suffixes.gen_sg or ""
+    pl_suffix = gen_pl_suffix[: -len(PL_POSSESSIVE_SUFFIX["1sg"])]
+    lazy = possessives == "lazy"
+
+    def make_stems(abs_sg: str) -> Optional[tuple[str, str, str, str]]:
+        con_sg_stem = make_con_sg(abs_sg)
+        if con_sg_stem is None:
+            return None
+        gen_sg_stem = make_gen_sg(abs_sg, con_sg_stem)
+        if gen_sg_stem is None:
+            return None
+        if missing_gen_sg:
+            raise KeyError(suf_sg)
+        if not gen_sg_stem:
+            raise IndexError("empty gen_sg stem")
+        abs_pl_stem = make_abs_pl(abs_sg, con_sg_stem, gen_sg_stem)
+        if abs_pl_stem is None:
+            return None
+        if missing_con_pl:
+            raise KeyError(suf_pl)
+        con_pl_stem = make_con_pl(abs_pl_stem, gen_sg_stem)
+        if con_pl_stem is None:
+            return None
+        return con_sg_stem, gen_sg_stem, abs_pl_stem, con_pl_stem
+
+    def decline_compiled(abs_sg: str) -> Optional[Declension]:
+        stems = make_stems(abs_sg)
+        if stems is None:
+            return None
+        con_sg_stem, gen_sg_stem, abs_pl_stem, con_pl_stem = stems
+        return Declension(
+            abs_sg=abs_sg + abs_sg_suffix,
+            con_sg=con_sg_stem + con_sg_suffix,
+            gen_sg=gen_sg_stem + gen_sg_suffixes[gen_sg_stem[-1] == "i"],
+            abs_pl=abs_pl_stem + abs_pl_suffix,
+            con_pl=con_pl_stem + con_pl_suffix,
+            gen_pl=(abs_pl_stem if gen_pl_from_abs_pl else con_pl_stem) + gen_pl_suffix,
+        )
+
+    def decline_possessives(abs_sg: str) -> Optional[Declension]:
+        stems = make_stems(abs_sg)
+        if stems is None:
+            return None
+        con_sg_stem, gen_sg_stem, abs_pl_stem, con_pl_stem = stems
+        gen_pl_stem = abs_pl_stem if gen_pl_from_abs_pl else con_pl_stem
+        after_i = gen_sg_stem[-1] == "i"
+        declension = Declension(
+            abs_sg=abs_sg + abs_sg_suffix,
+            con_sg=con_sg_stem + con_sg_suffix,
+            gen_sg=gen_sg_stem + gen_sg_suffixes[after_i],
+            abs_pl=abs_pl_stem + abs_pl_suffix,
+            con_pl=con_pl_stem + con_pl_suffix,
+            gen_pl=gen_pl_stem + gen_pl_suffix,
+        )
+        sg_stem = gen_sg_stem + sg_suffix
+        declension.possessives = Possessives(
+            sg_stem=sg_stem,
+            con_sg_stem=heavy_sg_stem(declension.con_sg, sg_stem),
+            pl_stem=gen_pl_stem + pl_suffix,
+            con_pl_stem=con_pl_stem + pl_suffix,
+            after_i=after_i,
+            lazy=lazy,
+        )
+        return declension
+
+    if not split:
+        return decline_possessives if possessives else decline_compiled
+
+    split_suffixes = [
+        (
+            abs_sg_suffix,
+            con_sg_suffix,
+            gen_sg_suffix,
+            abs_pl_suffix,
+            con_pl_suffix,
+            gen_pl_suffix,
+        )
+        for gen_sg_suffix in gen_sg_suffixes
+    ]
+
+    def decline_split(abs_sg: str) -> Optional[tuple[tuple[str, ...], tuple]]:
+        stems = make_stems(abs_sg)
+        if stems is None:
+            return None
+        con_sg_stem, gen_sg_stem, abs_pl_stem, con_pl_stem = stems
+        return (
+            (
+                abs_sg,
+                con_sg_stem,
+                gen_sg_stem,
+                abs_pl_stem,
+                con_pl_stem,
+                abs_pl_stem if gen_pl_from_abs_pl else con_pl_stem,
+            ),
+            split_suffixes[gen_sg_stem[-1] == "i"],
+        )
+
+    return decline_split  # type: ignore[return-value]
+
+
+_compiled_paradigms: dict[
+    tuple[str, str, str, bool, bool | Literal["lazy"]], CompiledParadigm
+] = {}
+
+
+def get_compiled_paradigm(
+    paradigm_id: str,
+    suf_sg: str,
+    suf_pl: str,
+    split: bool = False,
+    possessives: bool | Literal["lazy"] = False,
+) -> CompiledParadigm:
+    key = (paradigm_id, suf_sg, suf_pl, split, possessives)
+    compiled = _compiled_paradigms.get(key)
+    if compiled is None:
+        compiled = compile_paradigm(
+            paradigm_parameters[paradigm_id], suf_sg, suf_pl, split, possessives
+        )
+        _compiled_paradigms[key] = compiled
+    return compiled
+
+
+def decline_all_paradigms(
+    word: str, suf_sg: str, suf_pl: str
+) -> dict[str, Optional[Declension]]:
+    # same result as calling `decline` once per paradigm, but every stem is
+    # computed once per distinct (rule, input) and shared between paradigms
+    abs_sg = word
+    suf_sg = adjust_suf_sg(abs_sg, suf_sg)
+    suffixes = make_suffixes(suf_sg, suf_pl)
+
+    con_sg_stems: dict = {}
+    gen_sg_stems: dict = {}
+    abs_pl_stems: dict = {}
+    con_pl_stems: dict = {}
+    results: dict[str, Optional[Declension]] = {}
+    for paradigm_id, paradigm in paradigm_parameters.items():
+        con_sg_key = paradigm.con_sg
+        if con_sg_key in con_sg_stems:
+            con_sg_stem = con_sg_stems[con_sg_key]
+        else:
+            con_sg_stem = con_sg_stems[con_sg_key] = make_con_sg_stem(
+                abs_sg=abs_sg, suf_sg=suf_sg, con_sg=paradigm.con_sg
+            )
+        if con_sg_stem is None:
+            results[paradigm_id] = None
+            continue
+
+        gen_sg_key = (paradigm.gen_sg, con_sg_stem)
+        if gen_sg_key in gen_sg_stems:
+            gen_sg_stem = gen_sg_stems[gen_sg_key]
+        else:
+            gen_sg_stem = gen_sg_stems[gen_sg_key] = make_gen_sg_stem(
+                abs_sg=abs_sg, suf_sg=suf_sg, con_sg=con_sg_stem, gen_sg=paradigm.gen_sg
+            )
+        if gen_sg_stem is None:
+            results[paradigm_id] = None
+            continue
+        if suffixes.gen_sg is None:
+            raise KeyError(suf_sg)
+
+        abs_pl_key = (paradigm.abs_pl, con_sg_stem, gen_sg_stem)
+        if abs_pl_key in abs_pl_stems:
+            abs_pl_stem = abs_pl_stems[abs_pl_key]
+        else:
+            abs_pl_stem = abs_pl_stems[abs_pl_key] = make_abs_pl_stem(
+                abs_pl=paradigm.abs_pl,
+                abs_sg=abs_sg,
+                con_sg=con_sg_stem,
+                gen_sg=gen_sg_stem,
+            )
+        if abs_pl_stem is None:
+            results[paradigm_id] = None
+            continue
+        if suffixes.con_pl is None:
+            raise KeyError(suf_pl)
+
+        con_pl_key = (paradigm.con_pl, abs_pl_stem, gen_sg_stem)
+        if con_pl_key in con_pl_stems:
+            con_pl_stem = con_pl_stems[con_pl_key]
+        else:
+            con_pl_stem = con_pl_stems[con_pl_key] = make_con_pl_stem(
+                con_pl=paradigm.con_pl, abs_pl=abs_pl_stem, gen_sg=gen_sg_stem
+            )
+        if con_pl_stem is None:
+            results[paradigm_id] = None
+            continue
+
+        results[paradigm_id] = Declension(
+            abs_sg=abs_sg + suffixes.abs_sg,
+            con_sg=con_sg_stem + suffixes.con_sg,
+            gen_sg=gen_sg_stem
+            + suffixes.gen_sg
+            + ("" if gen_sg_stem[-1] == "i" else "i"),
+            abs_pl=abs_pl_stem + suffixes.abs_pl,
+            con_pl=con_pl_stem + suffixes.con_pl,
+            gen_pl=(abs_pl_stem if paradigm.gen_pl == 1 else con_pl_stem)
+            + suffixes.gen_pl,
+        )
+    return results
 
 
 paradigm_parameters = {
@@ -713,101 +1579,668 @@ paradigm_parameters = {
 
 SINGULAR_SUFFIX = ["e!H", "a!H", "E!H", "Et", "At", "i!t", "u!t", "A!Qy"] + ["aH"]
 
+# singular suffixes by their spelling, tried longest first; no singular suffix
+# ends another, so the longest match is also the first in SINGULAR_SUFFIX
+_SINGULAR_SUFFIXES = {s: s for s in SINGULAR_SUFFIX}
+_SINGULAR_SUFFIX_LENGTHS = sorted({len(s) for s in SINGULAR_SUFFIX}, reverse=True)
 
-def decline_by_paradigm(
-    paradigm_id: str, word: str, has_suf: bool, suf_pl: str, throw=False,
-) -> Optional[Declension]:
-    if paradigm_id.startswith("b_"):
+# paradigms whose "a!H" declines like "Et"
+A_H_ET_PARADIGMS = frozenset(
+    ("b_shxena", "b_milcama", "b_atara", "b_ayala", "b_yoleda")
+)
+
+
+class UnknownParadigmError(KeyError):
+    def __init__(self, paradigm_id: str) -> None:
+        super().__init__(paradigm_id)
+        self.paradigm_id = paradigm_id
+
+
+class UnknownSuffixError(ValueError):
+    def __init__(self, paradigm_id: str, word: str) -> None:
+        super().__init__(f"{word!r} ({paradigm_id}) ends in no singular suffix")
+        self.paradigm_id = paradigm_id
+        self.word = word
+
+
+def match_singular_suffix(word: str) -> Optional[str]:
+    suffixes = _SINGULAR_SUFFIXES
+    for n in _SINGULAR_SUFFIX_LENGTHS:
+        suf_sg = suffixes.get(word[-n:])
+        if suf_sg is not None:
+            return suf_sg
+    return None
+
+
+def split_singular_suffix(
+    paradigm_id: str, word: str, has_suf: bool
+) -> tuple[str, str]:
+    if not has_suf:
+        return word, "-"
+    suf_sg = match_singular_suffix(word)
+    if suf_sg is None:
+        raise UnknownSuffixError(paradigm_id, word)
+    abs_sg = word[: -len(suf_sg)]
+    if paradigm_id in A_H_ET_PARADIGMS:
+        suf_sg = "a!H_Et"
+    elif suf_sg == "At":
+        suf_sg = "Et"
+    return abs_sg, suf_sg
+
+
+_FINAL_VOWEL = re.compile(r"[Wu]!?$")
+_LAST_VOWEL = re.compile(r"([aiueoAIUEOW])(?=[^aiueoAIUEOW]*$)")
+
+
+def decline_f_atom(word: str, suf_pl: str) -> Declension:
+    con_sg = word
+    base_pl = word
+    if word.endswith("aH"):
+        con_sg = word[:-2] + "At"
+        base_pl = word[:-2]
+    elif _FINAL_VOWEL.match(word):
+        base_pl = con_sg + "Q"
+    elif word.endswith("i"):
+        base_pl = con_sg[:1] + "I_y"
+    return Declension(
+        abs_sg=word,
+        con_sg=con_sg,
+        gen_sg="",
+        abs_pl=base_pl + suf_pl.replace("!", ""),
+        con_pl=base_pl.replace("!", "") + "e!Y" if suf_pl == "im" else base_pl + suf_pl,
+        gen_pl="",
+    )
+
+
+def decline_f_universita(word: str, suf_pl: str) -> Declension:
+    return Declension(
+        abs_sg=word,
+        con_sg=word[:-2] + "At",
+        gen_sg="",
+        abs_pl=word.replace("!", "") + suf_pl,
+        con_pl=word.replace("!", "") + suf_pl,
+        gen_pl="",
+    )
+
+
+def decline_f_meter(word: str, suf_pl: str) -> Declension:
+    return Declension(
+        abs_sg=word,
+        con_sg=word,
+        gen_sg="",
+        abs_pl=word[:-2] + word[-1] + "im",
+        con_pl=word[:-2].replace("!", "") + word[-1] + "e!Y",
+        gen_pl="",
+    )
+
+
+def decline_f_telefon(word: str, suf_pl: str) -> Declension:
+    return Declension(
+        abs_sg=word,
+        con_sg=word,
+        gen_sg="",
+        abs_pl=_LAST_VOWEL.sub(r"\1!", word.replace("!", "")) + suf_pl,
+        con_pl=word.replace("!", "") + "e!Y",
+        gen_pl="",
+    )
+
+
+def decline_f_geto(word: str, suf_pl: str) -> Declension:
+    return Declension(
+        abs_sg=word,
+        con_sg=word,
+        gen_sg="",
+        abs_pl=word[:-1].replace("!", "") + suf_pl,
+        con_pl=word[:-1].replace("!", "") + ("e!Y" if suf_pl == "im" else suf_pl),
+        gen_pl="",
+    )
+
+
+# the f_* paradigms have no bound forms, so they get no possessives either
+FOREIGN_PARADIGMS: dict[str, Callable[[str, str], Declension]] = {
+    "f_atom": decline_f_atom,
+    "f_banana": decline_f_atom,
+    "f_mango": decline_f_atom,
+    "f_stati": decline_f_atom,
+    "f_universita": decline_f_universita,
+    "f_meter": decline_f_meter,
+    "f_telefon": decline_f_telefon,
+    "f_geto": decline_f_geto,
+}
+
+FrontEnd = Callable[[str, bool, str, "bool | Literal['lazy']"], Optional[Declension]]
+_front_ends: dict[str, FrontEnd] = {}
+
+
+def _bound_front_end(paradigm_id: str) -> FrontEnd:
+    # `split_singular_suffix`, `adjust_suf_sg` and the compiled paradigm with
+    # everything that only depends on the paradigm id decided up front
+    suffixes = _SINGULAR_SUFFIXES
+    lengths = _SINGULAR_SUFFIX_LENGTHS
+    a_h_et = paradigm_id in A_H_ET_PARADIGMS
+    compiled = _compiled_paradigms
+
+    def front_end(
+        word: str, has_suf: bool, suf_pl: str, possessives: bool | Literal["lazy"]
+    ) -> Optional[Declension]:
         if has_suf:
-            suf_sg = next(s for s in SINGULAR_SUFFIX if word.endswith(s))
-            if suf_sg == "At":
-                suf_sg = "Et"
-            abs_sg = word[: -len(suf_sg)]
-            if paradigm_id in [
-                "b_shxena",
-                "b_milcama",
-                "b_atara",
-                "b_ayala",
-                "b_yoleda",
-            ]:
+            for n in lengths:
+                suf_sg = suffixes.get(word[-n:])
+                if suf_sg is not None:
+                    break
+            else:
+                raise UnknownSuffixError(paradigm_id, word)
+            abs_sg = word[:-n]
+            if a_h_et:
                 suf_sg = "a!H_Et"
+            elif suf_sg == "At":
+                suf_sg = "Et"
+            suf_sg = adjust_suf_sg(abs_sg, suf_sg)
         else:
-            suf_sg = "-"
             abs_sg = word
-        return decline(
-            abs_sg=abs_sg,
-            suf_sg=suf_sg,
-            suf_pl=suf_pl,
-            paradigm=paradigm_parameters[paradigm_id],
-            throw=throw,
+            suf_sg = "-"
+        paradigm = compiled.get((paradigm_id, suf_sg, suf_pl, False, possessives))
+        if paradigm is None:
+            paradigm = get_compiled_paradigm(
+                paradigm_id, suf_sg, suf_pl, possessives=possessives
+            )
+        return paradigm(abs_sg)
+
+    return front_end
+
+
+def _foreign_front_end(decline_foreign: Callable[[str, str], Declension]) -> FrontEnd:
+    return lambda word, has_suf, suf_pl, possessives: decline_foreign(word, suf_pl)
+
+
+def get_front_end(paradigm_id: str) -> FrontEnd:
+    front_end = _front_ends.get(paradigm_id)
+    if front_end is None:
+        if paradigm_id in FOREIGN_PARADIGMS:
+            front_end = _foreign_front_end(FOREIGN_PARADIGMS[paradigm_id])
+        elif paradigm_id.startswith("b_") and paradigm_id in paradigm_parameters:
+            front_end = _bound_front_end(paradigm_id)
+        else:
+            raise UnknownParadigmError(paradigm_id)
+        _front_ends[paradigm_id] = front_end
+    return front_end
+
+
+def decline_by_paradigm(
+    paradigm_id: str,
+    word: str,
+    has_suf: bool,
+    suf_pl: str,
+    throw=False,
+    compiled: bool = True,
+    possessives: bool | Literal["lazy"] = False,
+) -> Optional[Declension]:
+    if compiled:
+        front_end = _front_ends.get(paradigm_id) or get_front_end(paradigm_id)
+        declension = front_end(word, has_suf, suf_pl, possessives)
+        assert declension is not None or not throw
+        return declension
+    if paradigm_id in FOREIGN_PARADIGMS:
+        return FOREIGN_PARADIGMS[paradigm_id](word, suf_pl)
+    paradigm = paradigm_parameters.get(paradigm_id)
+    if paradigm is None or not paradigm_id.startswith("b_"):
+        raise UnknownParadigmError(paradigm_id)
+    abs_sg, suf_sg = split_singular_suffix(paradigm_id, word, has_suf)
+    return decline(
+        abs_sg=abs_sg,
+        suf_sg=suf_sg,
+        suf_pl=suf_pl,
+        paradigm=paradigm,
+        throw=throw,
+        possessives=possessives,
+    )
+
+
+TSV_SUF_PL = {"im": "i!m", "Wt": "W!t"}
+
+
+@dataclass
+class LexiconEntry:
+    paradigm_id: str
+    word: str
+    has_suf: bool
+    suf_pl: str
+
+
+@dataclass
+class DeclineResult:
+    entry: Optional[LexiconEntry]
+    declension: Optional[Declension]
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.declension is not None
+
+
+def parse_row(row: Sequence[str]) -> LexiconEntry:
+    paradigm_id, word, singular_suffix, plural_suffix = row
+    if paradigm_id.startswith("b_"):
+        # the lexicon stores the plural suffix unstressed, `decline` expects
+        # the keys of SUF_PL_TO_SUF_CON_PL
+        plural_suffix = TSV_SUF_PL.get(plural_suffix, plural_suffix)
+    return LexiconEntry(
+        paradigm_id=paradigm_id,
+        word=word,
+        has_suf=singular_suffix != "-",
+        suf_pl=plural_suffix,
+    )
+
+
+def iter_rows(lines: Iterable[str]) -> Iterator[list[str]]:
+    reader = csv.reader(lines, delimiter="\t", quoting=csv.QUOTE_NONE)
+    header = next(reader, None)
+    if header is not None and header[0] != "paradigm":
+        yield header
+    yield from reader
+
+
+def read_rows(path: str) -> Iterator[list[str]]:
+    # "-" reads standard input
+    if path == "-":
+        yield from iter_rows(sys.stdin)
+        return
+    with open(path, newline="", encoding="utf-8") as f:
+        yield from iter_rows(f)
+
+
+CacheKey = tuple[str, str, bool, str]
+
+
+@dataclass
+class CacheStats:
+    hits: int
+    misses: int
+    evictions: int
+    collapsed: int
+    size: int
+    maxsize: int
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class Decliner(Protocol):
+    # what `decline_entry` declines through: `DeclensionCache` and the caches
+    # in disk_cache and shm_cache
+    def decline(
+        self, paradigm_id: str, word: str, has_suf: bool, suf_pl: str
+    ) -> Optional[Declension]: ...
+
+
+class BatchDecliner(Decliner, Protocol):
+    # what `decline_many` hands its batches to
+    def decline_batch(
+        self, entries: Sequence[LexiconEntry]
+    ) -> list[DeclineResult]: ...
+
+
+class DeclensionCache:
+    def __init__(self, maxsize: int = 65536) -> None:
+        assert maxsize > 0
+        self.maxsize = maxsize
+        self._data: OrderedDict[CacheKey, Optional[Declension]] = OrderedDict()
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._collapsed = 0
+
+    def clear(self) -> None:
+        self._data.clear()
+        self.reset_stats()
+
+    def stats(self) -> CacheStats:
+        return CacheStats(
+            hits=self._hits,
+            misses=self._misses,
+            evictions=self._evictions,
+            collapsed=self._collapsed,
+            size=len(self._data),
+            maxsize=self.maxsize,
         )
-    else:
-        if paradigm_id in ("f_atom", "f_banana", "f_mango", "f_stati"):
-            con_sg = word
-            base_pl = word
-            if word.endswith("aH"):
-                con_sg = word[:-2] + "At"
-                base_pl = word[:-2]
-            elif re.match(r"[Wu]!?$", word):
-                base_pl = con_sg + "Q"
-            elif word.endswith("i"):
-                base_pl = con_sg[:1] + "I_y"
-            return Declension(
-                abs_sg=word,
-                con_sg=con_sg,
-                gen_sg="",
-                abs_pl=base_pl + suf_pl.replace("!", ""),
-                con_pl=base_pl.replace("!", "") + "e!Y"
-                if suf_pl == "im"
-                else base_pl + suf_pl,
-                gen_pl="",
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def decline(
+        self, paradigm_id: str, word: str, has_suf: bool, suf_pl: str
+    ) -> Optional[Declension]:
+        key = (paradigm_id, word, has_suf, suf_pl)
+        data = self._data
+        if key in data:
+            data.move_to_end(key)
+            self._hits += 1
+            return data[key]
+        self._misses += 1
+        declension = decline_by_paradigm(paradigm_id, word, has_suf, suf_pl)
+        data[key] = declension
+        if len(data) > self.maxsize:
+            data.popitem(last=False)
+            self._evictions += 1
+        return declension
+
+    def decline_batch(self, entries: Sequence[LexiconEntry]) -> list[DeclineResult]:
+        unique: dict[CacheKey, DeclineResult] = {}
+        results = []
+        for entry in entries:
+            key = (entry.paradigm_id, entry.word, entry.has_suf, entry.suf_pl)
+            result = unique.get(key)
+            if result is None:
+                result = unique[key] = decline_entry(entry, self)
+            else:
+                self._collapsed += 1
+                if result.entry is not entry:
+                    result = DeclineResult(entry, result.declension, result.error)
+            results.append(result)
+        return results
+
+
+def decline_entry(
+    entry: LexiconEntry, cache: Optional[Decliner] = None
+) -> DeclineResult:
+    try:
+        if cache is not None:
+            declension = cache.decline(
+                entry.paradigm_id, entry.word, entry.has_suf, entry.suf_pl
             )
-        elif paradigm_id == "f_universita":
-            return Declension(
-                abs_sg=word,
-                con_sg=word[:-2] + "At",
-                gen_sg="",
-                abs_pl=word.replace("!", "") + suf_pl,
-                con_pl=word.replace("!", "") + suf_pl,
-                gen_pl="",
+        else:
+            declension = decline_by_paradigm(
+                entry.paradigm_id, entry.word, entry.has_suf, entry.suf_pl
             )
-        elif paradigm_id == "f_meter":
-            return Declension(
-                abs_sg=word,
-                con_sg=word,
-                gen_sg="",
-                abs_pl=word[:-2] + word[-1] + "im",
-                con_pl=word[:-2].replace("!", "") + word[-1] + "e!Y",
-                gen_pl="",
+    except Exception as e:
+        return DeclineResult(entry, None, f"{type(e).__name__}: {e}")
+    if declension is None:
+        return DeclineResult(entry, None, "no rule matched")
+    return DeclineResult(entry, declension)
+
+
+def parse_rows(
+    rows: Iterable[Sequence[str] | LexiconEntry],
+) -> Iterator[LexiconEntry | DeclineResult]:
+    for row in rows:
+        if isinstance(row, LexiconEntry):
+            yield row
+        else:
+            try:
+                yield parse_row(row)
+            except ValueError as e:
+                yield DeclineResult(None, None, f"malformed row {row!r}: {e}")
+
+
+def decline_many(
+    rows: Iterable[Sequence[str] | LexiconEntry],
+    cache: Optional[BatchDecliner] = None,
+    batch_size: int = 1000,
+) -> Iterator[DeclineResult]:
+    if cache is None:
+        for entry in parse_rows(rows):
+            if isinstance(entry, DeclineResult):
+                yield entry
+            else:
+                yield decline_entry(entry)
+        return
+    for batch in chunked(parse_rows(rows), batch_size):
+        entries = [e for e in batch if isinstance(e, LexiconEntry)]
+        declined = iter(cache.decline_batch(entries))
+        for e in batch:
+            yield e if isinstance(e, DeclineResult) else next(declined)
+
+
+def decline_file(
+    path: str, cache: Optional[BatchDecliner] = None
+) -> Iterator[DeclineResult]:
+    return decline_many(read_rows(path), cache)
+
+
+SLOTS = tuple(f.name for f in fields(Declension))
+
+
+class DeclensionTable:
+    # a column store for many declensions. each row keeps six (offset, length)
+    # references into one utf-8 blob, where a stem shared by several slots of
+    # the row is stored once, and the id of its tuple of six suffixes
+    __slots__ = ("_blob", "_offsets", "_lengths", "_rows", "_suffixes", "_suffix_ids")
+
+    MISSING = 0xFFFF
+    NO_SUFFIXES = ("",) * len(SLOTS)
+
+    def __init__(self) -> None:
+        self._blob = bytearray()
+        self._offsets = array("I")
+        self._lengths = array("H")
+        self._rows = array("H")
+        self._suffixes: list[tuple[str, ...]] = []
+        self._suffix_ids: dict[tuple[str, ...], int] = {}
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def append_parts(self, stems: Sequence[str], suffixes: tuple[str, ...]) -> None:
+        blob = self._blob
+        refs: dict[str, tuple[int, int]] = {}
+        for stem in stems:
+            ref = refs.get(stem)
+            if ref is None:
+                data = stem.encode()
+                ref = refs[stem] = (len(blob), len(data))
+                blob += data
+            self._offsets.append(ref[0])
+            self._lengths.append(ref[1])
+        suffix_id = self._suffix_ids.get(suffixes)
+        if suffix_id is None:
+            suffix_id = self._suffix_ids[suffixes] = len(self._suffixes)
+            assert suffix_id < self.MISSING
+            self._suffixes.append(suffixes)
+        self._rows.append(suffix_id)
+
+    def append(self, declension: Optional[Declension]) -> None:
+        if declension is None:
+            self._offsets.extend([0] * len(SLOTS))
+            self._lengths.extend([0] * len(SLOTS))
+            self._rows.append(self.MISSING)
+        else:
+            self.append_parts(
+                [getattr(declension, slot) for slot in SLOTS], self.NO_SUFFIXES
             )
-        elif paradigm_id == "f_telefon":
-            return Declension(
-                abs_sg=word,
-                con_sg=word,
-                gen_sg="",
-                abs_pl=re.sub(
-                    r"([aiueoAIUEOW])(?=[^aiueoAIUEOW]*$)",
-                    r"\1!",
-                    word.replace("!", ""),
+
+    def form(self, i: int, slot: int) -> Optional[str]:
+        suffix_id = self._rows[i]
+        if suffix_id == self.MISSING:
+            return None
+        return self._form(i, slot, suffix_id)
+
+    def _form(self, i: int, slot: int, suffix_id: int) -> str:
+        j = i * len(SLOTS) + slot
+        offset = self._offsets[j]
+        stem = self._blob[offset : offset + self._lengths[j]].decode()
+        return stem + self._suffixes[suffix_id][slot]
+
+    def __getitem__(self, i: int) -> Optional[Declension]:
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        suffix_id = self._rows[i]
+        if suffix_id == self.MISSING:
+            return None
+        return Declension(
+            *[self._form(i, slot, suffix_id) for slot in range(len(SLOTS))]
+        )
+
+    def __iter__(self) -> Iterator[Optional[Declension]]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def nbytes(self) -> int:
+        return (
+            len(self._blob)
+            + self._offsets.itemsize * len(self._offsets)
+            + self._lengths.itemsize * len(self._lengths)
+            + self._rows.itemsize * len(self._rows)
+        )
+
+
+def decline_table(
+    rows: Iterable[Sequence[str] | LexiconEntry],
+    table: Optional[DeclensionTable] = None,
+) -> DeclensionTable:
+    # failed rows are kept as `None` so row i of the table is row i of `rows`;
+    # use `decline_many` to find out why they failed
+    if table is None:
+        table = DeclensionTable()
+    for entry in parse_rows(rows):
+        if isinstance(entry, DeclineResult):
+            table.append(None)
+            continue
+        try:
+            if entry.paradigm_id.startswith("b_"):
+                abs_sg, suf_sg = split_singular_suffix(
+                    entry.paradigm_id, entry.word, entry.has_suf
                 )
-                + suf_pl,
-                con_pl=word.replace("!", "") + "e!Y",
-                gen_pl="",
-            )
-        elif paradigm_id == "f_geto":
-            return Declension(
-                abs_sg=word,
-                con_sg=word,
-                gen_sg="",
-                abs_pl=word[:-1].replace("!", "") + suf_pl,
-                con_pl=word[:-1].replace("!", "")
-                + ("e!Y" if suf_pl == "im" else suf_pl),
-                gen_pl="",
-            )
-        else:
-            assert False
+                suf_sg = adjust_suf_sg(abs_sg, suf_sg)
+                parts = get_compiled_paradigm(
+                    entry.paradigm_id, suf_sg, entry.suf_pl, split=True
+                )(abs_sg)
+                if parts is None:
+                    table.append(None)
+                else:
+                    table.append_parts(*parts)  # type: ignore[misc]
+            else:
+                table.append(
+                    decline_by_paradigm(
+                        entry.paradigm_id, entry.word, entry.has_suf, entry.suf_pl
+                    )
+                )
+        except Exception:
+            table.append(None)
+    return table
+
+
+def chunked(rows: Iterable, chunk_size: int) -> Iterator[list]:
+    it = iter(rows)
+    while chunk := list(itertools.islice(it, chunk_size)):
+        yield chunk
+
+
+def _decline_chunk(rows: list[Sequence[str] | LexiconEntry]) -> list[DeclineResult]:
+    return list(decline_many(rows))
+
+
+def decline_parallel(
+    rows: Iterable[Sequence[str] | LexiconEntry],
+    jobs: int,
+    chunk_size: int = 2000,
+) -> Iterator[DeclineResult]:
+    if jobs <= 1:
+        yield from decline_many(rows)
+        return
+    # imported here, it is a large share of the import time of this module
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        pending: deque[Future[list[DeclineResult]]] = deque()
+        for chunk in chunked(rows, chunk_size):
+            pending.append(executor.submit(_decline_chunk, chunk))
+            # keep a bounded number of chunks in flight so memory stays flat
+            if len(pending) >= 2 * jobs:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def format_tsv(result: DeclineResult, slots: Sequence[str] = SLOTS) -> str:
+    assert result.entry is not None and result.declension is not None
+    d = result.declension
+    return "\t".join(
+        [result.entry.paradigm_id, result.entry.word]
+        + [getattr(d, slot) for slot in slots]
+    )
+
+
+def format_jsonl(result: DeclineResult, slots: Sequence[str] = SLOTS) -> str:
+    assert result.entry is not None and result.declension is not None
+    d = result.declension
+    record = {"paradigm": result.entry.paradigm_id, "word": result.entry.word}
+    record.update((slot, getattr(d, slot)) for slot in slots)
+    return json.dumps(record, ensure_ascii=False)
+
+
+def _parse_fields(value: str) -> tuple[str, ...]:
+    import argparse
+
+    slots = tuple(s.strip() for s in value.split(",") if s.strip())
+    unknown = [s for s in slots if s not in SLOTS]
+    if unknown or not slots:
+        raise argparse.ArgumentTypeError(
+            f"unknown field(s) {', '.join(unknown)}; choose from {', '.join(SLOTS)}"
+        )
+    return slots
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog="python -m decline",
+        description="decline lexicon rows in the test-data.tsv format",
+    )
+    parser.add_argument(
+        "path", nargs="?", default="-", help="lexicon file, or - for stdin"
+    )
+    parser.add_argument("-j", "--jobs", type=int, default=1)
+    parser.add_argument("--chunk-size", type=int, default=2000)
+    parser.add_argument("--format", choices=["tsv", "jsonl"], default="tsv")
+    parser.add_argument(
+        "--fields",
+        type=_parse_fields,
+        default=SLOTS,
+        help=f"comma-separated slots to write (default: {','.join(SLOTS)})",
+    )
+    parser.add_argument(
+        "-q", "--quiet", action="store_true", help="do not report each failed row"
+    )
+    args = parser.parse_args(argv)
+
+    format_result = format_jsonl if args.format == "jsonl" else format_tsv
+    rows = failures = 0
+    start = time.perf_counter()
+    out = sys.stdout
+    try:
+        for result in decline_parallel(
+            read_rows(args.path), args.jobs, args.chunk_size
+        ):
+            rows += 1
+            if result.ok:
+                out.write(format_result(result, args.fields))
+                out.write("\n")
+            else:
+                failures += 1
+                if not args.quiet:
+                    print(f"{result.entry}: {result.error}", file=sys.stderr)
+        out.flush()
+    except BrokenPipeError:
+        # the reader went away, e.g. `| head`; point stdout at devnull so the
+        # interpreter doesn't fail flushing it again on exit
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+    elapsed = time.perf_counter() - start
+    print(
+        f"{rows} rows, {failures} failed, {elapsed:.2f}s "
+        f"({rows / elapsed if elapsed else 0:,.0f} rows/s)",
+        file=sys.stderr,
+    )
+    return 0
 
 
 if __name__ == "__main__":
-    print(decline_by_paradigm("b_braxa", "b3raxa!H", True, "W!t"))
-    print(decline_by_paradigm("b_em", "Qe!m", False, "W!t"))
+    sys.exit(main())
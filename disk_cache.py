@@ -0,0 +1,178 @@
+from __future__ import annotations
+import sqlite3
+from typing import Iterable, Optional, Sequence
+
+import decline
+import golden
+from decline import CacheKey, Declension, DeclineResult, LexiconEntry
+
+# rows are keyed by `CacheKey` and tagged with the fingerprint of their
+# paradigm (see golden.py), which covers the paradigm's parameters, the rules
+# it runs, the suffix tables and the code that declines. a row whose tag is
+# not the current fingerprint is a miss and is overwritten: editing a rule
+# only invalidates the paradigms that run it, while editing the code or the
+# suffix tables invalidates every row
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS declensions (
+    key TEXT PRIMARY KEY,
+    paradigm TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    forms TEXT
+) WITHOUT ROWID
+"""
+# well below the bound parameters of old sqlite builds (999)
+BATCH = 500
+
+
+def encode_key(key: CacheKey) -> str:
+    paradigm_id, word, has_suf, suf_pl = key
+    return f"{paradigm_id}\t{word}\t{int(has_suf)}\t{suf_pl}"
+
+
+def encode_forms(declension: Optional[Declension]) -> Optional[str]:
+    # `None` is stored as NULL: a lemma no rule matches is cached as well
+    if declension is None:
+        return None
+    return "\t".join(getattr(declension, slot) for slot in decline.SLOTS)
+
+
+def decode_forms(forms: Optional[str]) -> Optional[Declension]:
+    return None if forms is None else Declension(*forms.split("\t"))
+
+
+class DiskCache:
+    def __init__(self, path: str, timeout: float = 30.0) -> None:
+        self.path = path
+        self._db = sqlite3.connect(path, timeout=timeout)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(SCHEMA)
+        self._db.commit()
+        self._engine = golden.engine_fingerprint()
+        self._fingerprints = golden.paradigm_fingerprints(
+            [*decline.paradigm_parameters, *decline.FOREIGN_PARADIGMS]
+        )
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        self._hits = 0
+        self._misses = 0
+        self._stale = 0
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": self._hits, "misses": self._misses, "stale": self._stale}
+
+    def close(self) -> None:
+        self._db.close()
+
+    def __enter__(self) -> DiskCache:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._db.execute("SELECT count(*) FROM declensions").fetchone()[0]
+
+    def fingerprint(self, paradigm_id: str) -> str:
+        fingerprint = self._fingerprints.get(paradigm_id)
+        if fingerprint is None:
+            fingerprint = self._fingerprints[paradigm_id] = golden.paradigm_fingerprint(
+                paradigm_id, self._engine
+            )
+        return fingerprint
+
+    def get_many(
+        self, keys: Iterable[CacheKey]
+    ) -> dict[CacheKey, Optional[Declension]]:
+        # the keys that are cached for the current rules, with their result
+        by_text = {encode_key(key): key for key in keys}
+        texts = list(by_text)
+        found: dict[CacheKey, Optional[Declension]] = {}
+        for i in range(0, len(texts), BATCH):
+            chunk = texts[i : i + BATCH]
+            rows = self._db.execute(
+                "SELECT key, paradigm, fingerprint, forms FROM declensions "
+                f"WHERE key IN ({','.join('?' * len(chunk))})",
+                chunk,
+            )
+            for text, paradigm_id, fingerprint, forms in rows:
+                if fingerprint == self.fingerprint(paradigm_id):
+                    found[by_text[text]] = decode_forms(forms)
+                else:
+                    self._stale += 1
+        self._hits += len(found)
+        self._misses += len(by_text) - len(found)
+        return found
+
+    def put_many(self, items: Iterable[tuple[CacheKey, Optional[Declension]]]) -> None:
+        self._db.executemany(
+            "INSERT OR REPLACE INTO declensions VALUES (?, ?, ?, ?)",
+            (
+                (
+                    encode_key(key),
+                    key[0],
+                    self.fingerprint(key[0]),
+                    encode_forms(declension),
+                )
+                for key, declension in items
+            ),
+        )
+        self._db.commit()
+
+    def decline(
+        self, paradigm_id: str, word: str, has_suf: bool, suf_pl: str
+    ) -> Optional[Declension]:
+        key = (paradigm_id, word, has_suf, suf_pl)
+        found = self.get_many([key])
+        if key in found:
+            return found[key]
+        declension = decline.decline_by_paradigm(paradigm_id, word, has_suf, suf_pl)
+        self.put_many([(key, declension)])
+        return declension
+
+    def decline_batch(self, entries: Sequence[LexiconEntry]) -> list[DeclineResult]:
+        # one lookup and one write for the whole batch; rows that raise are
+        # reported like `decline_entry` does and are not stored
+        keys = [(e.paradigm_id, e.word, e.has_suf, e.suf_pl) for e in entries]
+        found = self.get_many(keys)
+        declined: dict[CacheKey, DeclineResult] = {}
+        results = []
+        for entry, key in zip(entries, keys):
+            if key in found:
+                declension = found[key]
+                if declension is None:
+                    results.append(DeclineResult(entry, None, "no rule matched"))
+                else:
+                    results.append(DeclineResult(entry, declension))
+                continue
+            result = declined.get(key)
+            if result is None:
+                result = declined[key] = decline.decline_entry(entry)
+            elif result.entry is not entry:
+                result = DeclineResult(entry, result.declension, result.error)
+            results.append(result)
+        self.put_many(
+            (key, result.declension)
+            for key, result in declined.items()
+            if result.ok or result.error == "no rule matched"
+        )
+        return results
+
+    def prune(self) -> int:
+        # deletes the rows of rules that have since changed
+        stale = [
+            (paradigm_id, fingerprint)
+            for paradigm_id, fingerprint in self._db.execute(
+                "SELECT DISTINCT paradigm, fingerprint FROM declensions"
+            )
+            if fingerprint != self.fingerprint(paradigm_id)
+        ]
+        deleted = 0
+        for paradigm_id, fingerprint in stale:
+            deleted += self._db.execute(
+                "DELETE FROM declensions WHERE paradigm = ? AND fingerprint = ?",
+                (paradigm_id, fingerprint),
+            ).rowcount
+        self._db.commit()
+        return deleted
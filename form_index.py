@@ -0,0 +1,221 @@
+from __future__ import annotations
+import mmap
+import struct
+import sys
+from dataclasses import dataclass
+from typing import Iterable, Optional, Sequence
+
+import decline
+from decline import SLOTS
+
+MAGIC = b"HDFI"
+VERSION = 1
+# magic, version, n_forms, n_postings, n_lemmas, n_paradigms,
+# and the byte lengths of the form, lemma and paradigm blobs
+HEADER = struct.Struct("<4sIIIIIIII")
+U32 = struct.Struct("<I")
+U16 = struct.Struct("<H")
+
+
+@dataclass
+class FormHit:
+    lemma: str
+    paradigm_id: str
+    slot: str
+
+
+def _offsets(strings: Sequence[bytes]) -> tuple[list[int], bytes]:
+    offsets = [0]
+    for s in strings:
+        offsets.append(offsets[-1] + len(s))
+    return offsets, b"".join(strings)
+
+
+def _pack(fmt: str, values: Sequence[int]) -> bytes:
+    return struct.pack(f"<{len(values)}{fmt}", *values)
+
+
+def build_index(rows: Iterable[Sequence[str] | decline.LexiconEntry], path: str) -> int:
+    paradigm_ids: dict[str, int] = {}
+    lemmas: list[bytes] = []
+    lemma_paradigms: list[int] = []
+    postings: list[tuple[bytes, int, int]] = []
+
+    for result in decline.decline_many(rows):
+        if not result.ok:
+            continue
+        assert result.entry is not None and result.declension is not None
+        lemma_id = len(lemmas)
+        lemmas.append(result.entry.word.encode())
+        lemma_paradigms.append(
+            paradigm_ids.setdefault(result.entry.paradigm_id, len(paradigm_ids))
+        )
+        for slot_id, slot in enumerate(SLOTS):
+            form = getattr(result.declension, slot)
+            if form:
+                postings.append((form.encode(), lemma_id, slot_id))
+
+    postings.sort()
+    forms: list[bytes] = []
+    posting_offsets: list[int] = []
+    for i, (form, _, _) in enumerate(postings):
+        if not forms or forms[-1] != form:
+            forms.append(form)
+            posting_offsets.append(i)
+    posting_offsets.append(len(postings))
+
+    form_offsets, form_blob = _offsets(forms)
+    lemma_offsets, lemma_blob = _offsets(lemmas)
+    paradigm_offsets, paradigm_blob = _offsets([p.encode() for p in paradigm_ids])
+
+    with open(path, "wb") as f:
+        f.write(
+            HEADER.pack(
+                MAGIC,
+                VERSION,
+                len(forms),
+                len(postings),
+                len(lemmas),
+                len(paradigm_ids),
+                len(form_blob),
+                len(lemma_blob),
+                len(paradigm_blob),
+            )
+        )
+        f.write(_pack("I", form_offsets))
+        f.write(_pack("I", posting_offsets))
+        f.write(_pack("I", [lemma_id for _, lemma_id, _ in postings]))
+        f.write(_pack("I", lemma_offsets))
+        f.write(_pack("I", paradigm_offsets))
+        f.write(_pack("H", lemma_paradigms))
+        f.write(bytes(slot_id for _, _, slot_id in postings))
+        f.write(form_blob)
+        f.write(lemma_blob)
+        f.write(paradigm_blob)
+    return len(lemmas)
+
+
+# the file is mapped, not parsed: a lookup is a binary search over the sorted forms
+class FormIndex:
+    def __init__(self, path: str) -> None:
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (
+            magic,
+            version,
+            self.n_forms,
+            self.n_postings,
+            self.n_lemmas,
+            n_paradigms,
+            form_blob_len,
+            lemma_blob_len,
+            _,
+        ) = HEADER.unpack_from(self._mm)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a form index (version {VERSION})")
+
+        pos = HEADER.size
+        self._form_offsets = pos
+        pos += 4 * (self.n_forms + 1)
+        self._posting_offsets = pos
+        pos += 4 * (self.n_forms + 1)
+        self._posting_lemmas = pos
+        pos += 4 * self.n_postings
+        self._lemma_offsets = pos
+        pos += 4 * (self.n_lemmas + 1)
+        self._paradigm_offsets = pos
+        pos += 4 * (n_paradigms + 1)
+        self._lemma_paradigms = pos
+        pos += 2 * self.n_lemmas
+        self._posting_slots = pos
+        pos += self.n_postings
+        self._form_blob = pos
+        pos += form_blob_len
+        self._lemma_blob = pos
+        pos += lemma_blob_len
+        self._paradigm_blob = pos
+        self._paradigms = [
+            self._string(self._paradigm_offsets, self._paradigm_blob, i).decode()
+            for i in range(n_paradigms)
+        ]
+
+    def close(self) -> None:
+        self._mm.close()
+
+    def __enter__(self) -> FormIndex:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _u32(self, base: int, i: int) -> int:
+        return U32.unpack_from(self._mm, base + 4 * i)[0]
+
+    def _string(self, offsets: int, blob: int, i: int) -> bytes:
+        start = self._u32(offsets, i)
+        end = self._u32(offsets, i + 1)
+        return self._mm[blob + start : blob + end]
+
+    def _find(self, form: bytes) -> Optional[int]:
+        lo, hi = 0, self.n_forms
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._string(self._form_offsets, self._form_blob, mid) < form:
+                lo = mid + 1
+            else:
+                hi = mid
+        if (
+            lo < self.n_forms
+            and self._string(self._form_offsets, self._form_blob, lo) == form
+        ):
+            return lo
+        return None
+
+    def lookup(self, form: str) -> list[FormHit]:
+        i = self._find(form.encode())
+        if i is None:
+            return []
+        start = self._u32(self._posting_offsets, i)
+        end = self._u32(self._posting_offsets, i + 1)
+        hits = []
+        for p in range(start, end):
+            lemma_id = self._u32(self._posting_lemmas, p)
+            lemma = self._string(self._lemma_offsets, self._lemma_blob, lemma_id)
+            (paradigm,) = U16.unpack_from(
+                self._mm, self._lemma_paradigms + 2 * lemma_id
+            )
+            hits.append(
+                FormHit(
+                    lemma=lemma.decode(),
+                    paradigm_id=self._paradigms[paradigm],
+                    slot=SLOTS[self._mm[self._posting_slots + p]],
+                )
+            )
+        return hits
+
+
+def main() -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="inflected form -> lemma index")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("build")
+    p.add_argument("lexicon")
+    p.add_argument("index")
+    p = sub.add_parser("lookup")
+    p.add_argument("index")
+    p.add_argument("forms", nargs="+")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        n = build_index(decline.read_rows(args.lexicon), args.index)
+        print(f"indexed {n} lemmas", file=sys.stderr)
+    else:
+        with FormIndex(args.index) as index:
+            for form in args.forms:
+                for hit in index.lookup(form):
+                    print(f"{form}\t{hit.lemma}\t{hit.paradigm_id}\t{hit.slot}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,301 @@
+from __future__ import annotations
+import hashlib
+import json
+import os
+import re
+import sys
+import types
+from dataclasses import dataclass, field, fields
+from typing import Iterable, Optional, Sequence
+
+import decline
+from decline import SLOTS, Paradigm, TrySubMixin
+
+VERSION = 1
+RULE_ENUMS = (decline.REConSG, decline.REGenSG, decline.REAbsPL, decline.REConPL)
+# where declining starts; every function of `decline` they reach is followed
+ROOTS = (
+    decline.decline_by_paradigm,
+    TrySubMixin.__init__,
+    TrySubMixin.try_sub,
+    decline.LazyPattern.compile,
+)
+# module data that is fingerprinted per paradigm rather than as a whole
+PER_PARADIGM = {"paradigm_parameters"}
+# the rule a stem dispatch runs instead of a paradigm's own for some singular
+# suffixes, see `make_con_sg_stem` and `make_gen_sg_stem`
+SUFFIX_RULES: dict[TrySubMixin, TrySubMixin] = {
+    decline.REConSG.C3: decline.REConSG.C38,
+    decline.REGenSG.C30: decline.REGenSG.C31,
+}
+# module data that is filled in at run time
+RUNTIME_STATE = {
+    "_compiled_paradigms",
+    "_front_ends",
+    "_shared_patterns",
+    "_rule_snapshot",
+}
+
+Forms = Optional[list[str]]
+
+
+class _Hasher:
+    def __init__(self) -> None:
+        self._seen: set[int] = set()
+        self._h = hashlib.blake2b(digest_size=16)
+
+    def update(self, *parts: object) -> None:
+        for part in parts:
+            self._h.update(repr(part).encode())
+            self._h.update(b"\0")
+
+    def hexdigest(self) -> str:
+        return self._h.hexdigest()
+
+    def code(self, code: types.CodeType) -> None:
+        if id(code) in self._seen:
+            return
+        self._seen.add(id(code))
+        self.update(code.co_code, code.co_names)
+        for const in code.co_consts:
+            if isinstance(const, types.CodeType):
+                self.code(const)
+            else:
+                self.update(const)
+        for name in code.co_names:
+            value = decline.__dict__.get(name)
+            if isinstance(value, types.FunctionType):
+                self.code(value.__code__)
+            elif isinstance(value, type) and issubclass(value, TrySubMixin):
+                # a rule picked by name, e.g. `REConSG.C38` in a dispatch, is
+                # fingerprinted with the paradigms that run it, see
+                # SUFFIX_RULES; here only its name counts, in co_names
+                continue
+            elif name not in PER_PARADIGM and name not in RUNTIME_STATE:
+                self.data(name, value)
+
+    def data(self, name: object, value: object) -> None:
+        # only what has a stable repr: sets are sorted, and functions in a
+        # dispatch table are followed like those called by name
+        if isinstance(value, types.FunctionType):
+            self.code(value.__code__)
+        elif isinstance(value, (frozenset, set)):
+            self.update(name, sorted(value))
+        elif isinstance(value, dict):
+            self.update(name)
+            for key, item in value.items():
+                self.data(key, item)
+        elif isinstance(value, re.Pattern):
+            self.update(name, value.pattern, value.flags)
+        elif isinstance(value, (str, int, float, tuple, list)):
+            self.update(name, value)
+
+    def rule(self, rule: TrySubMixin) -> None:
+        if id(rule) in self._seen:
+            return
+        self._seen.add(id(rule))
+        # the pattern as written: once compiled its flags gain re.UNICODE
+        pattern, repl = rule.value
+        self.update(str(rule), pattern.pattern, pattern.flags)
+        if isinstance(repl, str):
+            self.update(repl)
+        else:
+            self.code(repl.__code__)
+
+
+def engine_fingerprint() -> str:
+    h = _Hasher()
+    for root in ROOTS:
+        h.code(root.__code__)
+    return h.hexdigest()
+
+
+def paradigm_fingerprint(paradigm_id: str, engine: str) -> str:
+    h = _Hasher()
+    h.update(engine, paradigm_id)
+    paradigm: Optional[Paradigm] = decline.paradigm_parameters.get(paradigm_id)
+    if paradigm is not None:
+        for f in fields(paradigm):
+            value = getattr(paradigm, f.name)
+            if isinstance(value, TrySubMixin):
+                h.rule(value)
+                suffix_rule = SUFFIX_RULES.get(value)
+                if suffix_rule is not None:
+                    h.rule(suffix_rule)
+            else:
+                h.update(f.name, value)
+    return h.hexdigest()
+
+
+def paradigm_fingerprints(paradigm_ids: Iterable[str]) -> dict[str, str]:
+    engine = engine_fingerprint()
+    return {p: paradigm_fingerprint(p, engine) for p in sorted(set(paradigm_ids))}
+
+
+def row_key(row: Sequence[str]) -> str:
+    return "\t".join(row)
+
+
+@dataclass
+class Golden:
+    fingerprints: dict[str, str] = field(default_factory=dict)
+    rows: dict[str, Forms] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, path: str) -> Golden:
+        if not os.path.exists(path):
+            return cls()
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != VERSION:
+            return cls()
+        return cls(data["fingerprints"], data["rows"])
+
+    def save(self, path: str) -> None:
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "version": VERSION,
+                    "fingerprints": self.fingerprints,
+                    "rows": self.rows,
+                },
+                f,
+                ensure_ascii=False,
+                indent=0,
+                sort_keys=True,
+            )
+        os.replace(tmp, path)
+
+
+@dataclass
+class ParadigmDiff:
+    rows: int = 0
+    added: int = 0
+    removed: int = 0
+    changed: int = 0
+    examples: list[str] = field(default_factory=list)
+
+    @property
+    def clean(self) -> bool:
+        return not (self.added or self.removed or self.changed)
+
+
+def _forms(result: decline.DeclineResult) -> Forms:
+    if result.declension is None:
+        return None
+    return [getattr(result.declension, slot) for slot in SLOTS]
+
+
+def _compare(key: str, old: Forms, new: Forms, diff: ParadigmDiff) -> None:
+    # a form is added or removed when its slot gains or loses a value
+    for i, slot in enumerate(SLOTS):
+        before = None if old is None else old[i]
+        after = None if new is None else new[i]
+        if before == after:
+            continue
+        if before is None:
+            diff.added += 1
+        elif after is None:
+            diff.removed += 1
+        else:
+            diff.changed += 1
+        diff.examples.append(f"{key}\t{slot}\t{before} -> {after}")
+
+
+@dataclass
+class Report:
+    diffs: dict[str, ParadigmDiff]
+    rechecked: int
+    total: int
+
+    @property
+    def clean(self) -> bool:
+        return all(d.clean for d in self.diffs.values())
+
+
+def check(
+    rows: Iterable[Sequence[str]],
+    golden: Golden,
+    jobs: int = 1,
+    update: bool = False,
+) -> Report:
+    # re-declines the rows that are new or whose paradigm's fingerprint changed.
+    # a paradigm whose rows come out as before gets its new fingerprint even
+    # without `update`, so the next run skips it again
+    rows = [list(r) for r in rows]
+    fingerprints = paradigm_fingerprints(r[0] for r in rows if r)
+    stale = {p for p, fp in fingerprints.items() if golden.fingerprints.get(p) != fp}
+    keys = [row_key(r) for r in rows]
+    todo = [
+        (key, row)
+        for key, row in zip(keys, rows)
+        if not row or row[0] in stale or key not in golden.rows
+    ]
+
+    diffs: dict[str, ParadigmDiff] = {}
+    new_rows: dict[str, Forms] = {}
+    results = decline.decline_parallel([row for _, row in todo], jobs)
+    for (key, row), result in zip(todo, results):
+        paradigm_id = row[0] if row else ""
+        diff = diffs.setdefault(paradigm_id, ParadigmDiff())
+        diff.rows += 1
+        new_rows[key] = forms = _forms(result)
+        _compare(key, golden.rows.get(key), forms, diff)
+
+    current = set(keys)
+    for key in [k for k in golden.rows if k not in current]:
+        diff = diffs.setdefault(key.split("\t", 1)[0], ParadigmDiff())
+        _compare(key, golden.rows[key], None, diff)
+        if update:
+            del golden.rows[key]
+
+    for paradigm_id, fp in fingerprints.items():
+        if update or diffs.get(paradigm_id, ParadigmDiff()).clean:
+            golden.fingerprints[paradigm_id] = fp
+    for key, forms in new_rows.items():
+        if update or diffs[key.split("\t", 1)[0]].clean:
+            golden.rows[key] = forms
+    return Report(diffs, len(todo), len(rows))
+
+
+def main() -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="re-decline the rows whose paradigm changed and diff them "
+        "against stored golden output"
+    )
+    parser.add_argument("lexicon")
+    parser.add_argument("golden", help="golden store, created on the first run")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1)
+    parser.add_argument(
+        "--update", action="store_true", help="accept the new output as golden"
+    )
+    parser.add_argument("--show", type=int, default=5, help="diffs per paradigm")
+    args = parser.parse_args()
+
+    # a new store takes the current output as golden
+    update = args.update or not os.path.exists(args.golden)
+    golden = Golden.load(args.golden)
+    report = check(decline.read_rows(args.lexicon), golden, args.jobs, update)
+    golden.save(args.golden)
+
+    print(f"rechecked {report.rechecked} of {report.total} rows")
+    for paradigm_id, diff in sorted(report.diffs.items()):
+        if diff.clean:
+            continue
+        print(
+            f"{paradigm_id}: {diff.rows} rows, +{diff.added} -{diff.removed} "
+            f"~{diff.changed} forms"
+        )
+        for line in diff.examples[: args.show] if not update else []:
+            print(f"  {line}")
+    if report.clean or update:
+        return 0
+    print("differences found; rerun with --update to accept them", file=sys.stderr)
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,238 @@
+from __future__ import annotations
+import re
+from typing import Iterable, Literal, Optional, Sequence, cast
+
+import decline
+from decline import (
+    Declension,
+    DeclineResult,
+    LexiconEntry,
+    REAbsPL,
+    REConPL,
+    REConSG,
+    REGenSG,
+    TrySubMixin,
+)
+
+# rows of a column are joined with a newline, which no rule pattern can match
+# across: none of them has a `.` with DOTALL or a negated character class
+SEP = "\n"
+Column = list[Optional[str]]
+GroupKey = tuple[str, str, str]
+
+_multiline_patterns: dict[re.Pattern, re.Pattern] = {}
+_strip = re.compile(r"[Á!]").sub
+
+
+def _multiline(pattern: re.Pattern) -> re.Pattern:
+    # the same pattern with `$` matching at the end of every row of a column
+    multiline = _multiline_patterns.get(pattern)
+    if multiline is None:
+        multiline = _multiline_patterns[pattern] = re.compile(
+            pattern.pattern, pattern.flags | re.MULTILINE
+        )
+    return multiline
+
+
+def _split(buffer: str, n: int) -> list[str]:
+    words = buffer.split(SEP)
+    if len(words) != n:
+        raise ValueError("a word of the column contains a newline")
+    return words
+
+
+def column_try_sub(rule: TrySubMixin, words: Sequence[str]) -> Column:
+    # `[rule.try_sub(w) for w in words]` with one substitution over the whole
+    # column. a row that comes out unchanged is searched again on its own, to
+    # tell a rule that did not match from one that rewrote the row to itself
+    if not words:
+        return []
+    rule.compile()
+    search = rule.pattern.search
+    buffer = _multiline(rule.pattern).sub(rule.repl, SEP.join(words))
+    subbed = _split(buffer, len(words))
+    return [
+        new if new != old or search(old) is not None else None
+        for old, new in zip(words, subbed)
+    ]
+
+
+def column_strip(words: Sequence[str]) -> list[str]:
+    return _split(_strip("", SEP.join(words)), len(words)) if words else []
+
+
+def con_sg_column(
+    con_sg: str | REConSG | Literal[0], suf_sg: str, abs_sg: list[str]
+) -> Column:
+    if isinstance(con_sg, str):
+        return [con_sg] * len(abs_sg)
+    elif con_sg == 0:
+        return list(abs_sg)
+    elif con_sg is REConSG.C3 and suf_sg in ("E!H", "a!H", "e!H"):
+        return column_try_sub(REConSG.C38, abs_sg)
+    else:
+        return column_try_sub(con_sg, abs_sg)
+
+
+def gen_sg_column(
+    gen_sg: str | Literal[0] | REGenSG,
+    suf_sg: str,
+    abs_sg: list[str],
+    con_sg: list[str],
+) -> Column:
+    if gen_sg == 0:
+        if suf_sg == "E!H":
+            return list(abs_sg)
+        return list(column_strip(con_sg))
+    elif isinstance(gen_sg, str):
+        return [gen_sg] * len(abs_sg)
+    elif gen_sg in [REGenSG.C2, REGenSG.C4, REGenSG.C9, REGenSG.C10, REGenSG.C19]:
+        return column_try_sub(gen_sg, column_strip(con_sg))
+    elif gen_sg in [REGenSG.C8, REGenSG.C16]:
+        return column_try_sub(gen_sg, con_sg)
+    elif gen_sg is REGenSG.C30 and suf_sg in ("a!H_Et", "a!H_At"):
+        return column_try_sub(REGenSG.C31, abs_sg)
+    else:
+        return column_try_sub(gen_sg, abs_sg)
+
+
+def abs_pl_column(
+    abs_pl: REAbsPL | str | Literal[0],
+    abs_sg: list[str],
+    con_sg: list[str],
+    gen_sg: list[str],
+) -> Column:
+    if abs_pl == 0:
+        return list(gen_sg)
+    elif isinstance(abs_pl, str):
+        return [abs_pl] * len(abs_sg)
+    elif abs_pl in [REAbsPL.C42, REAbsPL.C46, REAbsPL.C52]:
+        return column_try_sub(abs_pl, abs_sg)
+    elif abs_pl in [REAbsPL.C47, REAbsPL.C55]:
+        return column_try_sub(abs_pl, con_sg)
+    else:
+        return column_try_sub(abs_pl, gen_sg)
+
+
+def con_pl_column(
+    con_pl: str | Literal[1, 2] | REConPL, abs_pl: list[str], gen_sg: list[str]
+) -> Column:
+    if isinstance(con_pl, str):
+        return [con_pl] * len(abs_pl)
+    elif con_pl == 1:
+        return list(abs_pl)
+    elif con_pl == 2:
+        return list(gen_sg)
+    elif con_pl in [REConPL.C66, REConPL.C67]:
+        return column_try_sub(con_pl, gen_sg)
+    else:
+        return column_try_sub(con_pl, abs_pl)
+
+
+def _keep(stems: Column, columns: list[list]) -> tuple[list[str], list[list]]:
+    # drops the rows whose stem is `None` from the stems and every column
+    if None not in stems:
+        return cast(list[str], stems), columns
+    alive = [i for i, s in enumerate(stems) if s is not None]
+    kept = [s for s in stems if s is not None]
+    return kept, [[column[i] for i in alive] for column in columns]
+
+
+def decline_column(
+    paradigm_id: str, suf_sg: str, suf_pl: str, abs_sg: Sequence[str]
+) -> list[Optional[Declension]]:
+    # every row of one group: the same paradigm and suffixes, `suf_sg` already
+    # through `adjust_suf_sg`. a stage runs once over the rows still alive
+    paradigm = decline.paradigm_parameters[paradigm_id]
+    suffixes = decline.make_suffixes(suf_sg, suf_pl)
+
+    declensions: list[Optional[Declension]] = [None] * len(abs_sg)
+    rows = list(range(len(abs_sg)))
+    abs_sg = list(abs_sg)
+    con_sg, (rows, abs_sg) = _keep(
+        con_sg_column(paradigm.con_sg, suf_sg, abs_sg), [rows, abs_sg]
+    )
+    gen_sg, (rows, abs_sg, con_sg) = _keep(
+        gen_sg_column(paradigm.gen_sg, suf_sg, abs_sg, con_sg), [rows, abs_sg, con_sg]
+    )
+    # raised where the compiled paradigm raises, once a row gets this far
+    if suffixes.gen_sg is None and rows:
+        raise KeyError(suf_sg)
+    if "" in gen_sg:
+        raise IndexError("empty gen_sg stem")
+    abs_pl, (rows, abs_sg, con_sg, gen_sg) = _keep(
+        abs_pl_column(paradigm.abs_pl, abs_sg, con_sg, gen_sg),
+        [rows, abs_sg, con_sg, gen_sg],
+    )
+    if suffixes.con_pl is None and rows:
+        raise KeyError(suf_pl)
+    con_pl, (rows, abs_sg, con_sg, gen_sg, abs_pl) = _keep(
+        con_pl_column(paradigm.con_pl, abs_pl, gen_sg),
+        [rows, abs_sg, con_sg, gen_sg, abs_pl],
+    )
+
+    gen_pl = abs_pl if paradigm.gen_pl == 1 else con_pl
+    gen_sg_suffixes = (suffixes.gen_sg or "") + "i", suffixes.gen_sg or ""
+    for i, a_sg, c_sg, g_sg, a_pl, c_pl, g_pl in zip(
+        rows, abs_sg, con_sg, gen_sg, abs_pl, con_pl, gen_pl
+    ):
+        declensions[i] = Declension(
+            abs_sg=a_sg + suffixes.abs_sg,
+            con_sg=c_sg + suffixes.con_sg,
+            gen_sg=g_sg + gen_sg_suffixes[g_sg[-1] == "i"],
+            abs_pl=a_pl + suffixes.abs_pl,
+            con_pl=c_pl + (suffixes.con_pl or ""),
+            gen_pl=g_pl + suffixes.gen_pl,
+        )
+    return declensions
+
+
+def decline_grouped(
+    rows: Iterable[Sequence[str] | LexiconEntry],
+) -> list[DeclineResult]:
+    # what `list(decline_many(rows))` returns, with the b_* rows grouped by
+    # paradigm and suffixes and each group declined by `decline_column`. rows
+    # the column path does not cover, and every row of a group that raises,
+    # go through `decline_entry` so their errors read the same
+    results: list[Optional[DeclineResult]] = []
+    groups: dict[GroupKey, list[tuple[int, LexiconEntry, str]]] = {}
+    per_row = decline._instrumentation is not None
+    for entry in decline.parse_rows(rows):
+        i = len(results)
+        results.append(None)
+        if isinstance(entry, DeclineResult):
+            results[i] = entry
+            continue
+        if (
+            per_row
+            or not entry.paradigm_id.startswith("b_")
+            or entry.paradigm_id not in decline.paradigm_parameters
+        ):
+            results[i] = decline.decline_entry(entry)
+            continue
+        try:
+            abs_sg, suf_sg = decline.split_singular_suffix(
+                entry.paradigm_id, entry.word, entry.has_suf
+            )
+            suf_sg = decline.adjust_suf_sg(abs_sg, suf_sg)
+        except Exception:
+            results[i] = decline.decline_entry(entry)
+            continue
+        key = (entry.paradigm_id, suf_sg, entry.suf_pl)
+        groups.setdefault(key, []).append((i, entry, abs_sg))
+
+    for (paradigm_id, suf_sg, suf_pl), members in groups.items():
+        try:
+            declensions = decline_column(
+                paradigm_id, suf_sg, suf_pl, [abs_sg for _, _, abs_sg in members]
+            )
+        except Exception:
+            for i, entry, _ in members:
+                results[i] = decline.decline_entry(entry)
+            continue
+        for (i, entry, _), declension in zip(members, declensions):
+            if declension is None:
+                results[i] = DeclineResult(entry, None, "no rule matched")
+            else:
+                results[i] = DeclineResult(entry, declension)
+    return results  # type: ignore[return-value]
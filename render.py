@@ -0,0 +1,175 @@
+from __future__ import annotations
+import os
+import re
+import sys
+from typing import Iterable, Optional
+
+from decline import SLOTS, Declension
+
+DAGESH = "\u05bc"
+SHIN_DOT = "\u05c1"
+SIN_DOT = "\u05c2"
+GERESH = "\u05f3"
+
+# the letters of the transliteration. "_" before a letter is a dagesh forte and
+# a letter is written in its final form when nothing but points follows it
+LETTERS = {
+    "Q": "\u05d0",
+    "b": "\u05d1" + DAGESH,
+    "v": "\u05d1",
+    "G": "\u05d2" + DAGESH,
+    "g": "\u05d2",
+    "X": "\u05d2" + GERESH,
+    "D": "\u05d3" + DAGESH,
+    "d": "\u05d3",
+    "h": "\u05d4",
+    "H": "\u05d4",
+    "w": "\u05d5",
+    "z": "\u05d6",
+    "j": "\u05d7",
+    "7": "\u05d8",
+    "y": "\u05d9",
+    "Y": "\u05d9",
+    "k": "\u05db" + DAGESH,
+    "x": "\u05db",
+    "l": "\u05dc",
+    "m": "\u05de",
+    "n": "\u05e0",
+    "s": "\u05e1",
+    "R": "\u05e2",
+    "p": "\u05e4" + DAGESH,
+    "f": "\u05e4",
+    "Z": "\u05e6",
+    "C": "\u05e6" + GERESH,
+    "q": "\u05e7",
+    "r": "\u05e8",
+    "c": "\u05e9" + SHIN_DOT,
+    "S": "\u05e9" + SIN_DOT,
+    "T": "\u05ea" + DAGESH,
+    "t": "\u05ea",
+}
+FINAL_LETTERS = {
+    "k": "\u05da" + DAGESH,
+    "x": "\u05da",
+    "m": "\u05dd",
+    "n": "\u05df",
+    "p": "\u05e3" + DAGESH,
+    "f": "\u05e3",
+    "Z": "\u05e5",
+    "C": "\u05e5" + GERESH,
+}
+POINTS = {
+    "3": "\u05b0",  # shva
+    "é": "\u05b1",  # hataf segol
+    "á": "\u05b2",  # hataf patah
+    "ó": "\u05b3",  # hataf qamats
+    "I": "\u05b4",  # hiriq
+    "e": "\u05b5",  # tsere
+    "E": "\u05b6",  # segol
+    "A": "\u05b7",  # patah
+    "Á": "\u05b7",  # furtive patah
+    "a": "\u05b8",  # qamats
+    "O": "\u05c7",  # qamats qatan
+    "o": "\u05b9",  # holam
+    "U": "\u05bb",  # qubuts
+}
+# vowels written with a mater lectionis
+VOWEL_LETTERS = {
+    "i": "\u05b4" + "\u05d9",
+    "u": "\u05d5" + DAGESH,
+    "W": "\u05d5" + "\u05b9",
+}
+MARKS = {
+    "!": "",  # stress is not written
+    "-": "\u05be",  # maqaf
+}
+
+# the final-form letters are first swapped for code points the transliteration
+# never uses, so that one `str.translate` does everything else
+_FINAL_PLACEHOLDERS = {c: chr(0xE000 + i) for i, c in enumerate(FINAL_LETTERS)}
+_FINAL = re.compile(
+    "([" + "".join(FINAL_LETTERS) + "])(?=[" + "".join(POINTS) + "!]*(?![^-\\s]))"
+)
+# the transliteration only writes a vocal shva; a silent one goes under a
+# consonant followed by another, except on a quiescent aleph, and under a
+# final kaf
+_CONSONANTS = "".join(c for c in LETTERS if c not in "QHY")
+_SILENT_SHVA = re.compile(
+    "(?<=[" + _CONSONANTS + "])(?=[_" + _CONSONANTS + "Q])|(?<=[xk])(?![^-\\s])"
+)
+# a dagesh forte on a letter that is already written with a dagesh
+_REDUNDANT_DAGESH = re.compile(
+    "_(?=[" + "".join(c for c, h in LETTERS.items() if h.endswith(DAGESH)) + "])"
+)
+_DAGESH_FORTE = re.compile("_(.)")
+# a geresh goes after the points of its letter
+_GERESH = re.compile(GERESH + "([\u05b0-\u05bc\u05c1\u05c2\u05c7]+)")
+TABLE = str.maketrans(
+    {
+        **LETTERS,
+        **POINTS,
+        **VOWEL_LETTERS,
+        **MARKS,
+        **{p: FINAL_LETTERS[c] for c, p in _FINAL_PLACEHOLDERS.items()},
+    }
+)
+
+
+def _final(m: re.Match) -> str:
+    return _FINAL_PLACEHOLDERS[m[1]]
+
+
+def render(text: str) -> str:
+    # any number of words, separated by whitespace or a maqaf
+    text = _SILENT_SHVA.sub("3", _REDUNDANT_DAGESH.sub("", text))
+    text = _FINAL.sub(_final, text)
+    text = _DAGESH_FORTE.sub("\\1" + DAGESH, text.translate(TABLE))
+    if GERESH in text:
+        text = _GERESH.sub("\\1" + GERESH, text)
+    return text
+
+
+def _forms(declension: Declension) -> tuple[str, ...]:
+    return tuple(getattr(declension, slot) for slot in SLOTS)
+
+
+def render_declension(declension: Declension) -> Declension:
+    return Declension(*render("\n".join(_forms(declension))).split("\n"))
+
+
+def render_table(
+    declensions: Iterable[Optional[Declension]],
+) -> list[Optional[Declension]]:
+    # every form of the table goes through `render` as one string, so the
+    # regexes and the translation run once instead of once per form
+    declensions = list(declensions)
+    text = "\n".join("\n".join(_forms(d)) for d in declensions if d is not None)
+    forms = iter(render(text).split("\n"))
+    return [
+        None if d is None else Declension(*[next(forms) for _ in SLOTS])
+        for d in declensions
+    ]
+
+
+def main() -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="render the output of `python -m decline` in pointed Hebrew"
+    )
+    parser.add_argument("path", nargs="?", default="-", help="TSV, or - for stdin")
+    args = parser.parse_args()
+
+    lines = sys.stdin if args.path == "-" else open(args.path, encoding="utf-8")
+    try:
+        with lines:
+            for line in lines:
+                paradigm_id, sep, forms = line.rstrip("\n").partition("\t")
+                print(paradigm_id + sep + render(forms))
+        sys.stdout.flush()
+    except BrokenPipeError:
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+
+
+if __name__ == "__main__":
+    main()
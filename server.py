@@ -0,0 +1,336 @@
+from __future__ import annotations
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import asdict
+from typing import Optional, Sequence
+
+import decline
+from decline import DeclineResult, LexiconEntry
+
+# line-delimited JSON: each request line is an object with "paradigm", "word",
+# "has_suf" and "suf_pl" (as in LexiconEntry, with the plural suffix spelled as
+# in test-data.tsv) and an optional "id" echoed back. each response line has
+# the "id", a "declension" object or null, and an "error" if there is one.
+# responses on one connection come back in completion order, not request order
+
+
+def parse_request(line: bytes) -> tuple[object, LexiconEntry]:
+    request = json.loads(line)
+    paradigm_id = request["paradigm"]
+    suf_pl = request["suf_pl"]
+    if paradigm_id.startswith("b_"):
+        # only the b_ paradigms take the stressed spelling, as in
+        # `decline.parse_row`; the f_ ones use the lexicon's own
+        suf_pl = decline.TSV_SUF_PL.get(suf_pl, suf_pl)
+    return request.get("id"), LexiconEntry(
+        paradigm_id=paradigm_id,
+        word=request["word"],
+        has_suf=bool(request["has_suf"]),
+        suf_pl=suf_pl,
+    )
+
+
+def format_response(request_id: object, result: DeclineResult) -> bytes:
+    response = {
+        "id": request_id,
+        "declension": None if result.declension is None else asdict(result.declension),
+    }
+    if result.error is not None:
+        response["error"] = result.error
+    return json.dumps(response, ensure_ascii=False).encode() + b"\n"
+
+
+Pending = tuple[LexiconEntry, "asyncio.Future[DeclineResult]"]
+
+
+class MicroBatcher:
+    # requests wait on a bounded queue; a batch is cut once it has `max_batch`
+    # entries or its first entry has waited `max_wait` seconds, and at most
+    # `max_in_flight` batches run on `executor` at once. `submit` blocks while
+    # the queue is full, which is how backpressure reaches the clients
+    def __init__(
+        self,
+        executor: Executor,
+        max_batch: int = 256,
+        max_wait: float = 0.002,
+        max_queue: int = 4096,
+        max_in_flight: int = 1,
+    ) -> None:
+        self.executor = executor
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.queue: asyncio.Queue[Pending] = asyncio.Queue(max_queue)
+        self._slots = asyncio.Semaphore(max_in_flight)
+        self._task: Optional[asyncio.Task] = None
+        self._running: set[asyncio.Task] = set()
+        self.batches = 0
+        self.requests = 0
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def submit(self, entry: LexiconEntry) -> asyncio.Future[DeclineResult]:
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((entry, future))
+        return future
+
+    async def _next_batch(self) -> list[Pending]:
+        batch = [await self.queue.get()]
+        deadline = asyncio.get_running_loop().time() + self.max_wait
+        while len(batch) < self.max_batch:
+            try:
+                batch.append(self.queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            timeout = deadline - asyncio.get_running_loop().time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._next_batch()
+            await self._slots.acquire()
+            task = asyncio.create_task(self._decline(batch))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _decline(self, batch: list[Pending]) -> None:
+        try:
+            entries: list[Sequence[str] | LexiconEntry] = [entry for entry, _ in batch]
+            try:
+                results = await asyncio.get_running_loop().run_in_executor(
+                    self.executor, decline._decline_chunk, entries
+                )
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                return
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+            self.batches += 1
+            self.requests += len(batch)
+        finally:
+            self._slots.release()
+
+
+async def handle_connection(
+    batcher: MicroBatcher, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+) -> None:
+    pending: set[asyncio.Task] = set()
+
+    async def respond(request_id: object, future: asyncio.Future) -> None:
+        try:
+            result = await future
+        except Exception as e:
+            result = DeclineResult(None, None, f"{type(e).__name__}: {e}")
+        # a client that went away gets no response. the read loop sees the
+        # same disconnect, so nothing more is done about it here
+        try:
+            writer.write(format_response(request_id, result))
+            await writer.drain()
+        except ConnectionError:  # BrokenPipeError and ConnectionResetError
+            pass
+
+    try:
+        while line := await reader.readline():
+            try:
+                request_id, entry = parse_request(line)
+            except (ValueError, KeyError, TypeError) as e:
+                error = DeclineResult(None, None, f"bad request: {e}")
+                writer.write(format_response(None, error))
+                await writer.drain()
+                continue
+            future = await batcher.submit(entry)
+            task = asyncio.create_task(respond(request_id, future))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+        if pending:
+            await asyncio.wait(pending)
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(
+    host: str,
+    port: int,
+    jobs: int,
+    max_batch: int,
+    max_wait: float,
+    max_queue: int,
+) -> None:
+    # jobs=0 declines on a thread of this process, which helps nothing but the
+    # event loop's latency
+    executor: Executor = (
+        ProcessPoolExecutor(jobs) if jobs > 0 else ThreadPoolExecutor(1)
+    )
+    batcher = MicroBatcher(
+        executor, max_batch, max_wait, max_queue, max_in_flight=max(jobs, 1)
+    )
+    batcher.start()
+    server = await asyncio.start_server(
+        lambda r, w: handle_connection(batcher, r, w), host, port
+    )
+    print(f"listening on {host}:{port}", file=sys.stderr)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await batcher.stop()
+        executor.shutdown(cancel_futures=True)
+
+
+def _request_lines(path: str) -> list[bytes]:
+    lines = []
+    for row in decline.read_rows(path):
+        paradigm_id, word, suf_sg, suf_pl = row
+        request = {
+            "paradigm": paradigm_id,
+            "word": word,
+            "has_suf": suf_sg != "-",
+            "suf_pl": suf_pl,
+        }
+        lines.append(json.dumps(request, ensure_ascii=False).encode())
+    return lines
+
+
+async def _load_connection(
+    host: str,
+    port: int,
+    lines: list[bytes],
+    n_requests: int,
+    window: int,
+    latencies: list[float],
+    rng: random.Random,
+) -> None:
+    # keeps up to `window` requests outstanding on one connection
+    reader, writer = await asyncio.open_connection(host, port)
+    sent: dict[int, float] = {}
+    slots = asyncio.Semaphore(window)
+
+    async def send() -> None:
+        for i in range(n_requests):
+            await slots.acquire()
+            line = rng.choice(lines)
+            sent[i] = time.perf_counter()
+            writer.write(b'{"id": %d, ' % i + line[1:] + b"\n")
+            await writer.drain()
+
+    async def receive() -> None:
+        for _ in range(n_requests):
+            response = json.loads(await reader.readline())
+            latencies.append(time.perf_counter() - sent.pop(response["id"]))
+            slots.release()
+
+    await asyncio.gather(send(), receive())
+    writer.close()
+
+
+async def load(
+    host: str,
+    port: int,
+    path: str,
+    n_requests: int,
+    connections: int,
+    window: int,
+) -> None:
+    lines = _request_lines(path)
+    latencies: list[float] = []
+    per_connection = n_requests // connections
+    start = time.perf_counter()
+    await asyncio.gather(
+        *[
+            _load_connection(
+                host,
+                port,
+                lines,
+                per_connection,
+                window,
+                latencies,
+                random.Random(i),
+            )
+            for i in range(connections)
+        ]
+    )
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    print(
+        f"requests={len(latencies)} connections={connections} window={window} "
+        f"{len(latencies) / elapsed:,.0f} req/s "
+        f"p50={latencies[len(latencies) // 2] * 1e3:.2f}ms "
+        f"p99={latencies[int(len(latencies) * 0.99)] * 1e3:.2f}ms"
+    )
+
+
+def main() -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="micro-batching declension server")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("serve")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8471)
+    p.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1)
+    p.add_argument("--max-batch", type=int, default=256)
+    p.add_argument("--max-wait-ms", type=float, default=2.0)
+    p.add_argument("--max-queue", type=int, default=4096)
+    p = sub.add_parser("load", help="load generator reporting latency and req/s")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8471)
+    p.add_argument("--input", default="test-data.tsv")
+    p.add_argument("--requests", type=int, default=50_000)
+    p.add_argument("--connections", type=int, default=8)
+    p.add_argument("--window", type=int, default=64)
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        try:
+            asyncio.run(
+                serve(
+                    args.host,
+                    args.port,
+                    args.jobs,
+                    args.max_batch,
+                    args.max_wait_ms / 1e3,
+                    args.max_queue,
+                )
+            )
+        except KeyboardInterrupt:
+            pass
+    else:
+        asyncio.run(
+            load(
+                args.host,
+                args.port,
+                args.input,
+                args.requests,
+                args.connections,
+                args.window,
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
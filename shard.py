@@ -0,0 +1,342 @@
+from __future__ import annotations
+import enum
+import hashlib
+import json
+import os
+import sys
+from dataclasses import asdict, dataclass, field
+from typing import Optional, Sequence
+
+import decline
+import golden
+
+# a lexicon is cut into contiguous runs of rows of about equal estimated cost,
+# so the merged output is the shard outputs concatenated in shard order. the
+# files of a run:
+#
+#   manifest.json          the shards, their rows, cost and checksum
+#   shard-0000.tsv         the rows of shard 0, in the lexicon format
+#   shard-0000.out.tsv     written by `work`: the declined rows, as
+#                          `python -m decline` writes them
+#   shard-0000.failed.tsv  the rows that failed, by their row in the lexicon
+#   shard-0000.done.json   written last, so a shard without it is unfinished
+#
+# any of them may be copied to other machines; `merge` takes the directories
+# the outputs were collected in
+VERSION = 1
+MANIFEST = "manifest.json"
+HEADER = ["paradigm", "repr", "singular_suffix", "plural_suffix"]
+# the estimated cost of a row is ROW_COST, which includes reading, formatting
+# and writing it, plus STAGE_COST per rule its paradigm runs, in units of
+# about 2us. a row of a foreign paradigm costs FOREIGN_COST
+ROW_COST = 5
+STAGE_COST = 1
+FOREIGN_COST = 4
+RULE_FIELDS = ("con_sg", "gen_sg", "abs_pl", "con_pl")
+
+
+def paradigm_cost(paradigm_id: str) -> float:
+    paradigm = decline.paradigm_parameters.get(paradigm_id)
+    if paradigm is None:
+        return FOREIGN_COST if paradigm_id in decline.FOREIGN_PARADIGMS else ROW_COST
+    return ROW_COST + STAGE_COST * sum(
+        isinstance(getattr(paradigm, f), enum.Enum) for f in RULE_FIELDS
+    )
+
+
+def load_costs(path: str) -> dict[str, float]:
+    # the per-paradigm timings of `bench.py suite --output`
+    with open(path, encoding="utf-8") as f:
+        metrics = json.load(f)["metrics"]
+    return {
+        name.split(".")[1]: us
+        for name, us in metrics.items()
+        if name.startswith("paradigm.") and name.endswith(".us_per_row")
+    }
+
+
+def shard_name(index: int, suffix: str) -> str:
+    return f"shard-{index:04d}{suffix}"
+
+
+def file_sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while block := f.read(1 << 20):
+            h.update(block)
+    return h.hexdigest()
+
+
+def rules_fingerprint() -> str:
+    # every paradigm's fingerprint (see golden.py): outputs merge only when
+    # all workers declined with the same rules and code
+    fingerprints = golden.paradigm_fingerprints(
+        [*decline.paradigm_parameters, *decline.FOREIGN_PARADIGMS]
+    )
+    return hashlib.sha256(json.dumps(fingerprints, sort_keys=True).encode()).hexdigest()
+
+
+@dataclass
+class Shard:
+    index: int
+    path: str
+    first_row: int
+    rows: int = 0
+    cost: float = 0.0
+    sha256: str = ""
+
+
+@dataclass
+class Manifest:
+    lexicon: str
+    rows: int
+    cost: float
+    shards: list[Shard] = field(default_factory=list)
+
+    def save(self, path: str) -> None:
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": VERSION, **asdict(self)}, f, indent=1)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> Manifest:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != VERSION:
+            raise ValueError(f"{path}: not a shard manifest (version {VERSION})")
+        return cls(
+            data["lexicon"],
+            data["rows"],
+            data["cost"],
+            [Shard(**s) for s in data["shards"]],
+        )
+
+
+def _row_cost(row: Sequence[str], costs: dict[str, float]) -> float:
+    paradigm_id = row[0] if row else ""
+    cost = costs.get(paradigm_id)
+    if cost is None:
+        cost = costs[paradigm_id] = paradigm_cost(paradigm_id)
+    return cost
+
+
+def split(
+    lexicon: str,
+    out_dir: str,
+    n_shards: int,
+    costs: Optional[dict[str, float]] = None,
+) -> Manifest:
+    # two passes over the lexicon, so it is never held in memory: one for the
+    # total cost, one that starts a new shard each time the running cost
+    # passes the next multiple of total / n_shards
+    if n_shards < 1:
+        raise ValueError("n_shards must be at least 1")
+    costs = dict(costs or {})
+    total = sum(_row_cost(row, costs) for row in decline.read_rows(lexicon))
+    os.makedirs(out_dir, exist_ok=True)
+    manifest = Manifest(os.path.abspath(lexicon), 0, total)
+
+    shard: Optional[Shard] = None
+    out = None
+    done = 0.0
+    try:
+        for i, row in enumerate(decline.read_rows(lexicon)):
+            if shard is None or out is None or (
+                len(manifest.shards) < n_shards
+                and done >= total * len(manifest.shards) / n_shards
+            ):
+                if out is not None:
+                    out.close()
+                shard = Shard(len(manifest.shards), "", i)
+                shard.path = shard_name(shard.index, ".tsv")
+                manifest.shards.append(shard)
+                out = open(
+                    os.path.join(out_dir, shard.path), "w", encoding="utf-8", newline=""
+                )
+                out.write("\t".join(HEADER) + "\n")
+            cost = _row_cost(row, costs)
+            out.write("\t".join(row) + "\n")
+            shard.rows += 1
+            shard.cost += cost
+            done += cost
+            manifest.rows += 1
+    finally:
+        if out is not None:
+            out.close()
+    for shard in manifest.shards:
+        shard.sha256 = file_sha256(os.path.join(out_dir, shard.path))
+    manifest.save(os.path.join(out_dir, MANIFEST))
+    return manifest
+
+
+@dataclass
+class ShardResult:
+    index: int
+    shard_sha256: str
+    rules: str
+    rows: int
+    failed: int
+    sha256: str
+
+
+def work(
+    manifest_path: str,
+    index: int,
+    out_dir: Optional[str] = None,
+    jobs: int = 1,
+    chunk_size: int = 2000,
+) -> ShardResult:
+    # declines one shard into `out_dir`, by default next to the manifest
+    manifest = Manifest.load(manifest_path)
+    shard = manifest.shards[index]
+    in_dir = os.path.dirname(os.path.abspath(manifest_path))
+    out_dir = out_dir or in_dir
+    os.makedirs(out_dir, exist_ok=True)
+    path = os.path.join(in_dir, shard.path)
+    if file_sha256(path) != shard.sha256:
+        raise ValueError(f"{path} does not match the manifest")
+
+    output = os.path.join(out_dir, shard_name(index, ".out.tsv"))
+    failed_path = os.path.join(out_dir, shard_name(index, ".failed.tsv"))
+    rows = failed = 0
+    with open(output + ".tmp", "w", encoding="utf-8", newline="") as out, open(
+        failed_path + ".tmp", "w", encoding="utf-8", newline=""
+    ) as failures:
+        for result in decline.decline_parallel(
+            decline.read_rows(path), jobs, chunk_size
+        ):
+            if result.ok:
+                out.write(decline.format_tsv(result))
+                out.write("\n")
+            else:
+                failed += 1
+                failures.write(f"{shard.first_row + rows}\t{result.error}\n")
+            rows += 1
+    if rows != shard.rows:
+        raise ValueError(f"{path}: read {rows} rows, the manifest has {shard.rows}")
+    os.replace(output + ".tmp", output)
+    os.replace(failed_path + ".tmp", failed_path)
+
+    shard_result = ShardResult(
+        index, shard.sha256, rules_fingerprint(), rows, failed, file_sha256(output)
+    )
+    done = os.path.join(out_dir, shard_name(index, ".done.json"))
+    with open(done + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(asdict(shard_result), f, indent=1)
+    os.replace(done + ".tmp", done)
+    return shard_result
+
+
+def _find_result(index: int, dirs: Sequence[str]) -> tuple[str, ShardResult]:
+    found = []
+    for d in dirs:
+        done = os.path.join(d, shard_name(index, ".done.json"))
+        if os.path.exists(done):
+            with open(done, encoding="utf-8") as f:
+                found.append((d, ShardResult(**json.load(f))))
+    if not found:
+        raise ValueError(f"shard {index} has no output in {', '.join(dirs)}")
+    # a shard that ran twice, e.g. retried on another node, must agree
+    if len({r.sha256 for _, r in found}) > 1:
+        raise ValueError(f"shard {index} has differing outputs in {len(found)} places")
+    return found[0]
+
+
+def merge(manifest_path: str, output: str, dirs: Sequence[str]) -> tuple[int, int]:
+    # checks every shard's output against the manifest before writing
+    # anything, then concatenates them in shard order. returns the rows and
+    # failed rows of the whole lexicon
+    manifest = Manifest.load(manifest_path)
+    results = []
+    rules = set()
+    for shard in manifest.shards:
+        d, result = _find_result(shard.index, dirs)
+        if result.shard_sha256 != shard.sha256:
+            raise ValueError(f"shard {shard.index} was declined from another input")
+        if result.rows != shard.rows:
+            raise ValueError(
+                f"shard {shard.index}: {result.rows} rows, the manifest has {shard.rows}"
+            )
+        path = os.path.join(d, shard_name(shard.index, ".out.tsv"))
+        if file_sha256(path) != result.sha256:
+            raise ValueError(f"{path} is corrupt or incomplete")
+        rules.add(result.rules)
+        results.append((d, result))
+    if len(rules) > 1:
+        raise ValueError("the shards were declined with different rules")
+    if sum(r.rows for _, r in results) != manifest.rows:
+        raise ValueError("the shards do not cover the lexicon")
+
+    failed = 0
+    with open(output + ".tmp", "wb") as out, open(
+        output + ".failed.tmp", "wb"
+    ) as failures:
+        for d, result in results:
+            for suffix, f in ((".out.tsv", out), (".failed.tsv", failures)):
+                with open(os.path.join(d, shard_name(result.index, suffix)), "rb") as src:
+                    while block := src.read(1 << 20):
+                        f.write(block)
+            failed += result.failed
+    os.replace(output + ".tmp", output)
+    os.replace(output + ".failed.tmp", output + ".failed")
+    return manifest.rows, failed
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="decline a lexicon in shards, e.g. one per machine"
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("split", help="cut a lexicon into shards of equal cost")
+    p.add_argument("lexicon")
+    p.add_argument("out_dir")
+    p.add_argument("-n", "--shards", type=int, required=True)
+    p.add_argument(
+        "--costs", help="JSON from `bench.py suite --output` to weigh paradigms by"
+    )
+    p = sub.add_parser("work", help="decline one shard")
+    p.add_argument("manifest")
+    p.add_argument("index", type=int)
+    p.add_argument("-o", "--out-dir", help="default: the manifest's directory")
+    p.add_argument("-j", "--jobs", type=int, default=1)
+    p.add_argument("--chunk-size", type=int, default=2000)
+    p = sub.add_parser("merge", help="check the shard outputs and concatenate them")
+    p.add_argument("manifest")
+    p.add_argument("output", help="failed rows go to OUTPUT.failed")
+    p.add_argument(
+        "dirs", nargs="*", help="where the outputs are (default: the manifest's)"
+    )
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "split":
+            costs = load_costs(args.costs) if args.costs else None
+            manifest = split(args.lexicon, args.out_dir, args.shards, costs)
+            for shard in manifest.shards:
+                print(
+                    f"{shard.path}\trows={shard.rows}\t"
+                    f"cost={shard.cost / manifest.cost:.1%}"
+                )
+        elif args.command == "work":
+            result = work(
+                args.manifest, args.index, args.out_dir, args.jobs, args.chunk_size
+            )
+            print(
+                f"shard {result.index}: {result.rows} rows, {result.failed} failed",
+                file=sys.stderr,
+            )
+        else:
+            dirs = args.dirs or [os.path.dirname(os.path.abspath(args.manifest))]
+            rows, failed = merge(args.manifest, args.output, dirs)
+            print(f"{rows} rows, {failed} failed", file=sys.stderr)
+    except (OSError, ValueError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
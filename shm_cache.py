@@ -0,0 +1,194 @@
+from __future__ import annotations
+import struct
+import zlib
+from multiprocessing import shared_memory
+from typing import Iterator, Optional, Sequence
+
+import decline
+from decline import CacheKey, Declension, DeclineResult, LexiconEntry
+from disk_cache import encode_forms, encode_key
+
+MAGIC = b"HDSC"
+VERSION = 1
+# magic, version, number of slots, bytes per slot
+HEADER = struct.Struct("<4sHII")
+# checksum, key hash, key length, value length; the key and value follow
+SLOT = struct.Struct("<IIHH")
+NO_VALUE = 0xFFFF  # value length of a lemma no rule matches
+MAX_PROBES = 16
+# crc32 of similar keys differs mostly in its low bits; a multiplicative hash
+# spreads them over the whole table
+GOLDEN_RATIO = 0x9E3779B1
+
+
+def key_hash(data: bytes) -> int:
+    return zlib.crc32(data) * GOLDEN_RATIO & 0xFFFFFFFF
+
+
+class SharedDeclensionCache:
+    # an open-addressing hash table in a `multiprocessing.shared_memory` block
+    # that every process attached to it reads and writes directly. there is no
+    # lock: a writer clears a slot's checksum, writes the record and then the
+    # checksum, and a reader only believes a record whose checksum matches. a
+    # racing writer can therefore cost an entry but never produce a torn one.
+    # when all probed slots are taken the first one is overwritten
+    def __init__(
+        self,
+        name: Optional[str] = None,
+        slots: int = 1 << 17,
+        slot_size: int = 160,
+        create: bool = True,
+    ) -> None:
+        if create:
+            self._shm = shared_memory.SharedMemory(
+                name, create=True, size=HEADER.size + slots * slot_size
+            )
+            buf = self._shm.buf
+            assert buf is not None
+            HEADER.pack_into(buf, 0, MAGIC, VERSION, slots, slot_size)
+        else:
+            assert name is not None
+            # processes started by `multiprocessing` share their parent's
+            # resource tracker, so attaching does not hand the block to a
+            # tracker that would unlink it when this process exits
+            self._shm = shared_memory.SharedMemory(name)
+            buf = self._shm.buf
+            assert buf is not None
+            magic, version, slots, slot_size = HEADER.unpack_from(buf, 0)
+            if magic != MAGIC or version != VERSION:
+                buf.release()
+                self._shm.close()
+                raise ValueError(f"{name} is not a declension cache (version {VERSION})")
+        self.name = self._shm.name
+        self.slots = slots
+        self.slot_size = slot_size
+        self._owner = create
+        # `None` once closed
+        self._buf: Optional[memoryview] = buf
+        self.reset_stats()
+
+    @classmethod
+    def attach(cls, name: str) -> SharedDeclensionCache:
+        return cls(name, create=False)
+
+    def __reduce__(self):
+        # a pool worker that receives the cache attaches to the same block
+        return SharedDeclensionCache.attach, (self.name,)
+
+    def reset_stats(self) -> None:
+        self._hits = 0
+        self._misses = 0
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": self._hits, "misses": self._misses}
+
+    @property
+    def nbytes(self) -> int:
+        return self._shm.size
+
+    def close(self) -> None:
+        if self._buf is not None:
+            self._buf.release()
+            self._buf = None
+            self._shm.close()
+
+    def unlink(self) -> None:
+        self._shm.unlink()
+
+    def __enter__(self) -> SharedDeclensionCache:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+        if self._owner:
+            self.unlink()
+
+    def _probe(self, hash_: int) -> Iterator[int]:
+        # the offsets of the slots a key may be in
+        slots = self.slots
+        slot_size = self.slot_size
+        i = hash_ * slots >> 32
+        for _ in range(min(MAX_PROBES, slots)):
+            yield HEADER.size + i * slot_size
+            i += 1
+            if i == slots:
+                i = 0
+
+    def get(self, key: CacheKey) -> tuple[bool, Optional[Declension]]:
+        # (found, declension); `declension` is `None` for a cached failure too
+        data = encode_key(key).encode()
+        hash_ = key_hash(data)
+        key_len = len(data)
+        buf = self._buf
+        if buf is None:
+            raise ValueError("the cache is closed")
+        unpack_from = SLOT.unpack_from
+        slots = self.slots
+        i = hash_ * slots >> 32
+        for _ in range(min(MAX_PROBES, slots)):
+            offset = HEADER.size + i * self.slot_size
+            i = i + 1 if i + 1 < slots else 0
+            checksum, slot_hash, slot_key_len, value_len = unpack_from(buf, offset)
+            if slot_hash == hash_ and slot_key_len == key_len and checksum:
+                start = offset + SLOT.size
+                if value_len == NO_VALUE:
+                    record = buf[start : start + key_len].tobytes()
+                else:
+                    record = buf[start : start + key_len + value_len].tobytes()
+                # as `put` stores it
+                crc = zlib.crc32(record, value_len) or 1
+                if checksum == crc and record[:key_len] == data:
+                    self._hits += 1
+                    if value_len == NO_VALUE:
+                        return True, None
+                    return True, Declension(*record[key_len:].decode().split("\t"))
+            elif checksum == 0:
+                break
+        self._misses += 1
+        return False, None
+
+    def put(self, key: CacheKey, declension: Optional[Declension]) -> bool:
+        # `False` if the record does not fit in a slot
+        data = encode_key(key).encode()
+        forms = encode_forms(declension)
+        value = b"" if forms is None else forms.encode()
+        value_len = NO_VALUE if forms is None else len(value)
+        record = data + value
+        if SLOT.size + len(record) > self.slot_size or len(value) >= NO_VALUE:
+            return False
+        hash_ = key_hash(data)
+        buf = self._buf
+        if buf is None:
+            raise ValueError("the cache is closed")
+        target = None
+        for offset in self._probe(hash_):
+            if target is None:
+                target = offset
+            checksum, slot_hash, key_len, _ = SLOT.unpack_from(buf, offset)
+            if checksum == 0 or (
+                slot_hash == hash_
+                and key_len == len(data)
+                and buf[offset + SLOT.size : offset + SLOT.size + key_len] == data
+            ):
+                target = offset
+                break
+        assert target is not None
+        # a zero checksum marks the slot as being written
+        checksum = zlib.crc32(record, value_len) or 1
+        SLOT.pack_into(buf, target, 0, hash_, len(data), value_len)
+        buf[target + SLOT.size : target + SLOT.size + len(record)] = record
+        SLOT.pack_into(buf, target, checksum, hash_, len(data), value_len)
+        return True
+
+    def decline(
+        self, paradigm_id: str, word: str, has_suf: bool, suf_pl: str
+    ) -> Optional[Declension]:
+        key = (paradigm_id, word, has_suf, suf_pl)
+        found, declension = self.get(key)
+        if not found:
+            declension = decline.decline_by_paradigm(paradigm_id, word, has_suf, suf_pl)
+            self.put(key, declension)
+        return declension
+
+    def decline_batch(self, entries: Sequence[LexiconEntry]) -> list[DeclineResult]:
+        return [decline.decline_entry(entry, self) for entry in entries]
@@ -0,0 +1,248 @@
+from __future__ import annotations
+import os
+import random
+import re
+import sys
+import types
+from collections import Counter
+from dataclasses import dataclass
+from typing import Iterable, Iterator, Optional, Sequence
+
+import decline
+
+# a synthetic row is a row of test-data.tsv, picked uniformly so paradigms and
+# suffixes keep their distribution, with the free consonants of its word
+# permuted. a consonant is free when no rule, suffix or foreign paradigm
+# mentions it, so a regex cannot tell one from another and declining the new
+# word takes the same path as the original: its forms are the original's with
+# the same permutation applied. consonants that take a dagesh are only swapped
+# among themselves, and so are the ones that never do (the gutturals)
+HEADER = ["paradigm", "repr", "singular_suffix", "plural_suffix"]
+TEST_DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "test-data.tsv")
+# the share of rows drawn from the borrowed templates of paradigms test-data.tsv
+# has no rows for, see `coverage_templates`
+COVERAGE_SHARE = 0.001
+COVERAGE_PER_PARADIGM = 20
+MIN_SHARE = 0.005
+# rows for paradigms that no row of test-data.tsv declines under
+EXAMPLES = [
+    ["b_gveret", "g3vE!rEt", "Et", "Wt"],
+    ["b_mawet", "ma!wEt", "-", "im"],
+    ["b_pe", "pE!H", "-", "im"],
+]
+RULE_ENUMS = (decline.REConSG, decline.REGenSG, decline.REAbsPL, decline.REConPL)
+
+
+def _strings(value: object, seen: set[int]) -> Iterator[str]:
+    # the string constants of a function and of every function and table of
+    # `decline` it uses by name. the field names of a `Declension` built with
+    # keywords are not matched against anything and are left out
+    if id(value) in seen:
+        return
+    seen.add(id(value))
+    if isinstance(value, str):
+        if value not in decline.SLOTS:
+            yield value
+    elif isinstance(value, types.FunctionType):
+        yield from _strings(value.__code__, seen)
+    elif isinstance(value, types.CodeType):
+        for const in value.co_consts:
+            yield from _strings(const, seen)
+        for name in value.co_names:
+            named = decline.__dict__.get(name)
+            if isinstance(named, (types.FunctionType, dict, set, frozenset, str)):
+                yield from _strings(named, seen)
+    elif isinstance(value, dict):
+        for key, item in value.items():
+            yield from _strings(key, seen)
+            yield from _strings(item, seen)
+    elif isinstance(value, (tuple, list, set, frozenset)):
+        for item in value:
+            yield from _strings(item, seen)
+
+
+def literal_letters() -> set[str]:
+    # every character a rule, the suffix split or a foreign paradigm can match
+    # or test for
+    seen: set[int] = set()
+    strings: list[str] = [
+        *_strings(decline.SINGULAR_SUFFIX, seen),
+        decline._FINAL_VOWEL.pattern,
+        decline._LAST_VOWEL.pattern,
+    ]
+    for enum in RULE_ENUMS:
+        for rule in enum:
+            pattern, repl = rule.value
+            strings.append(pattern.pattern)
+            strings.extend(_strings(repl, seen))
+    for decline_foreign in decline.FOREIGN_PARADIGMS.values():
+        strings.extend(_strings(decline_foreign, seen))
+    return set("".join(strings))
+
+
+def consonant_classes(words: Iterable[str]) -> list[str]:
+    # the free consonants of `words`, split into those that are seen with a
+    # dagesh and those that are not. a consonant rarer than MIN_SHARE of the
+    # free ones, such as one only found in a loanword, is left alone
+    literal = literal_letters()
+    counts: Counter[str] = Counter()
+    dagesh: set[str] = set()
+    for word in words:
+        counts.update(word)
+        dagesh.update(m[0] for m in re.finditer(r".(?=_)", word))
+    free = {c: n for c, n in counts.items() if c.isalnum() and c not in literal}
+    total = sum(free.values())
+    common = {c for c, n in free.items() if n >= total * MIN_SHARE}
+    return [
+        "".join(sorted(c)) for c in (common & dagesh, common - dagesh) if len(c) > 1
+    ]
+
+
+def coverage_templates(
+    rows: Sequence[Sequence[str]], per_paradigm: int = COVERAGE_PER_PARADIGM
+) -> list[list[str]]:
+    # rows for the paradigms no row of `rows` declines under, so their rules
+    # are exercised too: the paradigm's entries of EXAMPLES, and the words of
+    # other paradigms, with their suffixes, that the paradigm declines
+    present = {
+        r.entry.paradigm_id  # type: ignore[union-attr]
+        for r in decline.decline_many(rows)
+        if r.ok
+    }
+    borrowed: list[list[str]] = []
+    for paradigm_id in decline.paradigm_parameters:
+        if paradigm_id in present:
+            continue
+        examples = [list(r) for r in EXAMPLES if r[0] == paradigm_id]
+        borrowed += examples
+        found = len(examples)
+        for row in rows:
+            if not row or not row[0].startswith("b_"):
+                continue
+            candidate = [paradigm_id, *row[1:]]
+            try:
+                entry = decline.parse_row(candidate)
+                declension = decline.decline_by_paradigm(
+                    paradigm_id, entry.word, entry.has_suf, entry.suf_pl
+                )
+            except Exception:
+                continue
+            if declension is not None:
+                borrowed.append(candidate)
+                found += 1
+                if found == per_paradigm:
+                    break
+    return borrowed
+
+
+Template = tuple[str, str, str, str, list[tuple[str, str]]]
+
+
+@dataclass
+class Generator:
+    templates: list[list[str]]
+    extra: list[list[str]]
+    classes: list[str]
+    extra_share: float = COVERAGE_SHARE
+
+    def __post_init__(self) -> None:
+        self._templates = [self._prepare(r) for r in self.templates]
+        self._extra = [self._prepare(r) for r in self.extra]
+
+    def _prepare(self, row: Sequence[str]) -> Template:
+        # the row with the free consonants of its word, per class
+        paradigm_id, word, suf_sg, suf_pl = row
+        used = [
+            ("".join(sorted({c for c in word if c in consonants})), consonants)
+            for consonants in self.classes
+        ]
+        return paradigm_id, word, suf_sg, suf_pl, [u for u in used if u[0]]
+
+    @classmethod
+    def from_lexicon(cls, path: str = TEST_DATA, cover: bool = True) -> Generator:
+        templates = [r for r in decline.read_rows(path) if len(r) == 4]
+        extra = coverage_templates(templates) if cover else []
+        classes = consonant_classes(r[1] for r in templates + extra)
+        return cls(templates, extra, classes)
+
+    @staticmethod
+    def _permutation(
+        used: list[tuple[str, str]], rng: random.Random
+    ) -> dict[int, str]:
+        # a `str.translate` table sending each free consonant of a word to a
+        # distinct consonant of its class, so a root letter that repeats
+        # still repeats
+        table: dict[int, str] = {}
+        for letters, consonants in used:
+            for old, new in zip(letters, rng.sample(consonants, len(letters))):
+                table[ord(old)] = new
+        return table
+
+    def template(self, rng: random.Random) -> Template:
+        if self._extra and rng.random() < self.extra_share:
+            return rng.choice(self._extra)
+        return rng.choice(self._templates)
+
+    def rows(self, n: int, seed: int = 0) -> Iterator[list[str]]:
+        rng = random.Random(seed)
+        for _ in range(n):
+            paradigm_id, word, suf_sg, suf_pl, used = self.template(rng)
+            if used:
+                word = word.translate(self._permutation(used, rng))
+            yield [paradigm_id, word, suf_sg, suf_pl]
+
+
+def write_lexicon(
+    path: str,
+    n: int,
+    seed: int = 0,
+    generator: Optional[Generator] = None,
+) -> int:
+    # streams `n` rows to `path` ("-" for stdout); the same seed and
+    # templates always give the same file
+    generator = generator or Generator.from_lexicon()
+    out = sys.stdout if path == "-" else open(path, "w", encoding="utf-8", newline="")
+    try:
+        out.write("\t".join(HEADER) + "\n")
+        buffer = []
+        for row in generator.rows(n, seed):
+            buffer.append("\t".join(row))
+            if len(buffer) == 10000:
+                out.write("\n".join(buffer) + "\n")
+                buffer.clear()
+        if buffer:
+            out.write("\n".join(buffer) + "\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    return n
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="generate a synthetic lexicon in the test-data.tsv format"
+    )
+    parser.add_argument("rows", type=int)
+    parser.add_argument("output", nargs="?", default="-", help="- for stdout")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--templates", default=TEST_DATA)
+    parser.add_argument(
+        "--no-cover",
+        action="store_true",
+        help="only use the templates' own paradigms",
+    )
+    args = parser.parse_args(argv)
+
+    generator = Generator.from_lexicon(args.templates, not args.no_cover)
+    try:
+        write_lexicon(args.output, args.rows, args.seed, generator)
+    except BrokenPipeError:
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
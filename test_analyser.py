@@ -0,0 +1,74 @@
+import re
+
+import pytest
+
+import analyser
+import decline
+
+
+@pytest.fixture(scope="module")
+def rows() -> list[list[str]]:
+    return list(decline.read_rows(analyser.TEST_DATA))
+
+
+@pytest.fixture(scope="module")
+def held_out(rows) -> tuple[analyser.Analyser, list[decline.DeclineResult]]:
+    # every 50th row is left out of the rules and analysed from its forms
+    train = [r for i, r in enumerate(rows) if i % 50]
+    test = [r for i, r in enumerate(rows) if not i % 50]
+    results = [r for r in decline.decline_many(test) if r.ok]
+    return analyser.Analyser.learn(train), results
+
+
+def test_recall_on_held_out_rows(held_out):
+    a, results = held_out
+    found = total = 0
+    for result in results:
+        assert result.entry is not None and result.declension is not None
+        for slot in decline.SLOTS:
+            form = getattr(result.declension, slot)
+            total += 1
+            found += any(
+                x.abs_sg == result.declension.abs_sg
+                and x.paradigm_id == result.entry.paradigm_id
+                and x.slot == slot
+                for x in a.analyse(form)
+            )
+    assert total > 1000
+    assert found / total > 0.98
+
+
+@pytest.mark.parametrize("form", ["", "!", "Á", "3", "!!!", "ÁÁ", "-", "x!Á", "\n"])
+def test_garbage_input(held_out, form):
+    a, _ = held_out
+    for x in a.analyse(form):
+        declension = decline.decline_by_paradigm(
+            x.paradigm_id, x.abs_sg, x.has_suf, x.suf_pl
+        )
+        assert declension is not None and getattr(declension, x.slot) == form
+
+
+@pytest.mark.parametrize(
+    "stem, abs_sg",
+    [("sIfr", "sE!fEr"), ("d3var", "dava!r"), ("G3miR", "G3miR"), ("Qav", "Qa!v")],
+)
+def test_strip_reversal_round_trip(stem, abs_sg):
+    for suffix, ends_in_i in [("i", False), ("3xEm", None), ("", None)]:
+        assert analyser._strip(stem + suffix, suffix, ends_in_i) == stem
+    tail, replacement = analyser.reversal(stem, abs_sg)
+    m = re.match(f"(?P<prefix>.*?){tail}\\Z", stem)
+    assert m is not None
+    assert abs_sg == m["prefix"] + "".join(
+        c if isinstance(c, str) else m[analyser._group(c)] for c in replacement
+    )
+    # the consonants are variables: the reversal applies to another root
+    other = stem.translate(str.maketrans("sfrdvGmRQ", "ktbgzlpnS"))
+    m = re.match(f"(?P<prefix>.*?){tail}\\Z", other)
+    assert m is not None
+
+
+def test_strip_rejects():
+    assert analyser._strip("sIfri", "3xa", None) is None
+    assert analyser._strip("i", "i", None) is None
+    assert analyser._strip("Qavii", "i", False) is None
+    assert analyser._strip("Qavi", "", False) is None
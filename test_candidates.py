@@ -0,0 +1,52 @@
+import os
+
+import pytest
+
+import candidates
+import decline
+
+TEST_DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "test-data.tsv")
+
+
+def _words() -> list[tuple[str, str, str]]:
+    # (abs_sg, suf_sg, suf_pl) of every 4th b_* row, as `decline` takes them
+    words = set()
+    for i, row in enumerate(decline.read_rows(TEST_DATA)):
+        entry = decline.parse_row(row)
+        if i % 4 or not entry.paradigm_id.startswith("b_"):
+            continue
+        abs_sg, suf_sg = decline.split_singular_suffix(
+            entry.paradigm_id, entry.word, entry.has_suf
+        )
+        words.add((abs_sg, suf_sg, entry.suf_pl))
+    return sorted(words)
+
+
+def _declines(word: str, suf_sg: str, suf_pl: str, paradigm: decline.Paradigm) -> bool:
+    try:
+        return decline.decline(word, suf_sg, suf_pl, paradigm) is not None
+    except Exception:
+        return False
+
+
+@pytest.mark.parametrize("suf_pl", ["i!m", "W!t"])
+def test_never_prunes_a_declining_paradigm(suf_pl):
+    words = [(w, s, suf_pl) for w, s, _ in _words()]
+    words += [(w, "-", suf_pl) for w in ("!", "Á", "3", "i", "a!H", "ya!")]
+    pruned = declined = 0
+    for word, suf_sg, suf_pl in words:
+        found = set(candidates.candidate_paradigms(word, suf_sg, suf_pl))
+        for paradigm_id, paradigm in decline.paradigm_parameters.items():
+            if paradigm_id in found:
+                declined += _declines(word, suf_sg, suf_pl, paradigm)
+                continue
+            assert not _declines(word, suf_sg, suf_pl, paradigm), (word, paradigm_id)
+            pruned += 1
+    # and it does prune
+    assert declined >= len(words) // 2
+    assert pruned > len(words) * len(decline.paradigm_parameters) // 2
+
+
+def test_unknown_suffixes_have_no_candidates():
+    assert candidates.candidate_paradigms("sus", "-", "Xim") == []
+    assert candidates.candidate_paradigms("sus", "Xa", "i!m") == []
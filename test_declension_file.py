@@ -0,0 +1,82 @@
+import os
+
+import pytest
+
+import decline
+import declension_file
+from decline import SLOTS
+
+TEST_DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "test-data.tsv")
+
+
+@pytest.fixture(scope="module")
+def rows() -> list[list[str]]:
+    # a malformed row is skipped by `write_table`, so lemma ids stay those of
+    # the parsed rows
+    return [*decline.read_rows(TEST_DATA), ["b_sus", "malformed"]]
+
+
+@pytest.fixture()
+def table_path(rows, tmp_path) -> str:
+    path = str(tmp_path / "declensions.bin")
+    declension_file.write_table(rows, path)
+    return path
+
+
+def test_round_trip(rows, table_path):
+    expected = [r for r in decline.decline_many(rows) if r.entry is not None]
+    assert any(not r.ok for r in expected)
+    with declension_file.DeclensionFile(table_path) as table:
+        assert len(table) == len(expected)
+        for lemma_id, r in enumerate(expected):
+            assert table.lemma(lemma_id) == r.entry.word
+            assert table.paradigm_id(lemma_id) == r.entry.paradigm_id
+            assert table.declension(lemma_id) == r.declension
+            for slot, name in enumerate(SLOTS):
+                form = table.form_bytes(lemma_id, slot)
+                if r.declension is None:
+                    assert form is None
+                else:
+                    with form:
+                        assert form == getattr(r.declension, name).encode()
+        assert list(table) == [r.declension for r in expected]
+
+
+def test_malformed_row_in_the_middle(rows, tmp_path):
+    path = str(tmp_path / "declensions.bin")
+    head, tail = rows[:100], rows[100:200]
+    assert declension_file.write_table([*head, ["b_sus"], *tail], path) == 200
+    with declension_file.DeclensionFile(path) as table:
+        assert len(table) == 200
+        # the row after the malformed one is lemma 100, not 101
+        assert table.lemma(99) == head[-1][1]
+        assert table.lemma(100) == tail[0][1]
+        assert table.lemma(199) == tail[-1][1]
+
+
+def test_lemma_id_out_of_range(table_path):
+    with declension_file.DeclensionFile(table_path) as table:
+        with pytest.raises(IndexError):
+            table.declension(len(table))
+
+
+def test_close_with_a_live_view(table_path):
+    table = declension_file.DeclensionFile(table_path)
+    form = table.form_bytes(0, 0)
+    assert form is not None
+    with pytest.raises(BufferError, match="form_bytes"):
+        table.close()
+    # nothing was closed: the table and the view still read
+    assert table.declension(0) is not None
+    assert bytes(form) == table.declension(0).abs_sg.encode()
+    form.release()
+    table.close()
+    with pytest.raises(ValueError):
+        table.declension(0)
+
+
+def test_not_a_table(tmp_path):
+    path = tmp_path / "other.bin"
+    path.write_bytes(b"\0" * 64)
+    with pytest.raises(ValueError, match="not a declension table"):
+        declension_file.DeclensionFile(str(path))
@@ -0,0 +1,38 @@
+import pytest
+
+import decline
+
+
+def _outcome(paradigm: decline.Paradigm, word: str, suf_sg: str, suf_pl: str):
+    try:
+        return decline.decline(word, suf_sg, suf_pl, paradigm)
+    except Exception as e:
+        return type(e)
+
+
+def _compiled_outcome(paradigm: decline.Paradigm, word: str, suf_sg: str, suf_pl: str):
+    try:
+        return decline.compile_paradigm(paradigm, suf_sg, suf_pl)(word)
+    except Exception as e:
+        return type(e)
+
+
+@pytest.mark.parametrize("word", ["!", "Á", "!Á", "3", "aQW!t", "Qa!v"])
+@pytest.mark.parametrize("suf_sg", ["-", "a!H", "e!H"])
+def test_compiled_fails_like_decline(word, suf_sg):
+    # stems the rules reduce to nothing fail the same way on both paths
+    for paradigm_id, paradigm in decline.paradigm_parameters.items():
+        if paradigm_id in decline.FOREIGN_PARADIGMS:
+            continue
+        for suf_pl in ("i!m", "W!t"):
+            expected = _outcome(paradigm, word, suf_sg, suf_pl)
+            actual = _compiled_outcome(paradigm, word, suf_sg, suf_pl)
+            assert actual == expected, paradigm_id
+
+
+def test_empty_gen_sg_stem():
+    paradigm = decline.paradigm_parameters["b_ets"]
+    with pytest.raises(IndexError):
+        decline.decline("!", "-", "i!m", paradigm)
+    with pytest.raises(IndexError):
+        decline.compile_paradigm(paradigm, "-", "i!m")("!")
@@ -0,0 +1,57 @@
+import os
+
+import pytest
+
+import decline
+import disk_cache
+import golden
+
+TEST_DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "test-data.tsv")
+
+
+@pytest.fixture(scope="module")
+def entries() -> list[decline.LexiconEntry]:
+    return [
+        r.entry for r in decline.decline_many(decline.read_rows(TEST_DATA)) if r.entry
+    ]
+
+
+def _keys(entries: list[decline.LexiconEntry]) -> list[decline.CacheKey]:
+    return [(e.paradigm_id, e.word, e.has_suf, e.suf_pl) for e in entries]
+
+
+def _runs(paradigm_id: str, rule: decline.TrySubMixin) -> bool:
+    paradigm = decline.paradigm_parameters.get(paradigm_id)
+    if paradigm is None:
+        return False
+    return any(
+        value is rule or golden.SUFFIX_RULES.get(value) is rule
+        for value in vars(paradigm).values()
+        if isinstance(value, decline.TrySubMixin)
+    )
+
+
+@pytest.mark.parametrize(
+    "rule", [decline.REGenSG.C9, decline.REGenSG.C31, decline.REConSG.C38]
+)
+def test_rule_edit_keeps_other_paradigms(entries, tmp_path, monkeypatch, rule):
+    path = str(tmp_path / "cache.sqlite")
+    with disk_cache.DiskCache(path) as cache:
+        cache.decline_batch(entries)
+    keys = set(_keys(entries))
+    stale = {key for key in keys if _runs(key[0], rule)}
+    assert stale and stale != keys
+
+    # the same rule, written differently
+    pattern, repl = rule.value
+    monkeypatch.setattr(
+        rule, "_value_", (decline.LazyPattern(f"(?:{pattern.pattern})"), repl)
+    )
+    with disk_cache.DiskCache(path) as cache:
+        found = cache.get_many(keys)
+        assert set(found) == keys - stale
+        assert cache.stats() == {
+            "hits": len(keys) - len(stale),
+            "misses": len(stale),
+            "stale": len(stale),
+        }
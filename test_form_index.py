@@ -0,0 +1,64 @@
+import os
+from collections import defaultdict
+
+import pytest
+
+import decline
+import form_index
+
+TEST_DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "test-data.tsv")
+
+
+@pytest.fixture(scope="module")
+def expected() -> dict[str, set[tuple[str, str, str]]]:
+    hits = defaultdict(set)
+    for r in decline.decline_many(decline.read_rows(TEST_DATA)):
+        if r.ok:
+            assert r.entry is not None and r.declension is not None
+            for slot in decline.SLOTS:
+                form = getattr(r.declension, slot)
+                if form:
+                    hits[form].add((r.entry.word, r.entry.paradigm_id, slot))
+    return hits
+
+
+@pytest.fixture(scope="module")
+def index(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("index") / "forms.idx")
+    form_index.build_index(decline.read_rows(TEST_DATA), path)
+    with form_index.FormIndex(path) as index:
+        yield index
+
+
+def _hits(index: form_index.FormIndex, form: str) -> set[tuple[str, str, str]]:
+    return {(h.lemma, h.paradigm_id, h.slot) for h in index.lookup(form)}
+
+
+def test_round_trip(index, expected):
+    assert index.n_forms == len(expected)
+    for form in list(expected)[::37]:
+        assert _hits(index, form) == expected[form]
+
+
+def test_shared_form(index, expected):
+    assert _hits(index, "mARáni") == {
+        ("mARáni!", "b_sus", "gen_sg"),
+        ("mARánE!H", "b_sus", "gen_sg"),
+        ("mA!RAn", "b_baal", "gen_sg"),
+    }
+    shared = [form for form, hits in expected.items() if len(hits) > 1]
+    assert shared
+    for form in shared:
+        assert _hits(index, form) == expected[form]
+
+
+@pytest.mark.parametrize("form", ["", "mARán", "mARániX", "￿"])
+def test_missing_form(index, form):
+    assert index.lookup(form) == []
+
+
+def test_not_an_index(tmp_path):
+    path = tmp_path / "forms.idx"
+    path.write_bytes(b"\0" * form_index.HEADER.size)
+    with pytest.raises(ValueError):
+        form_index.FormIndex(str(path))
@@ -0,0 +1,91 @@
+import os
+
+import pytest
+
+import decline
+import golden
+
+TEST_DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "test-data.tsv")
+
+
+@pytest.fixture(scope="module")
+def rows() -> list[list[str]]:
+    return list(decline.read_rows(TEST_DATA))[::5]
+
+
+@pytest.fixture
+def store(rows, tmp_path) -> str:
+    path = str(tmp_path / "golden.json")
+    golden_ = golden.Golden()
+    report = golden.check(rows, golden_, update=True)
+    assert report.rechecked == report.total == len(rows)
+    golden_.save(path)
+    return path
+
+
+def _users(rows: list[list[str]], rule: decline.TrySubMixin) -> set[str]:
+    return {
+        row[0]
+        for row in rows
+        if any(
+            getattr(decline.paradigm_parameters.get(row[0]), f, None) is rule
+            for f in ("con_sg", "gen_sg", "abs_pl", "con_pl")
+        )
+    }
+
+
+def test_fingerprints_stable(rows, store):
+    ids = {row[0] for row in rows}
+    before = golden.paradigm_fingerprints(ids)
+    # running the engine fills in state that is not part of a fingerprint
+    decline.enable_instrumentation()
+    decline.disable_instrumentation()
+    list(decline.decline_many(rows))
+    assert golden.paradigm_fingerprints(ids) == before
+
+    stored = golden.Golden.load(store)
+    assert stored.fingerprints == before
+    report = golden.check(rows, stored)
+    assert report.rechecked == 0 and report.clean
+
+
+def test_changed_rule_reported(rows, store, monkeypatch):
+    rule = decline.paradigm_parameters["b_sefer"].gen_sg
+    assert isinstance(rule, decline.TrySubMixin)
+    users = _users(rows, rule)
+    assert "b_sefer" in users and len(users) < len({row[0] for row in rows})
+    before = golden.paradigm_fingerprints({row[0] for row in rows})
+
+    pattern, repl = rule.value
+    assert callable(repl)
+
+    def changed_repl(m):
+        return repl(m) + "X"
+
+    monkeypatch.setattr(rule, "_value_", (pattern, changed_repl))
+    monkeypatch.setattr(rule, "repl", changed_repl)
+    monkeypatch.setattr(rule, "_expand", changed_repl)
+    # the stages bind the rule when a paradigm is compiled
+    monkeypatch.setattr(decline, "_compiled_paradigms", {})
+    monkeypatch.setattr(decline, "_front_ends", {})
+    after = golden.paradigm_fingerprints({row[0] for row in rows})
+    assert {p for p in after if after[p] != before[p]} == users
+
+    stored = golden.Golden.load(store)
+    report = golden.check(rows, stored)
+    assert report.rechecked == sum(row[0] in users for row in rows)
+    assert not report.clean
+    dirty = {p for p, diff in report.diffs.items() if not diff.clean}
+    assert "b_sefer" in dirty and dirty <= users
+    diff = report.diffs["b_sefer"]
+    assert diff.rows == sum(row[0] == "b_sefer" for row in rows)
+    assert diff.changed + diff.removed and not diff.added
+    assert all(line.startswith("b_sefer\t") for line in diff.examples)
+    # a changed paradigm keeps its old fingerprint until the change is accepted
+    assert stored.fingerprints["b_sefer"] == before["b_sefer"]
+    report = golden.check(rows, stored)
+    assert "b_sefer" in report.diffs and not report.diffs["b_sefer"].clean
+
+    report = golden.check(rows, stored, update=True)
+    assert stored.fingerprints["b_sefer"] == after["b_sefer"]
+    assert golden.check(rows, stored).rechecked == 0
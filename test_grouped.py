@@ -0,0 +1,43 @@
+import os
+
+import pytest
+
+import decline
+import grouped
+
+TEST_DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "test-data.tsv")
+
+
+@pytest.fixture(scope="module")
+def rows() -> list[list[str]]:
+    return list(decline.read_rows(TEST_DATA))
+
+
+def test_test_data(rows):
+    assert grouped.decline_grouped(rows) == list(decline.decline_many(rows))
+
+
+def test_rows_off_the_column_path(rows):
+    # malformed rows, unknown paradigms, and words that fail or raise in a
+    # group of rows that decline
+    mixed = [
+        ["b_sus"],
+        ["b_nope", "sus", "-", "im"],
+        ["b_ets", "!", "-", "im"],
+        ["b_ets", "Á", "-", "im"],
+        ["b_sus", "", "-", "im"],
+        ["b_sus", "x", "a!H", "Wt"],
+        ["b_sus", "sus", "-", "Xim"],
+    ]
+    mixed = [row for pair in zip(rows[::400], mixed * 10) for row in pair]
+    expected = list(decline.decline_many(mixed))
+    assert any(not r.ok for r in expected) and any(r.ok for r in expected)
+    assert grouped.decline_grouped(mixed) == expected
+
+
+def test_column_try_sub(rows):
+    rule = decline.paradigm_parameters["b_sefer"].gen_sg
+    assert isinstance(rule, decline.TrySubMixin)
+    words = [row[1] for row in rows[:2000]]
+    column = grouped.column_try_sub(rule, words)
+    assert list(column) == [rule.try_sub(word) for word in words]
@@ -0,0 +1,64 @@
+import pytest
+
+import decline
+
+ROWS = [
+    ["b_sefer", "sE!fEr", "-", "im"],
+    ["b_davar", "baSa!r", "-", "im"],
+    ["b_sus", "G3miRa!H", "a!H", "Wt"],
+]
+STAGES = {"con_sg", "gen_sg", "abs_pl", "con_pl"}
+
+
+@pytest.fixture
+def instrumentation():
+    yield decline.enable_instrumentation()
+    decline.disable_instrumentation()
+
+
+def _decline_rows(compiled: bool) -> None:
+    for row in ROWS:
+        entry = decline.parse_row(row)
+        declension = decline.decline_by_paradigm(
+            entry.paradigm_id, entry.word, entry.has_suf, entry.suf_pl, compiled
+        )
+        assert declension is not None
+
+
+def test_off_by_default():
+    assert decline.instrumentation_snapshot() is None
+    assert decline.TrySubMixin.try_sub is decline._uninstrumented_try_sub
+
+
+@pytest.mark.parametrize("compiled", [True, False])
+def test_counts_and_reset(instrumentation, compiled):
+    _decline_rows(compiled)
+    snapshot = decline.instrumentation_snapshot(reset=True)
+    assert snapshot is not None
+    assert set(snapshot["stages"]) == STAGES
+    for stage in snapshot["stages"].values():
+        assert stage["count"] == len(ROWS)
+        assert sum(stage["buckets"].values()) == len(ROWS)
+        assert 0 < stage["p50_ns"] <= stage["p99_ns"]
+    assert snapshot["rules"]
+    for counts in snapshot["rules"].values():
+        assert counts["applied"] == counts["matched"] + counts["none"] > 0
+    # the segolate gen_sg rule of sefer ran and matched
+    assert snapshot["rules"][str(decline.paradigm_parameters["b_sefer"].gen_sg)][
+        "matched"
+    ]
+
+    assert decline.instrumentation_snapshot() == {"rules": {}, "stages": {}}
+    _decline_rows(compiled)
+    snapshot = decline.instrumentation_snapshot()
+    assert snapshot is not None
+    assert snapshot["stages"]["con_sg"]["count"] == len(ROWS)
+
+
+def test_disable(instrumentation):
+    decline.disable_instrumentation()
+    assert decline.instrumentation_snapshot() is None
+    _decline_rows(compiled=True)
+    _decline_rows(compiled=False)
+    assert decline.instrumentation_snapshot() is None
+    assert decline.TrySubMixin.try_sub is decline._uninstrumented_try_sub
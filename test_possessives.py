@@ -0,0 +1,62 @@
+import pytest
+
+import decline
+
+PERSONS = list(decline.SG_POSSESSIVE_SUFFIX)
+
+PARADIGMS = [
+    (
+        ["b_sefer", "sE!fEr", "-", "im"],
+        "sIfri sIfr3xa sIfrex sIfrW sIfrah sIfrenu sIfr3xEm sIfr3xEn sIfram sIfran",
+        "s3farAy s3farEYxa s3farAyIx s3faraYw s3farEYha s3fareYnu"
+        " sIfreYxEm sIfreYxEn sIfreYhEm sIfreYhEn",
+    ),
+    (
+        ["b_davar", "baSa!r", "-", "im"],
+        "b3Sari b3Sar3xa b3Sarex b3SarW b3Sarah b3Sarenu"
+        " b3SAr3xEm b3SAr3xEn b3Saram b3Saran",
+        "b3SarAy b3SarEYxa b3SarAyIx b3SaraYw b3SarEYha b3SareYnu"
+        " bISreYxEm bISreYxEn bISreYhEm bISreYhEn",
+    ),
+    (
+        ["b_shomer", "m3RA_be!d", "-", "im"],
+        "m3RA_b3di m3RA_b3d3xa m3RA_b3dex m3RA_b3dW m3RA_b3dah m3RA_b3denu"
+        " m3RA_bed3xEm m3RA_bed3xEn m3RA_b3dam m3RA_b3dan",
+        "m3RA_b3dAy m3RA_b3dEYxa m3RA_b3dAyIx m3RA_b3daYw m3RA_b3dEYha"
+        " m3RA_b3deYnu m3RA_b3deYxEm m3RA_b3deYxEn m3RA_b3deYhEm m3RA_b3deYhEn",
+    ),
+    (
+        ["b_av", "Qa!v", "-", "Wt"],
+        "Qavi Qavixa Qavix Qaviw Qaviha Qavinu QávixEm QávixEn QavihEm QavihEn",
+        "QávWtAy QávWtEYxa QávWtAyIx QávWtaYw QávWtEYha QávWteYnu"
+        " QávWteYxEm QávWteYxEn QávWteYhEm QávWteYhEn",
+    ),
+    (
+        ["b_sus", "G3miRa!H", "a!H", "Wt"],
+        "G3miRati G3miRat3xa G3miRatex G3miRatW G3miRatah G3miRatenu"
+        " G3miRAt3xEm G3miRAt3xEn G3miRatam G3miRatan",
+        "G3miRWtAy G3miRWtEYxa G3miRWtAyIx G3miRWtaYw G3miRWtEYha G3miRWteYnu"
+        " G3miRWteYxEm G3miRWteYxEn G3miRWteYhEm G3miRWteYhEn",
+    ),
+]
+
+
+@pytest.mark.parametrize("compiled", [True, False])
+@pytest.mark.parametrize("row, sg, pl", PARADIGMS)
+def test_possessive_paradigm(row, sg, pl, compiled):
+    entry = decline.parse_row(row)
+    declension = decline.decline_by_paradigm(
+        entry.paradigm_id,
+        entry.word,
+        entry.has_suf,
+        entry.suf_pl,
+        compiled=compiled,
+        possessives=True,
+    )
+    assert declension is not None and declension.possessives is not None
+    possessives = declension.possessives
+    assert possessives.sg == dict(zip(PERSONS, sg.split()))
+    assert possessives.pl == dict(zip(PERSONS, pl.split()))
+    for person in PERSONS:
+        assert possessives.form(person) == possessives.sg[person]
+        assert possessives.form(person, plural=True) == possessives.pl[person]
@@ -0,0 +1,42 @@
+import pytest
+
+import decline
+import render
+
+
+# escapes where the order of the marks on a letter matters: the dagesh and the
+# shin or sin dot come before the vowel
+@pytest.mark.parametrize(
+    "text, hebrew",
+    [
+        ("sE!fEr", "סֶפֶר"),
+        ("d3va!r", "דְבָר"),
+        ("sus", "סוּס"),
+        ("Qavi", "אָבִי"),
+        # a silent shva between consonants, and final letters
+        ("sIfr3xEm", "סִפְרְכֶם"),
+        ("mE!lEx", "מֶלֶךְ"),
+        # dagesh forte, and none added to a letter that has one
+        ("qI_ca!H", "\u05e7\u05b4\u05e9\u05bc\u05c1\u05b8\u05d4"),
+        ("Sa_ba!t", "\u05e9\u05c2\u05b8\u05d1\u05bc\u05b8\u05ea"),
+        # maqaf and whitespace between words
+        ("bE!n-Qa!dam", "\u05d1\u05bc\u05b6\u05df\u05be\u05d0\u05b8\u05d3\u05b8\u05dd"),
+        ("sus sus", "סוּס סוּס"),
+        # the geresh goes after the points of its letter
+        ("Ci!ps", "\u05e6\u05b4\u05f3\u05d9\u05e4\u05bc\u05b0\u05e1"),
+    ],
+)
+def test_render(text, hebrew):
+    assert render.render(text) == hebrew
+
+
+def test_render_table():
+    rows = [["b_sefer", "sE!fEr", "-", "im"], ["b_sus", "G3miRa!H", "a!H", "Wt"]]
+    declensions = [r.declension for r in decline.decline_many(rows)] + [None]
+    table = render.render_table(declensions)
+    assert table[:2] == [
+        render.render_declension(d) for d in declensions if d is not None
+    ]
+    assert table[2] is None
+    assert table[0] is not None and table[0].abs_sg == "סֶפֶר"
+    assert table[0].abs_pl == render.render(declensions[0].abs_pl)
@@ -0,0 +1,97 @@
+import asyncio
+import gc
+import json
+import os
+import socket
+import struct
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict
+
+import decline
+import server
+
+TEST_DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "test-data.tsv")
+
+
+async def _serve_and_send(lines: list[bytes]) -> dict[int, dict]:
+    with ThreadPoolExecutor(1) as executor:
+        batcher = server.MicroBatcher(executor)
+        batcher.start()
+        tcp = await asyncio.start_server(
+            lambda r, w: server.handle_connection(batcher, r, w), "127.0.0.1", 0
+        )
+        try:
+            port = tcp.sockets[0].getsockname()[1]
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            for i, line in enumerate(lines):
+                writer.write(b'{"id": %d, ' % i + line[1:] + b"\n")
+            writer.write_eof()
+            responses = {}
+            while line := await reader.readline():
+                response = json.loads(line)
+                responses[response["id"]] = response
+            writer.close()
+        finally:
+            tcp.close()
+            await tcp.wait_closed()
+            await batcher.stop()
+    return responses
+
+
+def test_server_matches_decline_many():
+    # the rows' plural suffixes go over the wire as the lexicon spells them,
+    # so the server must read them as `decline.read_rows` + `parse_row` do
+    lines = server._request_lines(TEST_DATA)
+    expected = list(decline.decline_many(decline.read_rows(TEST_DATA)))
+    assert any(r.entry.paradigm_id.startswith("f_") for r in expected)
+    responses = asyncio.run(_serve_and_send(lines))
+    assert len(responses) == len(expected)
+    for i, r in enumerate(expected):
+        declension = None if r.declension is None else asdict(r.declension)
+        assert responses[i]["declension"] == declension, r.entry
+        assert responses[i].get("error") == r.error, r.entry
+
+
+async def _serve_and_drop(lines: list[bytes]) -> list[dict]:
+    # the client sends its requests and resets the connection without reading
+    # a response
+    errors: list[dict] = []
+    asyncio.get_running_loop().set_exception_handler(lambda _, c: errors.append(c))
+    with ThreadPoolExecutor(1) as executor:
+        batcher = server.MicroBatcher(executor)
+        batcher.start()
+        handlers: list[asyncio.Task] = []
+
+        async def handle(r, w):
+            task = asyncio.current_task()
+            assert task is not None
+            handlers.append(task)
+            await server.handle_connection(batcher, r, w)
+
+        tcp = await asyncio.start_server(handle, "127.0.0.1", 0)
+        try:
+            port = tcp.sockets[0].getsockname()[1]
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(b"not json\n" * 100)
+            for i, line in enumerate(lines):
+                writer.write(b'{"id": %d, ' % i + line[1:] + b"\n")
+            await writer.drain()
+            sock = writer.get_extra_info("socket")
+            linger = struct.pack("ii", 1, 0)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, linger)
+            writer.transport.abort()
+            while not handlers or not all(t.done() for t in handlers):
+                await asyncio.sleep(0.01)
+            await asyncio.sleep(0.1)
+        finally:
+            tcp.close()
+            await tcp.wait_closed()
+            await batcher.stop()
+    gc.collect()
+    await asyncio.sleep(0)
+    return errors
+
+
+def test_client_disconnects_early():
+    lines = server._request_lines(TEST_DATA)[:5000]
+    assert asyncio.run(_serve_and_drop(lines)) == []
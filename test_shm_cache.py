@@ -0,0 +1,52 @@
+import types
+
+import pytest
+
+import decline
+import shm_cache
+
+KEY = ("b_sus", "sus", False, "i!m")
+
+
+@pytest.fixture()
+def cache():
+    with shm_cache.SharedDeclensionCache(slots=64) as cache:
+        yield cache
+
+
+def test_round_trip(cache):
+    declension = decline.decline_by_paradigm(*KEY)
+    assert cache.get(KEY) == (False, None)
+    assert cache.put(KEY, declension)
+    assert cache.get(KEY) == (True, declension)
+    failed = ("b_sus", "x", False, "i!m")
+    assert cache.put(failed, None)
+    assert cache.get(failed) == (True, None)
+    assert cache.stats() == {"hits": 2, "misses": 1}
+
+
+def test_record_whose_crc_is_zero(cache, monkeypatch):
+    # `put` stores a zero checksum as 1, since 0 marks a slot being written
+    crc32 = types.SimpleNamespace(crc32=lambda data, value=0: 0)
+    monkeypatch.setattr(shm_cache, "zlib", crc32)
+    declension = decline.decline_by_paradigm(*KEY)
+    assert cache.put(KEY, declension)
+    assert cache.get(KEY) == (True, declension)
+
+
+def test_attach(cache):
+    cache.put(KEY, None)
+    other = shm_cache.SharedDeclensionCache.attach(cache.name)
+    try:
+        assert other.get(KEY) == (True, None)
+    finally:
+        other.close()
+
+
+def test_closed(cache):
+    cache.close()
+    cache.close()
+    with pytest.raises(ValueError, match="closed"):
+        cache.get(KEY)
+    with pytest.raises(ValueError, match="closed"):
+        cache.put(KEY, None)